@@ -1,15 +1,27 @@
-import random
 import numpy as np
-import torch
-import torch.nn as nn
-import torch.optim as optim
-from model.betting_dqn import Betting_DQN
+from model.frozen_mlp import FrozenMLP
 from memory.replay_buffer import Replay_Buffer
 
+torch = nn = optim = None   # imported on first agent construction, see _import_torch()
+
+
+def _import_torch():
+    """torch is only needed once a Betting_Agent (and its networks) exists."""
+    global torch, nn, optim
+    if torch is None:
+        import torch
+        import torch.nn as nn
+        import torch.optim as optim
+
+
 class Betting_Agent:
     def __init__(self, buffer_capacity=10000, batch_size=32,
     gamma=0.99, lr=1e-3, epsilon_start=1.0, epsilon_min=0.05, 
-    epsilon_decay=0.999, device="cpu", loss_type="mse"):
+    epsilon_decay=0.999, device="cpu", loss_type="mse", seed=None):
+        _import_torch()
+        from model.betting_dqn import Betting_DQN
+        # exploration draws from self.rng, the replay buffer gets a child stream
+        self.rng = np.random.default_rng(seed)
         self.batch_size = batch_size
         self.gamma = gamma
         self.epsilon = epsilon_start
@@ -29,6 +41,7 @@ class Betting_Agent:
         self.target_network.eval()  
         self.train_step = 0
         self.target_update_freq = 100  
+        self.frozen = None   # FrozenMLP while in eval mode, see freeze()
 
         self.optimizer = optim.Adam(self.q_network.parameters(), lr=lr)
 
@@ -39,16 +52,42 @@ class Betting_Agent:
         else:
             raise ValueError("Unsupported loss type")
 
-        self.replay_buffer = Replay_Buffer(buffer_capacity)
+        self.replay_buffer = Replay_Buffer(buffer_capacity, seed=self.rng.spawn(1)[0])
+
+    def freeze(self, dtype="float32"):
+        """Eval mode: greedy bets come from a NumPy copy of q_network (see DQN_Agent.freeze)."""
+        self.q_network.eval()
+        self.frozen = FrozenMLP.from_module(self.q_network, dtype)
+        return self
+
+    def unfreeze(self):
+        self.frozen = None
+        self.q_network.train()
 
     def select_bet(self, state):
-        if random.random() < self.epsilon:
-            action = random.randint(0, self.action_dim-1)
-        else:
-            state_tensor = torch.tensor(state, dtype=torch.float32).unsqueeze(0).to(self.device) #[batch size, input_features]
-            q_values = self.q_network(state_tensor)
-            action = torch.argmax(q_values).item()
-        return action
+        return int(self.select_bets(state)[0])
+
+    def select_bets(self, states):
+        """
+        Epsilon-greedy bet index for a batch of deck states in one forward pass.
+        states: (B, input_dim). Returns B bet indices as an int64 array.
+        """
+        states = np.asarray(states, dtype=np.float32)
+        if states.ndim == 1:
+            states = states[None, :] #[batch size, input_features]
+        n = states.shape[0]
+
+        explore = self.rng.random(n) < self.epsilon
+        actions = self.rng.integers(0, self.action_dim, size=n)
+
+        greedy = ~explore
+        if greedy.any() and self.frozen is not None:
+            actions[greedy] = self.frozen(states[greedy]).argmax(axis=1)
+        elif greedy.any():
+            with torch.no_grad():
+                q_values = self.q_network(torch.from_numpy(states[greedy]).to(self.device))
+            actions[greedy] = q_values.argmax(dim=1).cpu().numpy()
+        return actions
     
     def store_experience(self, state, action_index, reward, next_state, done):
         """
@@ -60,13 +99,16 @@ class Betting_Agent:
     def train(self):
         if len(self.replay_buffer) < self.batch_size:
             return
+        if self.frozen is not None:   # the weights are about to change
+            self.unfreeze()
         
         states, actions, rewards, next_states, dones = self.replay_buffer.sample_weighted(self.batch_size)
-        states = torch.tensor(states, dtype=torch.float32).to(self.device)
-        actions = torch.tensor(actions, dtype=torch.long).to(self.device)
-        rewards = torch.tensor(rewards, dtype=torch.float32).to(self.device)
-        next_states = torch.tensor(next_states, dtype=torch.float32).to(self.device)
-        dones = torch.tensor(dones, dtype=torch.float32).to(self.device)
+        # the buffer hands back contiguous float32/int64/bool arrays: wrap, don't copy
+        states = torch.from_numpy(states).to(self.device)
+        actions = torch.from_numpy(actions).to(self.device)
+        rewards = torch.from_numpy(rewards).to(self.device)
+        next_states = torch.from_numpy(next_states).to(self.device)
+        dones = torch.from_numpy(dones).float().to(self.device)
 
         q_values = self.q_network(states)
         q_values = q_values.gather(1, actions.unsqueeze(1)).squeeze(1) #which action was taken during gameplay
@@ -88,4 +130,30 @@ class Betting_Agent:
 
         self.train_step += 1
         if self.train_step % self.target_update_freq == 0:
-            self.target_network.load_state_dict(self.q_network.state_dict())
\ No newline at end of file
+            self.target_network.load_state_dict(self.q_network.state_dict())
+
+    def train_on_batch(self, states, actions, rewards):
+        """
+        One gradient step on a (state, bet index, reward) minibatch taken from
+        outside the replay buffer, e.g. a bulk dataset (train/train_betting_vec.py).
+        A bet ends its episode, so the target is the reward itself: no bootstrap,
+        no target network. actions=None takes rewards as (B, 5) full-vector
+        targets, the reward of every bet size (all five outputs are fitted).
+        Returns the loss.
+        """
+        if self.frozen is not None:   # the weights are about to change
+            self.unfreeze()
+        states = torch.as_tensor(states, dtype=torch.float32, device=self.device)
+        rewards = torch.as_tensor(rewards, dtype=torch.float32, device=self.device)
+
+        q_values = self.q_network(states)
+        if actions is not None:
+            actions = torch.as_tensor(actions, dtype=torch.int64, device=self.device)
+            q_values = q_values.gather(1, actions.unsqueeze(1)).squeeze(1)
+        loss = self.loss_fn(q_values, rewards)
+
+        self.optimizer.zero_grad()
+        loss.backward()
+        self.optimizer.step()
+        self.train_step += 1
+        return loss.item()
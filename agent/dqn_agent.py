@@ -1,15 +1,30 @@
-import random
 import numpy as np
-import torch
-import torch.nn as nn
-import torch.optim as optim
-from model.dqn import DQN
+from model.frozen_mlp import FrozenMLP
 from memory.replay_buffer import Replay_Buffer
+from memory.prioritized_replay_buffer import Prioritized_Replay_Buffer
+
+torch = nn = optim = None   # imported on first agent construction, see _import_torch()
+
+
+def _import_torch():
+    """Bind torch lazily so importing this module (e.g. for a table or frozen policy) stays cheap."""
+    global torch, nn, optim
+    if torch is None:
+        import torch
+        import torch.nn as nn
+        import torch.optim as optim
+
 
 class DQN_Agent:
     def __init__(self, buffer_capacity=10000, batch_size=32,
     gamma=0.99, lr=1e-3, epsilon_start=1.0, epsilon_min=0.1, 
-    epsilon_decay=0.995, device="cpu", loss_type="mse"):
+    epsilon_decay=0.995, device="cpu", loss_type="mse", prioritized=False,
+    per_alpha=0.6, per_beta=0.4, bucket_weight=None, seed=None, n_step=1):
+        _import_torch()
+        from model.dqn import DQN
+        # exploration draws from self.rng, the replay buffer gets a child stream;
+        # seed: int, SeedSequence, Generator or None (fresh entropy)
+        self.rng = np.random.default_rng(seed)
         self.batch_size = batch_size
         self.gamma = gamma
         self.epsilon = epsilon_start
@@ -26,6 +41,7 @@ class DQN_Agent:
         self.target_network.eval()  
         self.train_step = 0
         self.target_update_freq = 5000 
+        self.frozen = None   # FrozenMLP while in eval mode, see freeze()
 
         self.optimizer = optim.Adam(self.q_network.parameters(), lr=lr)
 
@@ -35,24 +51,81 @@ class DQN_Agent:
             self.loss_fn = nn.SmoothL1Loss()
         else:
             raise ValueError("Unsupported loss type")
-
-        self.replay_buffer = Replay_Buffer(buffer_capacity)
+        # per-sample loss, weighted by the importance-sampling weights under PER
+        self.elementwise_loss_fn = type(self.loss_fn)(reduction="none")
+
+        # prioritized=True: sum-tree replay on |TD error|, optionally still biased by TC bucket
+        # n_step > 1: the buffer stores n-step returns and their bootstrap discounts
+        self.prioritized = prioritized
+        if prioritized:
+            self.replay_buffer = Prioritized_Replay_Buffer(buffer_capacity, alpha=per_alpha,
+                                                           beta=per_beta, bucket_weight=bucket_weight,
+                                                           seed=self.rng.spawn(1)[0], n_step=n_step,
+                                                           gamma=gamma)
+        else:
+            self.replay_buffer = Replay_Buffer(buffer_capacity, seed=self.rng.spawn(1)[0],
+                                               n_step=n_step, gamma=gamma)
     
+    def freeze(self, dtype="float32"):
+        """
+        Eval mode: greedy forward passes go through a NumPy copy of q_network
+        (model/frozen_mlp.py), optionally with float16/int8 weights.
+        train() and unfreeze() go back to the torch network.
+        """
+        self.q_network.eval()
+        self.frozen = FrozenMLP.from_module(self.q_network, dtype)
+        return self
+
+    def unfreeze(self):
+        self.frozen = None
+        self.q_network.train()
+
     def select_action(self, state, legal_actions=None):
         """
         Choose an action using epsilon-greedy
         """
-        if random.random() < self.epsilon:
-            return int(np.random.choice(legal_actions or range(self.action_dim)))
-        else:
-            state_tensor = torch.FloatTensor(state).unsqueeze(0).to(self.device)
-            with torch.no_grad():
-                q_values = self.q_network(state_tensor)
-                if legal_actions is not None:
-                    mask = torch.full_like(q_values, float('-inf'))
-                    mask[0,legal_actions] = 0.0
-                    q_values += mask
-            return q_values.argmax().item()
+        legal_mask = None
+        if legal_actions:
+            legal_mask = np.zeros((1, self.action_dim), dtype=bool)
+            legal_mask[0, legal_actions] = True
+        return int(self.select_actions(state, legal_mask)[0])
+
+    def select_actions(self, states, legal_mask=None):
+        """
+        Epsilon-greedy for a whole batch in one forward pass.
+        states: (B, state_dim), legal_mask: (B, action_dim) bool or None.
+        Returns B actions as an int64 array.
+        """
+        states = np.asarray(states, dtype=np.float32)
+        if states.ndim == 1:
+            states = states[None, :]
+        n = states.shape[0]
+        if legal_mask is not None:
+            legal_mask = np.asarray(legal_mask, dtype=bool).reshape(n, self.action_dim)
+
+        # explorers pick uniformly among their legal actions, no forward pass needed
+        explore = self.rng.random(n) < self.epsilon
+        noise = self.rng.random((n, self.action_dim))
+        if legal_mask is not None:
+            noise[~legal_mask] = -1.0
+        actions = noise.argmax(axis=1)
+
+        greedy = ~explore
+        if not greedy.any():
+            return actions
+        if self.frozen is not None:
+            q_values = self.frozen(states[greedy] if explore.any() else states)
+            if legal_mask is not None:
+                q_values[~legal_mask[greedy]] = -np.inf
+            actions[greedy] = q_values.argmax(axis=1)
+            return actions
+        with torch.no_grad():
+            q_values = self.q_network(torch.from_numpy(states[greedy]).to(self.device))
+            if legal_mask is not None:
+                mask = torch.from_numpy(legal_mask[greedy]).to(self.device)
+                q_values = q_values.masked_fill(~mask, float('-inf'))
+        actions[greedy] = q_values.argmax(dim=1).cpu().numpy()
+        return actions
         
     def store_experience(self, state, action, reward, next_state, done):
         """
@@ -60,36 +133,79 @@ class DQN_Agent:
         """
         self.replay_buffer.add(state, action, reward, next_state, done)
 
-    def train(self):
+    def _sample_idx(self, n):
+        """n slots (and IS weights under PER) in one draw, shuffled so each batch mixes buckets/strata."""
+        buffer = self.replay_buffer
+        draw = buffer.sample_prioritized_idx if self.prioritized else buffer.sample_weighted_idx
+        if len(buffer) >= n:
+            picked = [draw(n)]
+        else:   # a chunk bigger than the buffer: one draw per batch
+            picked = [draw(self.batch_size) for _ in range(n // self.batch_size)]
+        if self.prioritized:
+            idx = np.concatenate([p[0] for p in picked])
+            weights = np.concatenate([p[1] for p in picked])
+            weights /= weights.max()
+        else:
+            idx, weights = np.concatenate(picked), None
+        order = self.rng.permutation(n)
+        return idx[order], (weights[order] if weights is not None else None)
+
+    def train(self, n_updates=1):
         """
-        Sample the buffer, apply Bellman equation, update weights after
+        Sample the buffer, apply Bellman equation, update weights after.
+        n_updates > 1 draws n_updates batches in one go and runs the gradient
+        steps back to back (one fused chunk, priorities refreshed once at the end).
+        Returns the absolute TD errors of every sampled transition (these are
+        the new priorities under PER).
         """
-        if len(self.replay_buffer) < 32:
+        if len(self.replay_buffer) < max(32, self.batch_size):
             return
-        
-        states, actions, rewards, next_states, dones = self.replay_buffer.sample_weighted(self.batch_size)
-
-        states = torch.FloatTensor(states).to(self.device)
-        actions = torch.LongTensor(actions).unsqueeze(1).to(self.device)
-        rewards = torch.FloatTensor(rewards).unsqueeze(1).to(self.device)
-        next_states = torch.FloatTensor(next_states).to(self.device)
-        dones = torch.BoolTensor(dones).unsqueeze(1).to(self.device)
+        if self.frozen is not None:   # the weights are about to change
+            self.unfreeze()
+
+        B = self.batch_size
+        idx, weights = self._sample_idx(n_updates * B)
+        states, actions, rewards, next_states, dones = self.replay_buffer.gather(idx)
+        discounts = self.replay_buffer.discounts[idx]
+
+        # the buffer hands back contiguous float32/int64/bool arrays: wrap, don't copy
+        states = torch.from_numpy(states).to(self.device)
+        actions = torch.from_numpy(actions).unsqueeze(1).to(self.device)
+        rewards = torch.from_numpy(rewards).unsqueeze(1).to(self.device)
+        next_states = torch.from_numpy(next_states).to(self.device)
+        dones = torch.from_numpy(dones).unsqueeze(1).to(self.device)
+        discounts = torch.from_numpy(discounts).unsqueeze(1).to(self.device)
+        if self.prioritized:
+            weights = torch.from_numpy(weights).unsqueeze(1).to(self.device)
+
+        td_errors = np.empty(n_updates * B, dtype=np.float32)
+        for k in range(n_updates):
+            b = slice(k * B, (k + 1) * B)
+            q_values = self.q_network(states[b]).gather(1, actions[b]) #gathering values that the ai model has *previously* predicted. it goes by column and grabs the q-value based on the aciton index
 
-        q_values = self.q_network(states).gather(1, actions) #gathering values that the ai model has *previously* predicted. it goes by column and grabs the q-value based on the aciton index
-
-        with torch.no_grad():
-            max_next_q = self.target_network(next_states).max(dim=1, keepdim=True)[0]
-            target_q = rewards + self.gamma * max_next_q * (~dones) # remember that this is a np array or wtv of target_q values
-
-        loss = self.loss_fn(q_values, target_q)
-        self.optimizer.zero_grad()
-        loss.backward()
-        torch.nn.utils.clip_grad_norm_(self.q_network.parameters(), 5.0)
-        self.optimizer.step()
-        
-        self.train_step += 1
-        if self.train_step % self.target_update_freq == 0:
-            self.target_network.load_state_dict(self.q_network.state_dict())
+            with torch.no_grad():
+                max_next_q = self.target_network(next_states[b]).max(dim=1, keepdim=True)[0]
+                # discount is gamma for 1-step transitions, gamma^n for n-step returns
+                target_q = rewards[b] + discounts[b] * max_next_q * (~dones[b]) # remember that this is a np array or wtv of target_q values
+
+            if self.prioritized:
+                loss = (weights[b] * self.elementwise_loss_fn(q_values, target_q)).mean()
+            else:
+                loss = self.loss_fn(q_values, target_q)
+            self.optimizer.zero_grad()
+            loss.backward()
+            torch.nn.utils.clip_grad_norm_(self.q_network.parameters(), 5.0)
+            self.optimizer.step()
+
+            self.train_step += 1
+            if self.train_step % self.target_update_freq == 0:
+                self.target_network.load_state_dict(self.q_network.state_dict())
+
+            td_errors[b] = (target_q - q_values).detach().abs().squeeze(1).cpu().numpy()
+
+        if self.prioritized:
+            self.replay_buffer.update_priorities(idx, td_errors)
+        return td_errors
     
     def decay_eps_episode(self):
         self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
@@ -97,38 +213,34 @@ class DQN_Agent:
         
 if __name__ == "__main__":
     from collections import Counter
+    import numpy as np
     from env.blackjackEnv import BlackjackEnv
-    from env.highTCWrapper import HighTCWrapper
+    from env.shoe import Shoe
+    from utils.shoe_sim import sample_shoes, tc_frequency, tc_table
 
-    base = BlackjackEnv()
-    env  = HighTCWrapper(base, min_tc=3, prob=0.1, max_tries=150)
+    # high-TC starts: 10% of rounds are dealt from a sampled shoe at TC >= 3, the rest from any sampled shoe
+    MIN_TC, PROB, N = 3, 0.1, 5000
+    rng = np.random.default_rng(0)
+    env = BlackjackEnv(seed=0)
+    shoes, cursors, tcs = sample_shoes(rng, 20 * N, env.num_deck)
+    high = np.flatnonzero(tcs >= MIN_TC)
+    pick = np.where(rng.random(N) < PROB, rng.choice(high, size=N), rng.integers(0, len(tcs), size=N))
 
     bins = Counter()
-    N = 5000
-    for _ in range(N):
+    for k in pick:
+        shoe = Shoe(cards=shoes[k].tolist())
+        shoe.cursor = int(cursors[k])
+        env.set_deck(shoe)
         env.reset()
-        tc = env.get_deck_distribution(betting=True)[-3]
-        bins[int(tc)] += 1
+        bins[int(env.round_tc)] += 1
 
-    print("Starts by TC (rounded):")
+    print(f"Starts by TC (rounded), {PROB:.0%} forced to TC >= {MIN_TC}:")
     for tc in sorted(bins.keys()):
         count = bins[tc]
         percentage = (count / N) * 100
         print(f"  TC {tc:+3d}: {count:4d} times ({percentage:5.1f}%)")
 
-    print("\n tc wrapper done. now trying base env below")
-    base = BlackjackEnv()
-    env  = base
-
-    bins = Counter()
-    N = 5000
-    for _ in range(N):
-        env.reset()
-        tc = env.get_deck_distribution(betting=True)[-3]
-        bins[int(tc)] += 1
-
-    for tc in sorted(bins.keys()):
-        count = bins[tc]
-        percentage = (count / N) * 100
-        print(f"  TC {tc:+3d}: {count:4d} times ({percentage:5.1f}%)")
-    # You should see MANY more starts at 3, 4, 5+ than you’d get without the wrapper.
+    print("\nbase shoe for comparison (utils/shoe_sim.py):")
+    for tc, share in tc_table(tc_frequency(env.num_deck, env.penetration, n_shoes=100_000)):
+        print(f"  TC {tc:+3d}: {share * 100:5.1f}%")
+    # You should see MANY more starts at 3, 4, 5+ than in the base shoe.
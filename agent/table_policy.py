@@ -0,0 +1,191 @@
+"""
+A playing policy compiled from a DQN checkpoint into a dense action table, so
+a decision is one array index and no torch is needed at play time.
+
+Table axes (in order):
+  num_cards 2..MAX_CARDS (more cards share the last slot), score 0..21, is_soft,
+  dealer upcard 2..11, can_split, double legal, split legal,
+  true count rounded to -8..8, and optionally a quantized ten-density bin.
+The deck composition fed to the network for each (TC, ten-density) cell is the
+mean composition of real decision states in that cell.
+
+Export from the repo root:
+  python -m agent.table_policy checkpoints/count_weighted/blackjack_dqn_ep100000.pth
+The eval scripts take the resulting .npz anywhere they take a .pth checkpoint.
+"""
+import json
+import numpy as np
+
+MAX_CARDS = 7
+TC_RANGE = 8        # state[-1] is clip(tc, -8, 8) / 8
+TEN_IDX = 14        # state index of the 10-value share of the shoe
+
+
+class TablePolicy:
+    def __init__(self, actions, comp_edges=(), meta=None):
+        self.actions = actions          # int8 table, see module docstring for the axes
+        self.comp_edges = np.asarray(comp_edges, dtype=np.float64)   # inner edges of the ten-density bins
+        self.meta = meta or {}
+        self.action_dim = 4
+        self.epsilon = 0.0              # greedy only, kept for DQN_Agent compatibility
+
+    # ---- lookup ----
+    def index(self, states, legal_mask=None):
+        """Table index tuple for a (B, 17) batch of states."""
+        states = np.asarray(states, dtype=np.float32)
+        if states.ndim == 1:
+            states = states[None, :]
+        n = states.shape[0]
+        if legal_mask is None:
+            double_ok = split_ok = np.ones(n, dtype=np.int64)
+        else:
+            legal_mask = np.asarray(legal_mask, dtype=bool).reshape(n, self.action_dim)
+            double_ok = legal_mask[:, 2].astype(np.int64)
+            split_ok = legal_mask[:, 3].astype(np.int64)
+
+        return (
+            np.clip(states[:, 0].astype(np.int64), 2, MAX_CARDS) - 2,
+            np.clip(states[:, 1].astype(np.int64), 0, 21),
+            states[:, 2].astype(np.int64),
+            np.clip(states[:, 3].astype(np.int64), 2, 11) - 2,
+            states[:, 4].astype(np.int64),
+            double_ok,
+            split_ok,
+            np.rint(states[:, -1] * TC_RANGE).astype(np.int64) + TC_RANGE,
+            np.searchsorted(self.comp_edges, states[:, TEN_IDX], side="right"),
+        )
+
+    def select_actions(self, states, legal_mask=None):
+        """Same contract as DQN_Agent.select_actions (always greedy)."""
+        return self.actions[self.index(states, legal_mask)].astype(np.int64)
+
+    def select_action(self, state, legal_actions=None):
+        legal_mask = None
+        if legal_actions:
+            legal_mask = np.zeros((1, self.action_dim), dtype=bool)
+            legal_mask[0, legal_actions] = True
+        return int(self.select_actions(state, legal_mask)[0])
+
+    # ---- persistence ----
+    def save(self, path):
+        np.savez_compressed(path, actions=self.actions, comp_edges=self.comp_edges,
+                            meta=np.array(json.dumps(self.meta)))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data["actions"], data["comp_edges"], json.loads(str(data["meta"])))
+
+
+def load_policy(ckpt, frozen="float32"):
+    """
+    Greedy playing policy from a path: a TablePolicy for .npz, else a DQN_Agent
+    checkpoint. "solver" gives the composition-dependent SolverPolicy.
+    A DQN_Agent is frozen to NumPy inference with `frozen` weights
+    ("float32", "float16", "int8"); None keeps the torch forward pass.
+    """
+    if ckpt == "solver":
+        from utils.strategy_solver import SolverPolicy
+        return SolverPolicy()
+    if str(ckpt).endswith(".npz"):
+        return TablePolicy.load(ckpt)
+    import torch
+    from agent.dqn_agent import DQN_Agent
+    agent = DQN_Agent(epsilon_start=0.0)
+    agent.q_network.load_state_dict(torch.load(ckpt, map_location="cpu"))
+    agent.q_network.eval()
+    if frozen:
+        agent.freeze(frozen)
+    return agent
+
+
+def rollout_states(agent, n_envs=4096, n_steps=200, seed=0):
+    """(states, legal masks) of the decisions `agent` actually faces, via VecBlackjackEnv."""
+    from env.vecBlackjackEnv import VecBlackjackEnv
+    env = VecBlackjackEnv(n_envs, seed=seed)
+    states = env.reset()
+    all_states, all_masks = [], []
+    for _ in range(n_steps):
+        mask = env.legal_actions_mask()
+        all_states.append(states)
+        all_masks.append(mask)
+        states, _, _, _ = env.step(agent.select_actions(states, mask))
+    return np.concatenate(all_states), np.concatenate(all_masks)
+
+
+def agreement(policy, agent, states, masks):
+    """Share of decisions where the table picks the network's action."""
+    return float((policy.select_actions(states, masks) == agent.select_actions(states, masks)).mean())
+
+
+def export_table(ckpt, comp_bins=1, n_envs=4096, n_steps=200, seed=0):
+    """Compile a playing checkpoint into a TablePolicy. Returns (policy, agreement)."""
+    agent = load_policy(ckpt)
+
+    # representative composition + TC per (tc bin, ten-density bin) from real decisions
+    states, masks = rollout_states(agent, n_envs, n_steps, seed)
+    comp_edges = np.quantile(states[:, TEN_IDX], np.linspace(0, 1, comp_bins + 1)[1:-1])
+    n_tc = 2 * TC_RANGE + 1
+    probe = TablePolicy(None, comp_edges)
+    idx = probe.index(states)
+    cell = idx[7] * comp_bins + idx[8]
+    sums = np.zeros((n_tc * comp_bins, 11))
+    np.add.at(sums, cell, states[:, 6:17])
+    counts = np.bincount(cell, minlength=n_tc * comp_bins)[:, None]
+
+    tc_sums = sums.reshape(n_tc, comp_bins, 11).sum(axis=1)
+    tc_counts = counts.reshape(n_tc, comp_bins).sum(axis=1)[:, None]
+    fallback = np.divide(tc_sums, tc_counts, out=np.zeros_like(tc_sums), where=tc_counts > 0)
+    empty_tc = tc_counts[:, 0] == 0
+    fallback[empty_tc, :10] = states[:, 6:16].mean(axis=0)
+    fallback[:, 10] = np.where(empty_tc, (np.arange(n_tc) - TC_RANGE) / TC_RANGE, fallback[:, 10])
+    rep = np.where(counts > 0, sums / np.maximum(counts, 1), np.repeat(fallback, comp_bins, axis=0))
+    rep = rep.reshape(n_tc, comp_bins, 11)
+
+    # every table cell as a network input
+    shape = (MAX_CARDS - 1, 22, 2, 10, 2, 2, 2, n_tc, comp_bins)
+    grid = np.indices(shape).reshape(len(shape), -1)
+    n_cards, score, soft, dealer, split, double_ok, split_ok, tc, comp = grid
+    inputs = np.empty((grid.shape[1], 17), dtype=np.float32)
+    inputs[:, 0] = n_cards + 2
+    inputs[:, 1] = score
+    inputs[:, 2] = soft
+    inputs[:, 3] = dealer + 2
+    inputs[:, 4] = split
+    inputs[:, 5] = n_cards == 0
+    inputs[:, 6:17] = rep[tc, comp]
+
+    legal = np.ones((grid.shape[1], 4), dtype=bool)
+    legal[:, 2] = double_ok.astype(bool)
+    legal[:, 3] = split_ok.astype(bool)
+    actions = np.empty(grid.shape[1], dtype=np.int8)
+    chunk = 65536
+    for start in range(0, grid.shape[1], chunk):
+        end = start + chunk
+        actions[start:end] = agent.select_actions(inputs[start:end], legal[start:end])
+
+    policy = TablePolicy(actions.reshape(shape), comp_edges,
+                         meta={"checkpoint": ckpt, "comp_bins": comp_bins})
+    held_states, held_masks = rollout_states(agent, n_envs, n_steps // 2, seed + 1)
+    rate = agreement(policy, agent, held_states, held_masks)
+    policy.meta["agreement"] = rate
+    return policy, rate
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description="Compile a playing DQN checkpoint into a lookup table.")
+    parser.add_argument("ckpt")
+    parser.add_argument("--out", default=None, help="defaults to checkpoints/table_policy/<name>.npz")
+    parser.add_argument("--comp-bins", type=int, default=1, help="ten-density bins per TC bin")
+    args = parser.parse_args()
+
+    out = args.out or os.path.join("checkpoints", "table_policy",
+                                   os.path.splitext(os.path.basename(args.ckpt))[0] + ".npz")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    policy, rate = export_table(args.ckpt, comp_bins=args.comp_bins)
+    policy.save(out)
+    print(f"table {policy.actions.shape} ({policy.actions.nbytes:,} bytes) -> {out}")
+    print(f"agreement with the network on held-out decisions: {rate:.2%}")
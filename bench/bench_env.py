@@ -0,0 +1,71 @@
+"""
+Steps/sec of BlackjackEnv with the live card counts vs the old full-shoe rescan.
+Run from the repo root:  python -m bench.bench_env
+"""
+import random
+import time
+from env.blackjackEnv import BlackjackEnv
+
+class ScanningBlackjackEnv(BlackjackEnv):
+    """The pre-cache behaviour: every call walks the whole remaining shoe."""
+    def get_deck_distribution(self, betting=False):
+        total_cards = len(self.deck)
+        counts = {i: 0 for i in range(2, 12)}  # 2-10, 11 for Ace
+
+        for card in self.deck:
+            val = 11 if card == 'A' else card
+            counts[val] += 1
+
+        percentages = [counts[i] / total_cards for i in range(2, 12)]
+
+        running_count = -(
+            sum(counts[i] for i in [2, 3, 4, 5, 6])
+            - sum(counts[i] for i in [10, 11])
+        )
+
+        decks_remaining = total_cards / 52
+        true_count = running_count / decks_remaining if decks_remaining > 0 else 0
+
+        return percentages + betting*[running_count, true_count, decks_remaining, total_cards]
+
+    def get_state(self):
+        # the old get_state() asked for the distribution twice
+        state = super().get_state()
+        self.get_deck_distribution()
+        return state
+
+
+def play(env, n_hands, seed=0):
+    """Plays n_hands with a random legal policy, returns (steps, seconds)."""
+    random.seed(seed)
+    env.deck = []
+    steps = 0
+    start = time.perf_counter()
+    for _ in range(n_hands):
+        env.reset()
+        env.set_bet(10)
+        while not env.done:
+            env.step(random.choice(env.legal_actions()))
+            steps += 1
+    return steps, time.perf_counter() - start
+
+
+def check_counts(n_hands=2000, seed=1):
+    """The cached distribution must match a rescan after every step."""
+    random.seed(seed)
+    env = BlackjackEnv()
+    scan = ScanningBlackjackEnv.get_deck_distribution
+    for _ in range(n_hands):
+        env.reset()
+        env.set_bet(10)
+        while not env.done:
+            assert env.get_deck_distribution(betting=True) == scan(env, betting=True)
+            env.step(random.choice(env.legal_actions()))
+
+
+if __name__ == "__main__":
+    check_counts()
+    n_hands = 20_000
+    for name, env in [("rescan (before)", ScanningBlackjackEnv()), ("cached (after)", BlackjackEnv())]:
+        steps, secs = play(env, n_hands)
+        print(f"{name:>16}: {steps / secs:10,.0f} steps/sec  ({n_hands / secs:,.0f} hands/sec)")
@@ -0,0 +1,95 @@
+"""
+Greedy inference: torch (no_grad forward per call) vs the frozen NumPy MLP
+(model/frozen_mlp.py) with float32 / float16 / int8 weights, for the playing
+DQN and the betting DQN. Reports per-decision latency (select_action /
+select_bet on one state), batch throughput (select_actions / select_bets on
+chunks of --batch states) and the share of argmax actions that match torch,
+on states from real play. Run from the repo root:
+  python -m bench.bench_inference
+  python -m bench.bench_inference --ckpt checkpoints/count_weighted/blackjack_dqn_ep050000.pth
+"""
+import random
+import time
+import numpy as np
+import torch
+from agent.betting_agent import Betting_Agent
+from agent.table_policy import load_policy, rollout_states
+from env.blackjackEnv import BlackjackEnv
+from model.frozen_mlp import DTYPES
+
+
+def deck_states(n, seed=0):
+    """Pre-round betting states (get_deck_distribution(betting=True)) from random play."""
+    random.seed(seed)
+    env = BlackjackEnv(seed=seed)
+    out = []
+    while len(out) < n:
+        out.append(env.get_deck_distribution(betting=True))
+        env.reset()
+        env.set_bet(10)
+        while not env.done:
+            env.step(random.choice(env.legal_actions()))
+    return np.asarray(out, dtype=np.float32)
+
+
+def per_call_us(fn, args_list, seconds):
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for args in args_list:
+            fn(*args)
+        done += len(args_list)
+    return (time.perf_counter() - start) / done * 1e6
+
+
+def batch_rate(fn, states, masks, batch, seconds):
+    chunks = [(states[i:i + batch],) + ((masks[i:i + batch],) if masks is not None else ())
+              for i in range(0, len(states) - batch + 1, batch)]
+    return 1e6 / per_call_us(fn, chunks, seconds) * batch
+
+
+def report(name, agents, single, batch_fn, states, masks, batch, seconds):
+    print(f"\n{name}: {len(states):,} states")
+    print(f"{'':>9} {'µs/decision':>12} {f'batch {batch}/s':>14} {'weights':>10} {'agreement':>10}")
+    reference = batch_fn(agents["torch"])(states, masks) if masks is not None else \
+        batch_fn(agents["torch"])(states)
+    for mode, agent in agents.items():
+        latency = per_call_us(single(agent), _single_args(states, masks), seconds)
+        rate = batch_rate(batch_fn(agent), states, masks, batch, seconds)
+        picks = batch_fn(agent)(states, masks) if masks is not None else batch_fn(agent)(states)
+        size = agent.frozen.nbytes if agent.frozen is not None else \
+            sum(p.numel() * p.element_size() for p in agent.q_network.parameters())
+        print(f"{mode:>9} {latency:>12.1f} {rate:>14,.0f} {size:>9,}B {np.mean(picks == reference):>10.4%}")
+
+
+def _single_args(states, masks, n=500):
+    if masks is None:
+        return [(s,) for s in states[:n]]
+    return [(s, list(np.flatnonzero(m))) for s, m in zip(states[:n], masks[:n])]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Frozen NumPy vs torch inference for the DQN models.")
+    parser.add_argument("--ckpt", default="checkpoints/count_weighted/blackjack_dqn_ep100000.pth")
+    parser.add_argument("--bet-ckpt", default="checkpoints/betting/bet_dqn.pth")
+    parser.add_argument("--batch", type=int, default=4096)
+    parser.add_argument("--seconds", type=float, default=1.0, help="time per measurement")
+    args = parser.parse_args()
+    torch.set_num_threads(1)
+
+    players = {"torch": load_policy(args.ckpt, frozen=None)}
+    for dtype in DTYPES:
+        players[dtype] = load_policy(args.ckpt, frozen=dtype)
+    states, masks = rollout_states(players["float32"], n_envs=2048, n_steps=50)
+    report("playing DQN", players, lambda a: a.select_action, lambda a: a.select_actions,
+           states, masks, args.batch, args.seconds)
+
+    bettors = {}
+    for mode in ("torch",) + DTYPES:
+        agent = Betting_Agent(epsilon_start=0.0)
+        agent.q_network.load_state_dict(torch.load(args.bet_ckpt, map_location="cpu"))
+        agent.q_network.eval()
+        bettors[mode] = agent if mode == "torch" else agent.freeze(mode)
+    report("betting DQN", bettors, lambda a: a.select_bet, lambda a: a.select_bets,
+           deck_states(20_000), None, args.batch, args.seconds)
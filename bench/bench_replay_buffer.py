@@ -0,0 +1,130 @@
+"""
+Memory and sampling speed of Replay_Buffer (array storage) vs the old
+tuple-of-lists storage, filled with real BlackjackEnv states, and
+sample_weighted() speed of the dense TC buckets vs the old set buckets.
+Run from the repo root:  python -m bench.bench_replay_buffer
+"""
+import random
+import time
+import tracemalloc
+import numpy as np
+from env.blackjackEnv import BlackjackEnv
+from memory.replay_buffer import Replay_Buffer
+
+
+class TupleReplayBuffer(Replay_Buffer):
+    """The pre-array behaviour: one Python tuple of Python lists per transition."""
+    def _allocate(self, state_dim):
+        self.state_dim = state_dim
+        self.buffer = [None] * self.capacity
+
+    def add(self, state, action, reward, next_state, done):
+        if self.state_dim is None:
+            self._allocate(len(state))
+        if self.size == self.capacity:
+            self._remove_from_bucket(self.pos)
+        self.buffer[self.pos] = (state, action, reward, next_state, done)
+        tc = float(state[self.tc_idx])
+        self.tc_vals[self.pos] = tc
+        self._add_to_bucket(self.pos, self._bin_for_tc(tc))
+        self.pos = (self.pos + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def gather(self, idx):
+        batch = [self.buffer[i] for i in idx]
+        states, actions, rewards, next_states, dones = zip(*batch)
+        return (
+            np.asarray(states),
+            np.asarray(actions),
+            np.asarray(rewards, dtype=np.float32),
+            np.asarray(next_states),
+            np.asarray(dones, dtype=np.bool_),
+        )
+
+
+class SetBucketReplayBuffer(Replay_Buffer):
+    """The pre-array buckets: Python sets, rebuilt into arrays on every sample."""
+    def _remove_from_bucket(self, i):
+        if self.bins[i] >= 0:
+            self.sets[self.bins[i]].discard(i)
+        self.bins[i] = -1
+
+    def _add_to_bucket(self, i, b):
+        if not hasattr(self, "sets"):
+            self.sets = [set() for _ in range(self.n_buckets)]
+        self.bins[i] = b
+        self.sets[b].add(i)
+
+    def sample_weighted_idx(self, batch_size, mix=None):
+        mix = 0.7 if mix is None else mix
+        n_hi = int(round(batch_size * mix))
+        picks = []
+        if self.sets[-1] and n_hi > 0:
+            hi_pool = np.fromiter(self.sets[-1], dtype=int)
+            take = min(n_hi, hi_pool.size)
+            picks.extend(np.random.choice(hi_pool, size=take, replace=True).tolist())
+        need = batch_size - len(picks)
+        if need > 0:
+            all_idx = np.arange(self.size)
+            picks.extend(np.random.choice(all_idx, size=need, replace=True).tolist())
+        return np.asarray(picks)
+
+
+def transitions(n, seed=0):
+    """n (state, action, reward, next_state, done) tuples from a random legal policy."""
+    random.seed(seed)
+    env = BlackjackEnv()
+    out = []
+    while len(out) < n:
+        state = env.reset()
+        env.set_bet(10)
+        while not env.done:
+            action = random.choice(env.legal_actions())
+            next_state, reward, done, _ = env.step(action)
+            out.append((state, action, reward, next_state, done))
+            state = next_state
+    return out[:n]
+
+
+def fill(buffer_cls, data):
+    tracemalloc.start()
+    buffer = buffer_cls(len(data))
+    for t in data:
+        # fresh lists per transition, as the env hands them out
+        buffer.add(list(t[0]), t[1], t[2], list(t[3]), t[4])
+    mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return buffer, mem
+
+
+def samples_per_sec(sample, batch_size=32, n=2000):
+    start = time.perf_counter()
+    for _ in range(n):
+        sample(batch_size)
+    return n / (time.perf_counter() - start)
+
+
+def bucket_bench(capacities=(10_000, 150_000, 1_000_000), state_dim=17, seed=0):
+    """sample_weighted() calls/sec on full buffers of synthetic states (TC ~ N(0, 2.5))."""
+    rng = np.random.default_rng(seed)
+    for capacity in capacities:
+        states = rng.random((capacity, state_dim), dtype=np.float32)
+        states[:, -1] = rng.normal(0, 2.5, capacity)
+        for name, cls in [("set buckets (before)", SetBucketReplayBuffer),
+                          ("dense buckets (after)", Replay_Buffer)]:
+            buffer = cls(capacity)
+            for s in states:
+                buffer.add(s, 0, 0.0, s, False)
+            rate = samples_per_sec(buffer.sample_weighted, n=200 if capacity >= 1_000_000 else 1000)
+            print(f"{capacity:>9,} {name:>22}: {rate:10,.0f} sample_weighted/s")
+
+
+if __name__ == "__main__":
+    capacity = 150_000   # buffer_capacity in train/train_dqn.py
+    data = transitions(capacity)
+    for name, cls in [("tuples (before)", TupleReplayBuffer), ("arrays (after)", Replay_Buffer)]:
+        buffer, mem = fill(cls, data)
+        print(f"{name:>16}: {mem / 2**20:7.1f} MiB for {capacity:,} transitions, "
+              f"sample {samples_per_sec(buffer.sample):8,.0f}/s, "
+              f"sample_weighted {samples_per_sec(buffer.sample_weighted):8,.0f}/s")
+    bucket_bench()
@@ -0,0 +1,66 @@
+"""
+Startup cost of the entry points: import time of each module in a fresh
+interpreter (best of --repeat) and whether it pulled in torch, plus the
+time to first decision for a .npz table policy vs a .pth checkpoint.
+Run from the repo root:  python -m bench.bench_startup
+"""
+import subprocess
+import sys
+
+MODULES = [
+    "env.blackjackEnv", "env.payoutTrackerEnv", "env.vecBlackjackEnv",
+    "memory.replay_buffer", "memory.prioritized_replay_buffer",
+    "agent.table_policy", "agent.dqn_agent", "agent.betting_agent",
+    "utils.strategy_solver", "utils.shoe_sim",
+    "eval.runner", "eval.ev_by_true_count", "eval.eval_fixed", "eval.eval_model", "eval.eval_betting",
+]
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start, "torch" in sys.modules)
+"""
+
+FIRST_DECISION = """
+from agent.table_policy import load_policy
+from env.blackjackEnv import BlackjackEnv
+env = BlackjackEnv(seed=0)
+state = env.reset()
+policy = load_policy({ckpt!r})
+if hasattr(policy, "bind"):
+    policy.bind(env)
+policy.select_action(state, env.legal_actions())
+"""
+
+
+def timed(code, repeat):
+    """(best seconds, torch imported) for `code` in fresh interpreters."""
+    best, torch_loaded = float("inf"), False
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(code=code)], capture_output=True,
+                             text=True, check=True).stdout.split()
+        best = min(best, float(out[0]))
+        torch_loaded = out[1] == "True"
+    return best, torch_loaded
+
+
+if __name__ == "__main__":
+    import argparse
+    import glob
+
+    parser = argparse.ArgumentParser(description="Import and first-decision time of the entry points.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--ckpt", default="checkpoints/count_weighted/blackjack_dqn_ep100000.pth")
+    args = parser.parse_args()
+
+    print(f"{'import':<36} {'seconds':>8}  torch")
+    for module in MODULES:
+        seconds, torch_loaded = timed(f"import {module}", args.repeat)
+        print(f"{module:<36} {seconds:>8.3f}  {'yes' if torch_loaded else '-'}")
+
+    print(f"\n{'first decision':<36} {'seconds':>8}  torch")
+    tables = sorted(glob.glob("checkpoints/table_policy/*.npz"))
+    for ckpt in [args.ckpt] + tables[:1] + ["solver"]:
+        seconds, torch_loaded = timed(FIRST_DECISION.format(ckpt=ckpt), args.repeat)
+        print(f"{ckpt[-36:]:<36} {seconds:>8.3f}  {'yes' if torch_loaded else '-'}")
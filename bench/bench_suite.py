@@ -0,0 +1,350 @@
+"""
+Seeded throughput suite with a stored baseline. Micro cases time one
+component on fixed inputs, macro cases time an end-to-end loop:
+
+  micro  env.reset / env.step / env.get_state, payout.settle,
+         replay.add / sample / sample_weighted per capacity,
+         dqn.forward (torch and frozen, batch 1 and 1024), dqn.train
+  macro  ev_by_tc.run_once (hands/s), train_dqn.train (episodes/s)
+
+Each case runs --repeat samples of at least --min-time seconds (macro cases
+run once) and keeps the best rate, the least noisy estimate on a shared
+machine. Results go to --json; every rate is compared with the baseline
+(bench/baseline.json) and anything slower by more than --tolerance is
+flagged. Baselines are per machine: re-record one with --save-baseline.
+Run from the repo root:
+  python -m bench.bench_suite
+  python -m bench.bench_suite --only "replay.*" --json runs/bench.json
+  python -m bench.bench_suite --micro --save-baseline
+"""
+import contextlib
+import fnmatch
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+BASELINE = "bench/baseline.json"
+SEED = 0
+CAPACITIES = (10_000, 150_000)
+STATE_DIM = 17
+
+
+# ---- micro cases: setup(seed) -> run(); run() returns units done, or (units, seconds) ----
+def env_reset(seed):
+    from env.blackjackEnv import BlackjackEnv
+    env = BlackjackEnv(seed=seed)
+
+    def run(n=1000):
+        for _ in range(n):
+            env.reset()
+            env.set_bet(10)
+        return n
+    return run
+
+
+def env_step(seed):
+    """Random legal play; only the step() calls are on the clock."""
+    from env.blackjackEnv import BlackjackEnv
+    env = BlackjackEnv(seed=seed)
+    rng = random.Random(seed)
+    perf_counter = time.perf_counter
+
+    def run(n_hands=500):
+        steps, seconds = 0, 0.0
+        for _ in range(n_hands):
+            env.reset()
+            env.set_bet(10)
+            while not env.done:
+                action = rng.choice(env.legal_actions())
+                start = perf_counter()
+                env.step(action)
+                seconds += perf_counter() - start
+                steps += 1
+        return steps, seconds
+    return run
+
+
+def env_get_state(seed):
+    from env.blackjackEnv import BlackjackEnv
+    env = BlackjackEnv(seed=seed)
+    env.reset()
+
+    def run(n=2000):
+        for _ in range(n):
+            env.get_state()
+        return n
+    return run
+
+
+def payout_settle(seed):
+    """A round's accounting: a tracker per round, the odd split or double, one payout per hand."""
+    from env.payoutTrackerEnv import PayoutTracker
+    rng = np.random.default_rng(seed)
+    rounds = [(int(kind), rng.choice([1, 1.5, 0, -1], size=2).tolist())
+              for kind in rng.choice([0, 1, 2], size=1000, p=[0.85, 0.1, 0.05])]
+
+    def run():
+        for kind, rewards in rounds:
+            tracker = PayoutTracker(10)
+            if kind == 1:
+                tracker.on_double(0)
+            elif kind == 2:
+                tracker.on_split_at(0)
+                tracker.calculate_payout(1, rewards[1])
+            tracker.calculate_payout(0, rewards[0])
+            tracker.get_info()
+        return len(rounds)
+    return run
+
+
+def _synthetic(n, seed):
+    """n transitions of random 17-dim states with TC ~ N(0, 2.5), as in bench_train."""
+    rng = np.random.default_rng(seed)
+    states = rng.random((n, STATE_DIM), dtype=np.float32)
+    states[:, -1] = rng.normal(0, 2.5, n)
+    return (states, rng.integers(0, 4, n), rng.normal(0, 1, n).astype(np.float32), rng.random(n) < 0.5)
+
+
+def _filled_buffer(capacity, seed):
+    from memory.replay_buffer import Replay_Buffer
+    buffer = Replay_Buffer(capacity, seed=seed)
+    states, actions, rewards, dones = _synthetic(capacity, seed)
+    for i in range(capacity):
+        buffer.add(states[i], actions[i], rewards[i], states[(i + 1) % capacity], dones[i])
+    return buffer
+
+
+def replay_add(capacity):
+    def setup(seed):
+        from memory.replay_buffer import Replay_Buffer
+        buffer = Replay_Buffer(capacity, seed=seed)
+        states, actions, rewards, dones = _synthetic(5000, seed)
+
+        def run():
+            for i in range(len(states)):
+                buffer.add(states[i], actions[i], rewards[i], states[i - 1], dones[i])
+            return len(states)
+        return run
+    return setup
+
+
+def replay_sample(capacity, weighted, batch_size=32):
+    def setup(seed):
+        buffer = _filled_buffer(capacity, seed)
+        sample = buffer.sample_weighted if weighted else buffer.sample
+
+        def run(n=500):
+            for _ in range(n):
+                sample(batch_size)
+            return n
+        return run
+    return setup
+
+
+def dqn_forward(batch, frozen):
+    """Greedy select_actions on batch states from a seeded, untrained network (units: states)."""
+    def setup(seed):
+        import torch
+        from agent.dqn_agent import DQN_Agent
+        torch.manual_seed(seed)
+        agent = DQN_Agent(epsilon_start=0.0, seed=seed)
+        if frozen:
+            agent.freeze()
+        states = _synthetic(batch, seed)[0]
+        mask = np.ones((batch, agent.action_dim), dtype=bool)
+        n = max(1, 4096 // batch)
+
+        def run():
+            for _ in range(n):
+                agent.select_actions(states, mask)
+            return n * batch
+        return run
+    return setup
+
+
+def dqn_train(chunk, batch_size=32, capacity=20_000):
+    """Gradient updates/s on a full buffer of synthetic states."""
+    def setup(seed):
+        import torch
+        from agent.dqn_agent import DQN_Agent
+        torch.manual_seed(seed)
+        agent = DQN_Agent(buffer_capacity=capacity, batch_size=batch_size, seed=seed)
+        states, actions, rewards, dones = _synthetic(capacity, seed)
+        for i in range(capacity):
+            agent.store_experience(states[i], actions[i], rewards[i], states[(i + 1) % capacity], dones[i])
+
+        def run(n=64):
+            for _ in range(n // chunk):
+                agent.train(n_updates=chunk)
+            return n
+        return run
+    return setup
+
+
+# ---- macro cases: run once, output of the loop swallowed ----
+def ev_by_tc_run_once(n_hands=5000):
+    def setup(seed):
+        from eval.ev_by_true_count import run_once
+        from config import EVAL_CKPT
+
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_once(n_hands=n_hands, ckpt=EVAL_CKPT, workers=1, seed=seed)
+            return n_hands
+        return run
+    return setup
+
+
+def train_dqn_loop(n_episodes=3000):
+    """The single-process training loop from scratch; updates start once the buffer passes 1500."""
+    def setup(seed):
+        from train.train_dqn import train
+
+        def run():
+            with tempfile.TemporaryDirectory() as out_dir, contextlib.redirect_stdout(io.StringIO()):
+                train(n_episodes, init_ckpt=None, out_dir=out_dir, seed=seed,
+                      ckpt_freq=n_episodes + 1, eval_hands=0)
+            return n_episodes
+        return run
+    return setup
+
+
+# (name, kind, unit, setup)
+CASES = [
+    ("env.reset", "micro", "resets", env_reset),
+    ("env.step", "micro", "steps", env_step),
+    ("env.get_state", "micro", "calls", env_get_state),
+    ("payout.settle", "micro", "rounds", payout_settle),
+]
+for _capacity in CAPACITIES:
+    CASES += [
+        (f"replay.add/{_capacity}", "micro", "transitions", replay_add(_capacity)),
+        (f"replay.sample/{_capacity}", "micro", "batches", replay_sample(_capacity, weighted=False)),
+        (f"replay.sample_weighted/{_capacity}", "micro", "batches", replay_sample(_capacity, weighted=True)),
+    ]
+CASES += [
+    ("dqn.forward.torch/b1", "micro", "states", dqn_forward(1, frozen=False)),
+    ("dqn.forward.torch/b1024", "micro", "states", dqn_forward(1024, frozen=False)),
+    ("dqn.forward.frozen/b1", "micro", "states", dqn_forward(1, frozen=True)),
+    ("dqn.forward.frozen/b1024", "micro", "states", dqn_forward(1024, frozen=True)),
+    ("dqn.train/b32", "micro", "updates", dqn_train(chunk=1)),
+    ("dqn.train/b32x16", "micro", "updates", dqn_train(chunk=16)),
+    ("ev_by_tc.run_once", "macro", "hands", ev_by_tc_run_once()),
+    ("train_dqn.train", "macro", "episodes", train_dqn_loop()),
+]
+
+
+def measure(setup, seed, repeat, min_time, warmup=True):
+    """Best and all sample rates (units/s) of the case, after one untimed run if warmup."""
+    run = setup(seed)
+    if warmup:
+        run()
+    rates = []
+    for _ in range(repeat):
+        units, seconds = 0, 0.0
+        while not units or seconds < min_time:
+            start = time.perf_counter()
+            out = run()
+            elapsed = time.perf_counter() - start
+            if isinstance(out, tuple):
+                out, elapsed = out
+            units += out
+            seconds += elapsed
+        rates.append(units / seconds)
+    return max(rates), rates
+
+
+def machine():
+    import torch
+    return {"python": platform.python_version(), "numpy": np.__version__, "torch": torch.__version__,
+            "torch_threads": torch.get_num_threads(), "platform": platform.platform(),
+            "cpu_count": os.cpu_count()}
+
+
+def compare(results, baseline, tolerance):
+    """name -> rate / baseline rate for cases in both; the slow ones are regressions."""
+    ratios = {}
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base and base.get("rate"):
+            ratios[name] = result["rate"] / base["rate"]
+    regressions = [name for name, ratio in ratios.items() if ratio < 1.0 - tolerance]
+    return ratios, regressions
+
+
+def run_suite(patterns=None, kinds=("micro", "macro"), seed=SEED, repeat=3, min_time=0.5):
+    results = {}
+    for name, kind, unit, setup in CASES:
+        if kind not in kinds or (patterns and not any(fnmatch.fnmatch(name, p) for p in patterns)):
+            continue
+        if kind == "macro":
+            best, rates = measure(setup, seed, 1, 0.0, warmup=False)
+        else:
+            best, rates = measure(setup, seed, repeat, min_time)
+        results[name] = {"kind": kind, "unit": unit, "rate": best, "samples": rates}
+        print(f"{name:<34} {best:>14,.1f} {unit}/s", flush=True)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Seeded micro/macro benchmarks against a stored baseline.")
+    parser.add_argument("--only", nargs="+", metavar="PATTERN", help='glob(s) on case names, e.g. "env.*"')
+    kind = parser.add_mutually_exclusive_group()
+    kind.add_argument("--micro", action="store_true", help="micro cases only")
+    kind.add_argument("--macro", action="store_true", help="macro cases only")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--repeat", type=int, default=3, help="samples per micro case (best is kept)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per micro sample")
+    parser.add_argument("--json", metavar="PATH", help="write the results here")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.15, help="slowdown flagged as a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="merge these results into --baseline")
+    parser.add_argument("--strict", action="store_true", help="exit 1 on any regression")
+    args = parser.parse_args()
+
+    kinds = ("micro",) if args.micro else ("macro",) if args.macro else ("micro", "macro")
+    meta = {"date": datetime.now(timezone.utc).isoformat(timespec="seconds"), "seed": args.seed,
+            "repeat": args.repeat, "min_time": args.min_time, **machine()}
+    print(f"python {meta['python']}, numpy {meta['numpy']}, torch {meta['torch']} "
+          f"({meta['torch_threads']} threads), {meta['cpu_count']} cpus, seed {args.seed}\n")
+    results = run_suite(args.only, kinds, args.seed, args.repeat, args.min_time)
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        ratios, regressions = compare(results, baseline, args.tolerance)
+        print(f"\nvs {args.baseline} ({baseline['meta']['date']}), tolerance {args.tolerance:.0%}")
+        for name, ratio in ratios.items():
+            flag = "  REGRESSION" if name in regressions else ""
+            print(f"{name:<34} {ratio:>7.2f}x{flag}")
+    else:
+        print(f"\nno baseline at {args.baseline}")
+
+    record = {"meta": meta, "results": results, "regressions": regressions}
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(record, f, indent=1)
+        print(f"results written to {args.json}")
+    if args.save_baseline:
+        # cases not run this time keep their old baseline entry
+        old = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                old = json.load(f).get("results", {})
+        with open(args.baseline, "w") as f:
+            json.dump({"meta": meta, "results": {**old, **results}}, f, indent=1)
+        print(f"baseline saved to {args.baseline}")
+    if args.strict and regressions:
+        sys.exit(1)
@@ -0,0 +1,57 @@
+"""
+DQN_Agent.train() throughput on CPU by batch size, one update per call vs
+fused chunks (n_updates batches sampled in one draw, updates run back to back),
+on a full buffer of synthetic 17-dim states. Prints gradient updates/sec and
+transitions/sec (updates * batch). Run from the repo root:
+  python -m bench.bench_train
+  python -m bench.bench_train --batch-sizes 32 256 --chunk 8 --prioritized
+"""
+import time
+import numpy as np
+import torch
+from agent.dqn_agent import DQN_Agent
+
+
+def filled_agent(batch_size, capacity=150_000, state_dim=17, prioritized=False, seed=0):
+    agent = DQN_Agent(buffer_capacity=capacity, batch_size=batch_size, prioritized=prioritized, seed=seed)
+    rng = np.random.default_rng(seed)
+    states = rng.random((capacity, state_dim), dtype=np.float32)
+    states[:, -1] = rng.normal(0, 2.5, capacity)
+    actions = rng.integers(0, 4, capacity)
+    rewards = rng.normal(0, 1, capacity).astype(np.float32)
+    dones = rng.random(capacity) < 0.5
+    for i in range(capacity):
+        agent.store_experience(states[i], actions[i], rewards[i], states[(i + 1) % capacity], dones[i])
+    return agent
+
+
+def updates_per_sec(agent, n_updates, seconds=1.5):
+    agent.train(n_updates=n_updates)   # warm up
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        agent.train(n_updates=n_updates)
+        done += n_updates
+    return done / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="DQN update throughput by batch size.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[32, 64, 128, 256, 512, 1024, 2048, 4096])
+    parser.add_argument("--chunk", type=int, default=16, help="updates per fused train() call")
+    parser.add_argument("--seconds", type=float, default=1.5, help="time per measurement")
+    parser.add_argument("--prioritized", action="store_true")
+    args = parser.parse_args()
+
+    print(f"torch {torch.__version__}, {torch.get_num_threads()} threads, "
+          f"{'PER' if args.prioritized else 'TC-weighted'} sampling")
+    print(f"{'batch':>6} {'updates/s':>10} {'samples/s':>11}   {f'chunk {args.chunk}: updates/s':>20} "
+          f"{'samples/s':>11} {'speedup':>8}")
+    agent = filled_agent(args.batch_sizes[0], prioritized=args.prioritized)
+    for batch_size in args.batch_sizes:
+        agent.batch_size = batch_size
+        single = updates_per_sec(agent, 1, args.seconds)
+        fused = updates_per_sec(agent, args.chunk, args.seconds)
+        print(f"{batch_size:>6} {single:>10,.0f} {single * batch_size:>11,.0f}   {fused:>20,.0f} "
+              f"{fused * batch_size:>11,.0f} {fused / single:>7.2f}x")
@@ -0,0 +1,77 @@
+"""
+Hands/sec of VecBlackjackEnv vs BlackjackEnv under a random legal policy, after
+checking that both envs agree step-for-step when dealt the same shoes.
+Run from the repo root:  python -m bench.bench_vec_env
+"""
+import random
+import time
+import numpy as np
+from env.blackjackEnv import BlackjackEnv
+from env.vecBlackjackEnv import VecBlackjackEnv
+
+
+def check_against_scalar(n_shoes=300, seed=0):
+    """Same shoe + same actions -> same states, rewards and payouts."""
+    rng = random.Random(seed)
+    for _ in range(n_shoes):
+        deck = ["A", 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10] * 4 * 6
+        rng.shuffle(deck)
+        env = BlackjackEnv()
+        env.deck = deck.copy()
+        vec = VecBlackjackEnv(1, autoreset=False)
+        vec.set_shoe(0, deck)
+
+        while len(env.deck) > env.penetration * 52 * env.num_deck:
+            state = env.reset()
+            env.set_bet(10)
+            vstate = vec.reset()
+            assert np.allclose(state, vstate[0], atol=1e-5), (state, vstate[0])
+            done = False
+            while not done:
+                legal = env.legal_actions()
+                assert legal == list(np.flatnonzero(vec.legal_actions_mask()[0]))
+                action = rng.choice(legal)
+                state, reward, done, msg = env.step(action)
+                vstate, vreward, vdone, info = vec.step([action])
+                assert done == vdone[0] and np.isclose(reward, vreward[0]), (reward, vreward, msg)
+                vstate = info["final_states"] if done else vstate
+                assert np.allclose(state, vstate[0], atol=1e-5), (state, vstate[0])
+            tracker = env.payout_tracker.get_info()
+            assert np.isclose(tracker["net_result"], info["net_result"][0])
+            assert np.isclose(tracker["total_bet"], info["total_bet"][0])
+            assert tracker["hands_played"] == info["hands_played"][0]
+
+
+def scalar_hands_per_sec(n_hands=20_000, seed=0):
+    random.seed(seed)
+    env = BlackjackEnv()
+    start = time.perf_counter()
+    for _ in range(n_hands):
+        env.reset()
+        env.set_bet(10)
+        while not env.done:
+            env.step(random.choice(env.legal_actions()))
+    return n_hands / (time.perf_counter() - start)
+
+
+def vec_hands_per_sec(num_envs, n_steps=500, seed=0):
+    rng = np.random.default_rng(seed)
+    vec = VecBlackjackEnv(num_envs, seed=seed)
+    vec.reset()
+    hands = 0
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        mask = vec.legal_actions_mask()
+        # random legal action per table: argmax of noise over the legal entries
+        actions = np.where(mask, rng.random(mask.shape), -1.0).argmax(axis=1)
+        _, _, dones, _ = vec.step(actions)
+        hands += int(dones.sum())
+    return hands / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    check_against_scalar()
+    print("VecBlackjackEnv matches BlackjackEnv on identical shoes")
+    print(f"{'BlackjackEnv':>22}: {scalar_hands_per_sec():12,.0f} hands/sec")
+    for n in (64, 1024, 8192):
+        print(f"{f'VecBlackjackEnv N={n}':>22}: {vec_hands_per_sec(n):12,.0f} hands/sec")
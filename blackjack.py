@@ -0,0 +1,263 @@
+"""
+One entry point for the training, evaluation and benchmark workflows.
+Defaults come from config.py; every subcommand accepts overrides and, with
+--json PATH, writes {"command", "args", "started", "elapsed_s", "result"} so
+sweeps can be scripted and compared. From the repo root:
+
+  python -m blackjack train-play --episodes 50000 --replay-ratio 0.5 --seed 1
+  python -m blackjack train-play --backend actors --actors 3 --grad-steps 200000
+  python -m blackjack train-bet --episodes 100000 --seed 1
+  python -m blackjack train-bet --backend vec --episodes 300000 --epochs 20
+  python -m blackjack eval checkpoints/count_weighted/blackjack_dqn_ep100000.pth --backend vec --json out.json
+  python -m blackjack eval solver --hands 20000 --backend pool --workers 4
+  python -m blackjack ev-by-tc --runs 3 --vr
+  python -m blackjack bankroll --rounds 500000 --bet-ckpt checkpoints/betting/bet_dqn.pth
+  python -m blackjack bench inference -- --batch 1024
+  python -m blackjack --json runs/bench.json bench suite -- --micro --strict
+  python -m blackjack --profile runs/profile.json train-play --episodes 20000
+
+Backends: single (one process), pool (eval/runner.py process pool),
+vec (VecBlackjackEnv, batched policy calls; for train-bet, train/train_betting_vec.py),
+actors (train/actor_learner.py).
+--profile PATH times the hot paths of this process (utils/profiler.py) and
+writes the phase breakdown and throughput there; the training loops also
+print it every PRINT_FREQ episodes.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import config
+from utils import profiler
+
+BENCHES = ["env", "vec_env", "replay_buffer", "train", "inference", "startup", "suite"]
+
+
+def _jsonable(obj):
+    """numpy scalars/arrays, tuples and non-str keys -> plain JSON types."""
+    if isinstance(obj, dict):
+        return {str(k): _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if isinstance(obj, float) and obj != obj:
+        return None
+    return obj
+
+
+def _eval_summary(stats):
+    from eval.runner import mean_ci, ev_by_bin
+    n = stats["episodes"]
+    ev, ci = mean_ci(n, stats["pnl"], stats["pnl_sq"])
+    summary = {"ev_per_round": ev, "ci95": ci, "ev_per_hand": stats["pnl"] / max(1, stats["hands"]),
+               "by_tc": {b: {"ev": e, "ci95": c, "n": k} for b, (e, c, k) in ev_by_bin(stats).items()}}
+    if stats["decisions"]:
+        regret, regret_ci = mean_ci(stats["decisions"], stats["regret"], stats["regret_sq"])
+        summary.update(regret=regret, regret_ci95=regret_ci, mistake_rate=stats["mistakes"] / stats["decisions"])
+    return summary
+
+
+# ---- subcommands: each returns the JSON-able result ----
+def cmd_train_play(args):
+    if args.backend == "actors":
+        from train.actor_learner import train
+        agent = train(args.actors, args.grad_steps, args.init, args.out, args.seed,
+                      buffer_capacity=args.buffer_capacity, batch_size=args.batch_size, gamma=args.gamma,
+                      lr=args.lr, prioritized=args.prioritized)
+        return {"checkpoints": [args.out] if args.out else [], "train_steps": agent.train_step}
+    from train.train_dqn import train
+    return train(args.episodes, args.init, args.out_dir, args.seed, args.replay_ratio, args.update_chunk,
+                 args.n_step, args.batch_size, args.prioritized, args.lr, args.gamma,
+                 buffer_capacity=args.buffer_capacity, ckpt_freq=args.ckpt_freq, eval_hands=args.eval_hands)
+
+
+def cmd_train_bet(args):
+    if args.backend == "vec":
+        from train.train_betting_vec import train_betting_agent_vec
+        return train_betting_agent_vec(args.episodes, args.play_ckpt, args.out, args.seed, args.envs,
+                                       args.epochs, args.batch_size, args.lr, args.reward, args.targets)
+    from train.train_betting_dqn import train_betting_agent
+    return train_betting_agent(args.episodes, args.play_ckpt, args.out, args.seed,
+                               all_bets=args.targets == "all")
+
+
+def cmd_eval(args):
+    from eval import runner
+    ev_cache = args.ev_cache or None
+    if args.compare:
+        stats = runner.compare(args.ckpt, args.compare, args.hands, args.workers, args.seed, args.disable_split)
+        runner.report_paired(stats, args.ckpt, args.compare)
+        n = stats["pairs"]
+        diff, ci = runner.mean_ci(n, stats["diff"], stats["diff_sq"])
+        return {"stats": stats, "diff_per_round": diff, "diff_ci95": ci}
+    if args.vr:
+        stats = runner.evaluate_vr(args.ckpt, args.hands, args.workers, args.seed, ev_cache=ev_cache)
+        runner.report_vr(stats)
+        ev, se = runner.stratified_ev(stats)
+        by_tc = {b: {"ev": e, "ci95": runner.Z95 * s, "n": k}
+                 for b, (e, s, k, _, _) in runner.vr_by_bin(stats).items()}
+        return {"stats": stats, "ev_per_round": ev, "ci95": runner.Z95 * se, "by_tc": by_tc}
+    if args.backend == "vec":
+        stats = runner.evaluate_vec(args.ckpt, args.hands, args.seed, args.disable_split, n_envs=args.envs)
+    else:
+        workers = 1 if args.backend == "single" else args.workers
+        stats = runner.evaluate(args.ckpt, args.hands, workers, args.seed, args.disable_split,
+                                regret=args.regret, ev_cache=ev_cache)
+    runner.report(stats)
+    return {"stats": stats, **_eval_summary(stats)}
+
+
+def cmd_ev_by_tc(args):
+    from eval.ev_by_true_count import main
+    workers = 1 if args.backend == "single" else args.workers
+    return main(args.vr, args.hands, args.ckpt, args.runs, workers)
+
+
+def cmd_bankroll(args):
+    from eval.bankroll_sim import run
+    return run(args.play_ckpt, args.rounds, args.seed, args.bet_ckpt, args.bankroll, args.session, args.envs)
+
+
+def cmd_bench(args):
+    import contextlib
+    import io
+    import runpy
+
+    out = io.StringIO()
+
+    class Tee(io.TextIOBase):
+        def write(self, text):
+            sys.__stdout__.write(text)
+            return out.write(text)
+
+    argv = sys.argv
+    sys.argv = [f"bench.bench_{args.name}"] + [a for a in args.bench_args if a != "--"]
+    exit_code = 0
+    try:
+        with contextlib.redirect_stdout(Tee()):
+            runpy.run_module(f"bench.bench_{args.name}", run_name="__main__", alter_sys=True)
+    except SystemExit as e:    # e.g. bench_suite --strict on a regression: still write the record
+        exit_code = 0 if e.code is None else (e.code if isinstance(e.code, int) else 1)
+    finally:
+        sys.argv = argv
+    return {"bench": args.name, "argv": args.bench_args, "output": out.getvalue().splitlines(),
+            "exit_code": exit_code}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m blackjack", description=__doc__.split("\n\n")[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", metavar="PATH", help="write the run record and result as JSON")
+    parser.add_argument("--profile", metavar="PATH", help="time the hot paths, write the breakdown as JSON")
+    sub = parser.add_subparsers(dest="command", required=True)
+    workers = os.cpu_count() or 1
+
+    p = sub.add_parser("train-play", help="train the playing DQN")
+    p.add_argument("--backend", choices=["single", "actors"], default="single")
+    p.add_argument("--episodes", type=int, default=config.PLAY_EPISODES, help="single backend")
+    p.add_argument("--grad-steps", type=int, default=200_000, help="actors backend")
+    p.add_argument("--actors", type=int, default=max(1, workers - 1), help="actors backend")
+    p.add_argument("--init", default=config.PLAY_INIT_CKPT, help='checkpoint to start from, "" for none')
+    p.add_argument("--out-dir", default=config.PLAY_CKPT_DIR, help="single backend checkpoints")
+    p.add_argument("--out", default="checkpoints/actor_learner/blackjack_dqn.pth", help="actors backend checkpoint")
+    p.add_argument("--ckpt-freq", type=int, default=50_000)
+    p.add_argument("--eval-hands", type=int, default=200_000, help="EV by TC per checkpoint, 0 to skip")
+    p.add_argument("--replay-ratio", type=float, default=config.REPLAY_RATIO)
+    p.add_argument("--update-chunk", type=int, default=config.UPDATE_CHUNK)
+    p.add_argument("--n-step", type=int, default=config.N_STEP)
+    p.add_argument("--batch-size", type=int, default=config.PLAY_BATCH_SIZE)
+    p.add_argument("--buffer-capacity", type=int, default=config.PLAY_BUFFER_CAPACITY)
+    p.add_argument("--lr", type=float, default=config.PLAY_LR)
+    p.add_argument("--gamma", type=float, default=config.PLAY_GAMMA)
+    p.add_argument("--prioritized", action="store_true", default=config.PRIORITIZED_REPLAY)
+    p.add_argument("--seed", type=int, default=None)
+    p.set_defaults(func=cmd_train_play)
+
+    p = sub.add_parser("train-bet", help="train the betting DQN")
+    p.add_argument("--backend", choices=["single", "vec"], default="single")
+    p.add_argument("--episodes", type=int, default=config.NUM_EPISODES, help="rounds for the vec backend")
+    p.add_argument("--play-ckpt", default=config.BET_PLAYER_CKPT)
+    p.add_argument("--out", default=config.BETTING_MODEL_PATH)
+    p.add_argument("--envs", type=int, default=1024, help="vec backend tables")
+    p.add_argument("--epochs", type=int, default=20, help="vec backend passes over the rounds")
+    p.add_argument("--batch-size", type=int, default=4096, help="vec backend")
+    p.add_argument("--lr", type=float, default=0.0005, help="vec backend")
+    p.add_argument("--reward", choices=["shaped", "outcome"], default="shaped", help="vec backend")
+    p.add_argument("--targets", choices=["all", "sampled"], default="all" if config.BET_ALL_SIZES else "sampled",
+                   help="learn every bet size's reward per hand, or only the bet placed")
+    p.add_argument("--seed", type=int, default=None)
+    p.set_defaults(func=cmd_train_bet)
+
+    p = sub.add_parser("eval", help="flat-bet evaluation of a playing policy")
+    p.add_argument("ckpt", nargs="?", default=config.EVAL_CKPT, help='.pth, .npz or "solver"')
+    p.add_argument("--backend", choices=["single", "pool", "vec"], default="pool")
+    p.add_argument("--hands", type=int, default=200_000)
+    p.add_argument("--workers", type=int, default=workers, help="pool backend")
+    p.add_argument("--envs", type=int, default=1024, help="vec backend tables")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--disable-split", action="store_true")
+    p.add_argument("--regret", action="store_true", help="score every decision against the solver")
+    p.add_argument("--ev-cache", default="checkpoints/cache/ev_cache.sqlite", help='single/pool backends and --vr; "" to disable')
+    p.add_argument("--compare", metavar="CKPT_B", help="paired comparison on common shoes")
+    p.add_argument("--vr", action="store_true", help="variance-reduced EV by TC bin")
+    p.set_defaults(func=cmd_eval)
+
+    p = sub.add_parser("ev-by-tc", help="EV per hand by pre-deal true count over several seeds")
+    p.add_argument("ckpt", nargs="?", default=config.EVAL_CKPT)
+    p.add_argument("--backend", choices=["single", "pool"], default="pool")
+    p.add_argument("--hands", type=int, default=None, help=f"per run; {config.EV_BY_TC_HANDS:,} or 22k with --vr")
+    p.add_argument("--runs", type=int, default=config.EV_BY_TC_RUNS)
+    p.add_argument("--workers", type=int, default=workers, help="pool backend")
+    p.add_argument("--vr", action="store_true")
+    p.set_defaults(func=cmd_ev_by_tc)
+
+    p = sub.add_parser("bankroll", help="betting policies and bankroll risk on one recorded hand stream")
+    p.add_argument("--play-ckpt", default=config.BET_PLAYER_CKPT)
+    p.add_argument("--bet-ckpt", nargs="*", default=[config.BETTING_MODEL_PATH], help="Betting_Agent checkpoints")
+    p.add_argument("--rounds", type=int, default=500_000)
+    p.add_argument("--bankroll", type=float, default=config.INITIAL_BANKROLL)
+    p.add_argument("--session", type=int, default=10_000, help="rounds per bankroll session")
+    p.add_argument("--envs", type=int, default=1024)
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=cmd_bankroll)
+
+    p = sub.add_parser("bench", help="run one of the bench/ scripts")
+    p.add_argument("name", choices=BENCHES)
+    p.add_argument("bench_args", nargs=argparse.REMAINDER, help="passed on, after --")
+    p.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "eval" and args.backend == "vec" and args.regret:
+        parser.error("eval: --regret needs the single or pool backend (the vec backend plays without the solver)")
+    if getattr(args, "init", None) == "":
+        args.init = None
+    if args.command == "ev-by-tc" and args.hands is None and not args.vr:
+        args.hands = config.EV_BY_TC_HANDS
+    started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    start = time.perf_counter()
+    with profiler.profiling(args.profile):
+        result = args.func(args)
+    elapsed = time.perf_counter() - start
+    print(f"\n{args.command} done in {elapsed:.1f}s")
+    if args.json:
+        record = {"command": args.command,
+                  "args": {k: v for k, v in vars(args).items() if k not in ("func", "json")},
+                  "started": started, "elapsed_s": elapsed, "result": result}
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(_jsonable(record), f, indent=1)
+        print(f"results written to {args.json}")
+    return result
+
+
+if __name__ == "__main__":
+    result = main()
+    sys.exit(result.get("exit_code", 0) if isinstance(result, dict) else 0)
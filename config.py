@@ -9,7 +9,7 @@ MIN_BET = BET_SIZES[0] * UNIT
 MAX_BET = BET_SIZES[-1] * UNIT
 
 # === TRAINING PARAMETERS ===
-NUM_EPISODES = 50000      # Number of hands for training betting agent
+NUM_EPISODES = 300_000    # Number of hands for training betting agent
 TARGET_UPDATE_FREQ = 1000 # Steps to update target network
 PRINT_FREQ = 1000         # Episodes between printing progress
 BATCH_SIZE = 32           # Replay buffer batch size
@@ -20,10 +20,33 @@ EPSILON_START = 1.0       # Start exploration rate
 EPSILON_END = 0.1         # Min exploration rate
 EPSILON_DECAY = 0.995     # Epsilon decay factor
 
+# === PLAYING AGENT TRAINING (train/train_dqn.py) ===
+PLAY_EPISODES = 100_000
+PLAY_EPSILON_START = 0.20
+PLAY_EPSILON_MIN = 0.05
+PLAY_EPSILON_DECAY = 0.9999   # per episode
+PLAY_GAMMA = 0.95
+PLAY_LR = 1e-4
+PLAY_BUFFER_CAPACITY = 150_000
+PLAY_BATCH_SIZE = 32
+PRIORITIZED_REPLAY = False
+REPLAY_RATIO = 1.0            # gradient updates per env step
+UPDATE_CHUNK = 1              # updates per fused agent.train() call
+N_STEP = 1                    # n-step returns
+PLAY_INIT_CKPT = "checkpoints/count_aware/blackjack_dqn_ep400000.pth"
+PLAY_CKPT_DIR = "checkpoints/count_weighted"
+
 # === EVALUATION PARAMETERS ===
 INITIAL_BANKROLL = 100_000  # Starting bankroll in dollars
 EVAL_HANDS = 20_000      # Hands to play during evaluation
+EVAL_CKPT = "checkpoints/count_weighted/blackjack_dqn_ep100000.pth"
+EV_BY_TC_HANDS = 200_000  # per run
+EV_BY_TC_RUNS = 5
+
+# === BETTING AGENT TRAINING ===
+BET_ALL_SIZES = True   # a bet only scales the hand: learn every bet size's reward from each hand played
 
 # === FILE PATHS ===
 PLAYING_MODEL_PATH = "checkpoints/playing/dqn_model.pth"
-BETTING_MODEL_PATH = "checkpoints/betting/bet_dqn.pth"
\ No newline at end of file
+BETTING_MODEL_PATH = "checkpoints/betting/bet_dqn.pth"
+BET_PLAYER_CKPT = "checkpoints/count_weighted/blackjack_dqn_ep100000.pth"   # plays the hands while betting trains
\ No newline at end of file
@@ -1,5 +1,6 @@
-import random
+import numpy as np
 from .payoutTrackerEnv import PayoutTracker as PT
+from .shoe import CARDS, Hand, Shoe
 
 class BlackjackEnv:
     BLACKJACK = [10, "A"]
@@ -9,8 +10,12 @@ class BlackjackEnv:
     SPLIT_REWARD_MODE = "sum_clip"
     SPLIT_CLIP = 2.0     # for "sum_clip": clamp [-2, +2]
     SPLIT_TAU  = 2.0     # for "sum_tanh": tanh(sum/τ)*τ
+    # Hi-Lo tag per card value (index = value - 2, Ace is 11)
+    HI_LO = [1, 1, 1, 1, 1, 0, 0, 0, -1, -1]
 
-    def __init__(self):
+    def __init__(self, seed=None):
+        # every shuffle draws from this Generator; seed: int, SeedSequence, Generator or None
+        self.rng = np.random.default_rng(seed)
         self.deck = []
         self.player_hand = []
         self.dealer_hand = []
@@ -22,13 +27,20 @@ class BlackjackEnv:
         self.penetration = 0.25
         self.num_deck = 6
 
+        # live shoe composition, kept in sync with self.deck on every draw
+        self.rank_counts = [0] * 10   # cards left per value 2..11 (11 = Ace)
+        self.running_count = 0        # Hi-Lo count of the cards already dealt
+        self.counted_cards = 0        # len(self.deck) the counts were taken at
+        self.forced_deck = False      # set_deck(): skip the reshuffle check once
+
         self.reset()       # Start new round
     
     def reset(self):
         """Starts a new round: shuffle deck, deal 2 cards each."""
         self.deck = self.create_deck()
-        self.player_hand = [self.deck.pop(), self.deck.pop()]
-        self.dealer_hand = [self.deck.pop(), self.deck.pop()]
+        self.round_tc = self.true_count()   # the shoe this round is dealt from, after any reshuffle
+        self.player_hand = Hand([self.draw_card(), self.draw_card()])
+        self.dealer_hand = Hand([self.draw_card(), self.draw_card()])
         self.player_hands = [self.player_hand]   # <-- keep list in sync from the start
         self.done = False  # Game just started, not done yet
         self.splits_number = 0
@@ -42,15 +54,78 @@ class BlackjackEnv:
         self.payout_tracker = PT(bet)
     
     def create_deck(self):
+        self.sync_counts()
+        if self.forced_deck:
+            self.forced_deck = False
+            return self.deck
         if len(self.deck) <= (self.penetration* 52 * self.num_deck):
-            deck = ["A",2,3,4,5,6,7,8,9,10,10,10,10] * 4 
-            deck = self.num_deck*deck
-            random.shuffle(deck)
-            return deck
+            if self.deck.size != 52 * self.num_deck:
+                self.deck = Shoe(self.num_deck)
+            self.deck.shuffle(self.rng)   # in place, cursor back to the top
+            self.recount()
+        return self.deck
+
+    def set_deck(self, deck):
+        """
+        Force the cards for the next reset(), list style: dealt from the END,
+        "A" for Ace, or a Shoe dealt from its cursor. The deck is used as-is
+        even if it is below the cut card.
+        """
+        self.deck = deck if isinstance(deck, Shoe) else Shoe.from_list(deck)
+        self.recount()
+        self.forced_deck = True
+
+    def copy_shoe_from(self, other):
+        """
+        Take over `other`'s shoe (cards, position, counts) and shuffle RNG state,
+        so the next reset() deals exactly what `other`'s would. Used to play two
+        policies on identical shoes (common random numbers).
+        """
+        other.sync_counts()
+        if not isinstance(self.deck, Shoe) or self.deck.size != other.deck.size:
+            self.deck = Shoe(cards=other.deck.cards)
         else:
-            return self.deck
+            self.deck.cards[:] = other.deck.cards
+        self.deck.cursor = other.deck.cursor
+        self.rank_counts = list(other.rank_counts)
+        self.running_count = other.running_count
+        self.counted_cards = other.counted_cards
+        self.forced_deck = other.forced_deck
+        self.rng.bit_generator.state = other.rng.bit_generator.state
+
+    def recount(self):
+        """Rebuild the live composition from scratch (fresh shoe or forced deck)."""
+        counts = [0] * 10
+        for value in self.deck.cards[self.deck.cursor:]:
+            counts[value - 2] += 1
+        self.rank_counts = counts
+        self.running_count = -sum(c * t for c, t in zip(counts, self.HI_LO))
+        self.counted_cards = len(self.deck)
+
+    def sync_counts(self):
+        """
+        Adopt a deck replaced from outside: plain lists (the old API) are
+        wrapped in a Shoe, and the counts are rebuilt if they went stale.
+        """
+        if not isinstance(self.deck, Shoe):
+            self.deck = Shoe.from_list(self.deck)
+            self.recount()
+        elif self.counted_cards != len(self.deck):
+            self.recount()
+
+    def draw_card(self):
+        """Take the next card and update the live counts in O(1)."""
+        if type(self.deck) is not Shoe:
+            self.sync_counts()
+        v = self.deck.draw()
+        self.rank_counts[v - 2] -= 1
+        self.running_count += self.HI_LO[v - 2]
+        self.counted_cards -= 1
+        return CARDS[v]
     
     def calculate_hand_value(self, hand):
+        if isinstance(hand, Hand):
+            return hand.value
         score = 0
         aces = 0
         for card in hand:
@@ -67,63 +142,58 @@ class BlackjackEnv:
         return score
     
     def get_deck_distribution(self, betting=False):
-        total_cards = len(self.deck)
-        counts = {i: 0 for i in range(2, 12)}  # 2-10, 11 for Ace
-
-        for card in self.deck:
-            val = 11 if card == 'A' else card
-            counts[val] += 1
-
-        percentages = [counts[i] / total_cards for i in range(2, 12)]
+        """Answered from the live counts kept by draw_card(), no shoe scan."""
+        self.sync_counts()
+        total_cards = self.counted_cards
+        percentages = [c / total_cards for c in self.rank_counts]
 
         # Running count: Hi-Lo system
-        running_count = -(
-            sum(counts[i] for i in [2, 3, 4, 5, 6])  # Low cards = +1
-            - sum(counts[i] for i in [10, 11])       # High cards = -1
-        )
+        running_count = self.running_count
 
         decks_remaining = total_cards / 52
-        true_count = running_count / decks_remaining if decks_remaining > 0 else 0
+        true_count = self.true_count()
 
         return percentages + betting*[running_count, true_count, decks_remaining, total_cards]
 
+    def true_count(self):
+        """Hi-Lo true count of the cards left in the shoe."""
+        decks_remaining = self.counted_cards / 52
+        return self.running_count / decks_remaining if decks_remaining > 0 else 0
+
     def get_state(self):
         """This is usually called after .reset() or a game finishing
         therefore the cards have been dealt already 
 
         We aim to return the player score, soft status, and dealer value
         Along with the percentages of the card left in the deck"""
-        score = 0
-        aces = 0
-        for card in self.player_hand:
-            if card == "A":
-                score += 11
-                aces += 1
-            else:
-                score += card
-        
-        while score > 21 and aces:
-            score -= 10
-            aces -= 1
-        is_soft = 1 if aces > 0 else 0
+        hand = self.player_hand
+        if not isinstance(hand, Hand):
+            hand = Hand(hand)
+        score = hand.value
+        is_soft = 1 if hand.is_soft else 0
 
         dealer_upcard = self.dealer_hand[0]
         dealer_value = 11 if dealer_upcard == "A" else dealer_upcard
 
-        percentages = self.get_deck_distribution()
-        tc = self.get_deck_distribution(betting=True)[-3]  # True Count
+        distribution = self.get_deck_distribution(betting=True)
+        percentages = distribution[:10]
+        tc = distribution[-3]  # True Count
         tc = (max(-8, min(8, tc)) / 8.0)
 
         num_cards = len(self.player_hand)
-        can_split = 1 if len(self.player_hand)==2 and self.player_hand[1] == self.player_hand[0] else 0
+        can_split = 1 if hand.is_pair else 0
         can_double = 1 if len(self.player_hand)==2 else 0
 
         return [num_cards, score, is_soft, dealer_value, can_split, can_double] + percentages + [tc]
     
+    def is_natural(self, hand):
+        # two cards totalling 21 can only be 10 + A
+        return len(hand) == 2 and self.calculate_hand_value(hand) == 21
+
     def check_bust(self, hand):
         return self.calculate_hand_value(hand) > 21
     def add_card(self):
-        self.player_hand.append(self.deck.pop())
+        self.player_hand.append(self.draw_card())
 
     """
     ACTION 0: PLAYER CHOOSES TO HIT
@@ -144,7 +214,7 @@ class BlackjackEnv:
     """
     def dealer_hits(self):
         while self.calculate_hand_value(self.dealer_hand) < 17:
-            self.dealer_hand.append(self.deck.pop())
+            self.dealer_hand.append(self.draw_card())
 
     """
     ACTION 1: PLAYER CHOOSES TO STAND
@@ -194,8 +264,8 @@ class BlackjackEnv:
         self.payout_tracker.on_split_at(self.current_hand_index)
         self.split_active = True
         self.splits_number += 1
-        new_hand_1 = [self.player_hand[0], self.deck.pop()]
-        new_hand_2 = [self.player_hand[1], self.deck.pop()]
+        new_hand_1 = Hand([self.player_hand[0], self.draw_card()])
+        new_hand_2 = Hand([self.player_hand[1], self.draw_card()])
         
         try:
             self.player_hands.pop(self.current_hand_index)
@@ -243,8 +313,8 @@ class BlackjackEnv:
         self.done = True
 
         is_two = (len(self.player_hand) == 2)
-        is_natural = is_two and set(self.player_hand) == set(self.BLACKJACK)
-        dealer_natural = (len(self.dealer_hand) == 2 and set(self.dealer_hand) == set(self.BLACKJACK))
+        is_natural = is_two and player_total == 21
+        dealer_natural = self.is_natural(self.dealer_hand)
 
         if is_natural:
             if dealer_natural:
@@ -286,8 +356,8 @@ class BlackjackEnv:
 
                     player_total = self.calculate_hand_value(hand)
                     is_two = (len(hand) == 2)
-                    is_nat = is_two and set(hand) == set(self.BLACKJACK)
-                    dealer_nat = (len(self.dealer_hand) == 2 and set(self.dealer_hand) == set(self.BLACKJACK))
+                    is_nat = is_two and player_total == 21
+                    dealer_nat = self.is_natural(self.dealer_hand)
 
                     if is_nat:
                         # After split, blackjack = 21 pays 1:1 (push if dealer natural)
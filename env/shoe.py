@@ -0,0 +1,93 @@
+import random
+from array import array
+import numpy as np
+
+# card value (2..11, Ace = 11) -> card as the list API shows it
+CARDS = (None, None, 2, 3, 4, 5, 6, 7, 8, 9, 10, "A")
+
+
+class Shoe:
+    """
+    Preallocated int8 shoe read through a cursor: drawing is an index bump and
+    reshuffling shuffles the same buffer in place, nothing is rebuilt.
+    Cards are stored by value (Ace = 11).
+    """
+    def __init__(self, num_deck=6, cards=None):
+        if cards is None:
+            cards = [11, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10] * 4 * num_deck
+        self.cards = array('b', cards)
+        self.size = len(self.cards)
+        self.cursor = 0
+
+    @classmethod
+    def from_list(cls, deck):
+        """Adapter for list decks ("A" for Ace, dealt from the END like list.pop())."""
+        return cls(cards=[11 if card == "A" else card for card in reversed(deck)])
+
+    def shuffle(self, rng=None):
+        """In place; rng is a numpy Generator (the global `random` if None)."""
+        if rng is None:
+            random.shuffle(self.cards)
+        else:
+            rng.shuffle(np.frombuffer(self.cards, dtype=np.int8))   # a view, no copy
+        self.cursor = 0
+
+    def draw(self):
+        """Next card as its value (Ace = 11)."""
+        value = self.cards[self.cursor]
+        self.cursor += 1
+        return value
+
+    def pop(self):
+        """list.pop() stand-in: next card as the list API shows it."""
+        return CARDS[self.draw()]
+
+    def __len__(self):
+        return self.size - self.cursor
+
+    def __iter__(self):
+        # same order as the old list: bottom of the shoe first, next card last
+        for value in reversed(self.cards[self.cursor:]):
+            yield CARDS[value]
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class Hand(list):
+    """
+    A list of cards that also keeps (hard_total, aces, n_cards) up to date on
+    append, so value, soft status, natural and bust checks are O(1).
+    """
+    __slots__ = ("hard", "aces")
+
+    def __init__(self, cards=()):
+        super().__init__()
+        self.hard = 0   # Aces counted as 1
+        self.aces = 0
+        for card in cards:
+            self.append(card)
+
+    def append(self, card):
+        super().append(card)
+        if card == "A":
+            self.hard += 1
+            self.aces += 1
+        else:
+            self.hard += card
+
+    @property
+    def is_soft(self):
+        return self.aces > 0 and self.hard + 10 <= 21
+
+    @property
+    def value(self):
+        return self.hard + 10 if self.is_soft else self.hard
+
+    @property
+    def is_natural(self):
+        return len(self) == 2 and self.value == 21
+
+    @property
+    def is_pair(self):
+        return len(self) == 2 and self[0] == self[1]
@@ -11,7 +11,7 @@ def play_split_scenario(deck_sequence):
     """
     env = BlackjackEnv()
     # Override the shuffled deck with our forced sequence:
-    env.deck = deck_sequence.copy()
+    env.set_deck(deck_sequence)
     env.set_bet(10)
 
     # 1) Deal initial hands:
@@ -45,28 +45,14 @@ def play_split_scenario(deck_sequence):
     print(" Tracker:", env.payout_tracker.get_info(), "\n")
 
 if __name__ == "__main__":
-    # Build a deck sequence:
-    #   - Player: [8,8] → split allowed
-    #   - Dealer: [10,6]  (will stand on 16)
-    #   - After split: 
-    #       * Hand 1: draws [K] → busts (8+K=18? Actually not bust—so you might want two hits)
-    #         let’s force a bust: draw [K, 10] → 8+K+10=28
-    #       * Hand 2: draws [5] → final = 8+5=13, dealer 16 beats 13 → loss
-    #
-    # Deck pops in this order:
-    #   reset(): player [8,8], dealer [10,6] → remaining deck below
-    forced_deck = [
-        # remaining deck after initial deal:
-        # for Hand1: K, 10
-        10, 10,  
-        # for Hand2: 5
-        5,
-        # then dealer would hit? but dealer stays on 16 so no more cards
-    ]
-    # Prepend initial deal cards in reverse pop order:
-    # env.reset() pops last→first, so we need to reverse:
-    initial_cards = [6, 10, 8, 8]  
-    # full deck: bottom-of-deck first:
-    full_sequence = forced_deck + initial_cards[::-1]  
+    # Cards in the order they are dealt:
+    #   reset():  player [8,8], dealer [10,6]
+    #   split:    Hand1 draws 10 (18), Hand2 draws 5 (13)
+    #   Hand1:    hit draws 10 → 8+10+10=28 bust
+    #   Hand2:    stand on 13, dealer hits 16 with a 2 → 18 beats 13 → loss
+    #   + a few spare cards so get_state() never sees an empty shoe
+    dealt_order = [8, 8, 10, 6, 10, 5, 10, 2] + [9, 9, 9]
+    # set_deck() deals from the END of the list (like list.pop()), so reverse:
+    full_sequence = dealt_order[::-1]
     # now run:
-    play_split_scenario(full_sequence)
\ No newline at end of file
+    play_split_scenario(full_sequence)
@@ -0,0 +1,403 @@
+import numpy as np
+from .blackjackEnv import BlackjackEnv
+
+
+class VecBlackjackEnv:
+    """
+    N independent blackjack tables stepped together with NumPy.
+
+    Same rules as BlackjackEnv (splits up to ALLOWED_SPLITS, doubles, naturals pay 1.5,
+    21 on a split hand pays 1:1, dealer stands on all 17) and the same 17-dim state.
+    Cards are stored by value (2..11, Ace = 11); each shoe is a row of `shoe` read
+    front to back through `cursor`. Finished tables are reset automatically.
+    """
+    ALLOWED_SPLITS = BlackjackEnv.ALLOWED_SPLITS
+    SPLIT_REWARD_MODE = BlackjackEnv.SPLIT_REWARD_MODE
+    SPLIT_CLIP = BlackjackEnv.SPLIT_CLIP
+    SPLIT_TAU = BlackjackEnv.SPLIT_TAU
+    HI_LO = np.array(BlackjackEnv.HI_LO, dtype=np.int64)
+    STATE_DIM = 17
+    DECK_DIM = 14   # get_deck_distribution(betting=True)
+
+    def __init__(self, num_envs, num_deck=6, penetration=0.25, seed=None, autoreset=True):
+        self.num_envs = num_envs
+        self.num_deck = num_deck
+        self.penetration = penetration
+        self.autoreset = autoreset
+        self.rng = np.random.default_rng(seed)
+
+        one_deck = [11, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10] * 4
+        self.base_shoe = np.array(one_deck * num_deck, dtype=np.int8)
+        self.shoe_size = self.base_shoe.size
+        self.cut = penetration * 52 * num_deck   # reshuffle at or below this many cards
+
+        n, h = num_envs, self.ALLOWED_SPLITS + 1
+        self.max_hands = h
+        self.shoe = np.zeros((n, self.shoe_size), dtype=np.int8)
+        self.cursor = np.full(n, self.shoe_size, dtype=np.int64)   # empty -> shuffled on reset
+        self.rank_counts = np.zeros((n, 10), dtype=np.int64)       # cards left per value 2..11
+        self.running_count = np.zeros(n, dtype=np.int64)
+
+        # player hands: hard total (Ace = 1), aces held, cards held, first two cards, bet units
+        self.hard = np.zeros((n, h), dtype=np.int64)
+        self.aces = np.zeros((n, h), dtype=np.int64)
+        self.ncards = np.zeros((n, h), dtype=np.int64)
+        self.first = np.zeros((n, h, 2), dtype=np.int64)
+        self.bets = np.zeros((n, h), dtype=np.int64)
+        self.n_hands = np.ones(n, dtype=np.int64)
+        self.cur = np.zeros(n, dtype=np.int64)
+        self.splits = np.zeros(n, dtype=np.int64)
+        self.split_active = np.zeros(n, dtype=bool)
+        self.done = np.zeros(n, dtype=bool)
+
+        self.d_hard = np.zeros(n, dtype=np.int64)
+        self.d_aces = np.zeros(n, dtype=np.int64)
+        self.d_ncards = np.zeros(n, dtype=np.int64)
+        self.d_up = np.zeros(n, dtype=np.int64)
+
+        # PayoutTracker equivalent, kept in units of base_bet
+        self.base_bet = np.full(n, 10.0)
+        self.net_units = np.zeros(n)
+        self.total_bet_units = np.zeros(n)
+        self.round_tc = np.zeros(n)   # true count of the shoe right before the deal
+        self.round_deck = np.zeros((n, self.DECK_DIM), dtype=np.float32)   # deck_features() then
+
+    # ---- shoe ----
+    def set_bet(self, bet):
+        """Scalar or (N,) array of dollars per base bet, used from the next settlement on."""
+        self.base_bet[:] = bet
+
+    def set_shoe(self, i, deck):
+        """Load table i with a BlackjackEnv-style deck list (drawn from the end, "A" for Ace)."""
+        cards = [11 if c == "A" else c for c in deck][::-1]
+        start = self.shoe_size - len(cards)
+        self.shoe[i, start:] = cards
+        self.cursor[i] = start
+        counts = np.bincount(np.asarray(cards, dtype=np.int64) - 2, minlength=10)
+        self.rank_counts[i] = counts
+        self.running_count[i] = -int(counts @ self.HI_LO)
+
+    def warm_start(self, cards_left_p=None):
+        """
+        Shuffle every table and deal it down to a depth drawn from cards_left_p
+        (P(cards left == k) before a round; utils/shoe_sim.cards_left_distribution()
+        if None). The first rounds then see the depths, and so the true counts, of
+        a long run instead of all starting on a fresh shoe. Call before reset().
+        """
+        if cards_left_p is None:
+            from utils.shoe_sim import cards_left_distribution
+            cards_left_p = cards_left_distribution(self.num_deck, self.penetration)
+        idx = np.arange(self.num_envs)
+        self._shuffle(idx)
+        left = self.rng.choice(self.shoe_size + 1, size=self.num_envs, p=cards_left_p)
+        self.cursor[:] = self.shoe_size - left
+        remaining = np.arange(self.shoe_size)[None, :] >= self.cursor[:, None]
+        for v in range(10):
+            self.rank_counts[:, v] = ((self.shoe == v + 2) & remaining).sum(axis=1)
+        self.running_count[:] = -(self.rank_counts @ self.HI_LO)   # the full shoe counts to 0
+
+    def cards_left(self, idx=slice(None)):
+        return self.shoe_size - self.cursor[idx]
+
+    def _shuffle(self, idx):
+        order = np.argsort(self.rng.random((idx.size, self.shoe_size)), axis=1)
+        self.shoe[idx] = self.base_shoe[order]
+        self.cursor[idx] = 0
+        self.rank_counts[idx] = np.bincount(self.base_shoe - 2, minlength=10)
+        self.running_count[idx] = 0
+
+    def _draw(self, idx):
+        """Next card for each table in idx (unique indices), keeping counts live."""
+        cards = self.shoe[idx, self.cursor[idx]].astype(np.int64)
+        self.cursor[idx] += 1
+        self.rank_counts[idx, cards - 2] -= 1
+        self.running_count[idx] += self.HI_LO[cards - 2]
+        return cards
+
+    def true_count(self, idx=slice(None)):
+        decks = self.cards_left(idx) / 52
+        return np.divide(self.running_count[idx], decks,
+                         out=np.zeros(decks.shape), where=decks > 0)
+
+    def deck_features(self, idx=slice(None)):
+        """
+        BlackjackEnv.get_deck_distribution(betting=True) per table: the 10 card
+        shares, running count, true count, decks remaining and cards left.
+        """
+        left = self.cards_left(idx)
+        out = np.empty((left.size, self.DECK_DIM), dtype=np.float32)
+        out[:, :10] = self.rank_counts[idx] / left[:, None]
+        out[:, 10] = self.running_count[idx]
+        out[:, 11] = self.true_count(idx)
+        out[:, 12] = left / 52
+        out[:, 13] = left
+        return out
+
+    # ---- hands ----
+    def _add_card(self, idx, h, cards):
+        self.hard[idx, h] += np.where(cards == 11, 1, cards)
+        self.aces[idx, h] += cards == 11
+        self.ncards[idx, h] += 1
+
+    def _value(self, hard, aces):
+        soft = (aces > 0) & (hard + 10 <= 21)
+        return np.where(soft, hard + 10, hard), soft
+
+    def _dealer_plays(self, idx):
+        """Dealer hits until 17 or more (stands on soft 17)."""
+        live = idx
+        while live.size:
+            value, _ = self._value(self.d_hard[live], self.d_aces[live])
+            live = live[value < 17]
+            if not live.size:
+                break
+            cards = self._draw(live)
+            self.d_hard[live] += np.where(cards == 11, 1, cards)
+            self.d_aces[live] += cards == 11
+            self.d_ncards[live] += 1
+
+    def _reset_idx(self, idx):
+        if not idx.size:
+            return
+        reshuffle = idx[self.cards_left(idx) <= self.cut]
+        if reshuffle.size:
+            self._shuffle(reshuffle)
+        self.round_tc[idx] = self.true_count(idx)
+        self.round_deck[idx] = self.deck_features(idx)
+
+        for arr in (self.hard, self.aces, self.ncards, self.bets):
+            arr[idx] = 0
+        self.first[idx] = 0
+        self.bets[idx, 0] = 1
+        self.n_hands[idx] = 1
+        self.cur[idx] = 0
+        self.splits[idx] = 0
+        self.split_active[idx] = False
+        self.done[idx] = False
+        self.net_units[idx] = 0.0
+        self.total_bet_units[idx] = 1.0
+
+        # deal order matches BlackjackEnv.reset(): player, player, dealer, dealer
+        for k in range(2):
+            cards = self._draw(idx)
+            self.first[idx, 0, k] = cards
+            self._add_card(idx, 0, cards)
+        up = self._draw(idx)
+        hole = self._draw(idx)
+        self.d_up[idx] = up
+        self.d_hard[idx] = np.where(up == 11, 1, up) + np.where(hole == 11, 1, hole)
+        self.d_aces[idx] = (up == 11).astype(np.int64) + (hole == 11)
+        self.d_ncards[idx] = 2
+
+    def reset(self):
+        """Starts a new round on every table, returns the (N, 17) states."""
+        self._reset_idx(np.arange(self.num_envs))
+        return self.get_states()
+
+    # ---- observations ----
+    def get_states(self, idx=None):
+        idx = np.arange(self.num_envs) if idx is None else idx
+        h = self.cur[idx]
+        ncards = self.ncards[idx, h]
+        score, soft = self._value(self.hard[idx, h], self.aces[idx, h])
+        pair = (ncards == 2) & (self.first[idx, h, 0] == self.first[idx, h, 1])
+
+        states = np.empty((idx.size, self.STATE_DIM), dtype=np.float32)
+        states[:, 0] = ncards
+        states[:, 1] = score
+        states[:, 2] = soft
+        states[:, 3] = self.d_up[idx]
+        states[:, 4] = pair
+        states[:, 5] = ncards == 2
+        states[:, 6:16] = self.rank_counts[idx] / self.cards_left(idx)[:, None]
+        states[:, 16] = np.clip(self.true_count(idx), -8, 8) / 8.0
+        return states
+
+    def legal_actions_mask(self):
+        """(N, 4) bool mask over hit, stand, double, split for the current hand."""
+        h = self.cur
+        rows = np.arange(self.num_envs)
+        two = self.ncards[rows, h] == 2
+        pair = two & (self.first[rows, h, 0] == self.first[rows, h, 1])
+        mask = np.ones((self.num_envs, 4), dtype=bool)
+        mask[:, 2] = two
+        mask[:, 3] = pair & (self.splits < self.ALLOWED_SPLITS)
+        return mask
+
+    # ---- settlement ----
+    def _finish(self, idx, rewards, reward):
+        rewards[idx] = reward
+        self.done[idx] = True
+
+    def _compare(self, idx, rewards):
+        """compare_hands(): settle the single (unsplit) hand after the dealer plays."""
+        if not idx.size:
+            return
+        self._dealer_plays(idx)
+        h = self.cur[idx]
+        player, _ = self._value(self.hard[idx, h], self.aces[idx, h])
+        dealer, _ = self._value(self.d_hard[idx], self.d_aces[idx])
+        natural = (self.ncards[idx, h] == 2) & (player == 21)
+        dealer_natural = (self.d_ncards[idx] == 2) & (dealer == 21)
+
+        r = np.sign(player - dealer).astype(float)
+        r[dealer > 21] = 1.0
+        r[natural] = np.where(dealer_natural[natural], 0.0, 1.5)
+        self.net_units[idx] += r * self.bets[idx, h]
+        self._finish(idx, rewards, r)
+
+    def _split_reward(self, score_sum, k):
+        mode = self.SPLIT_REWARD_MODE
+        if mode == "avg":
+            return score_sum / k
+        if mode == "sum":
+            return score_sum
+        if mode == "sum_clip":
+            return np.clip(score_sum, -float(self.SPLIT_CLIP), float(self.SPLIT_CLIP))
+        if mode == "sum_sqrt":
+            return score_sum / np.sqrt(k)
+        if mode == "sum_tanh":
+            tau = float(self.SPLIT_TAU)
+            return np.tanh(score_sum / tau) * tau
+        return score_sum
+
+    def _compare_split(self, idx, rewards, true_sum):
+        """compare_split_hands(): busts lose, dealer plays once if any hand survives."""
+        if not idx.size:
+            return
+        in_play = np.arange(self.max_hands)[None, :] < self.n_hands[idx, None]
+        value, _ = self._value(self.hard[idx], self.aces[idx])
+        bust = in_play & (value > 21)
+        alive = in_play & ~bust
+
+        survivors = idx[alive.any(axis=1)]
+        self._dealer_plays(survivors)
+        dealer, _ = self._value(self.d_hard[idx], self.d_aces[idx])
+        dealer_natural = (self.d_ncards[idx] == 2) & (dealer == 21)
+        natural = (self.ncards[idx] == 2) & (value == 21)
+
+        r = np.sign(value - dealer[:, None]).astype(float)
+        r[(dealer > 21)[:, None] & alive] = 1.0
+        r = np.where(natural, np.where(dealer_natural[:, None], 0.0, 1.0), r)
+        r = np.where(bust, -1.0, np.where(alive, r, 0.0))
+
+        self.net_units[idx] += (r * self.bets[idx]).sum(axis=1)
+        self.split_active[idx] = False
+        score_sum = r.sum(axis=1)
+        true_sum[idx] = score_sum
+        self._finish(idx, rewards, self._split_reward(score_sum, np.maximum(1, self.n_hands[idx])))
+
+    def _next_split_hand(self, idx, rewards, true_sum):
+        """handle_split_transition(): move to the next split hand or settle them all."""
+        if not idx.size:
+            return
+        more = self.cur[idx] < self.n_hands[idx] - 1
+        self.cur[idx[more]] += 1
+        rewards[idx[more]] = 0.0
+        self._compare_split(idx[~more], rewards, true_sum)
+
+    # ---- actions ----
+    def _hit(self, idx, rewards, true_sum):
+        h = self.cur[idx]
+        self._add_card(idx, h, self._draw(idx))
+        value, _ = self._value(self.hard[idx, h], self.aces[idx, h])
+        bust = idx[value > 21]
+        split = self.split_active[bust]
+        self._next_split_hand(bust[split], rewards, true_sum)
+        lost = bust[~split]
+        self.net_units[lost] -= self.bets[lost, self.cur[lost]]
+        self._finish(lost, rewards, -1.0)
+
+    def _stand(self, idx, rewards, true_sum):
+        split = self.split_active[idx]
+        self._next_split_hand(idx[split], rewards, true_sum)
+        self._compare(idx[~split], rewards)
+
+    def _double(self, idx, rewards, true_sum):
+        two = self.ncards[idx, self.cur[idx]] == 2
+        illegal = idx[~two]
+        self.net_units[illegal] -= self.bets[illegal, self.cur[illegal]]
+        self._finish(illegal, rewards, -1.0)
+
+        idx = idx[two]
+        h = self.cur[idx]
+        self._add_card(idx, h, self._draw(idx))
+        self.bets[idx, h] *= 2
+        self.total_bet_units[idx] += 1.0
+
+        split = self.split_active[idx]
+        self._next_split_hand(idx[split], rewards, true_sum)
+        idx = idx[~split]
+        value, _ = self._value(self.hard[idx, self.cur[idx]], self.aces[idx, self.cur[idx]])
+        bust = idx[value > 21]
+        self.net_units[bust] -= self.bets[bust, self.cur[bust]]
+        self._finish(bust, rewards, -1.0)
+        self._compare(idx[value <= 21], rewards)
+
+    def _split(self, idx, rewards):
+        h = self.cur[idx]
+        legal = ((self.ncards[idx, h] == 2)
+                 & (self.first[idx, h, 0] == self.first[idx, h, 1])
+                 & (self.splits[idx] < self.ALLOWED_SPLITS))
+        self._finish(idx[~legal], rewards, -1.0)   # illegal split ends the round unsettled
+
+        idx, h = idx[legal], h[legal]
+        # shift the hands after h one slot right to make room for the new hand at h + 1
+        for arr in (self.hard, self.aces, self.ncards, self.bets, self.first):
+            for j in range(self.max_hands - 1, 0, -1):
+                move = idx[j - 1 > h]
+                arr[move, j] = arr[move, j - 1]
+        card = self.first[idx, h, 0]
+        c1 = self._draw(idx)
+        c2 = self._draw(idx)
+        for slot, new in ((h, c1), (h + 1, c2)):
+            self.hard[idx, slot] = np.where(card == 11, 1, card) + np.where(new == 11, 1, new)
+            self.aces[idx, slot] = (card == 11).astype(np.int64) + (new == 11)
+            self.ncards[idx, slot] = 2
+            self.first[idx, slot, 0] = card
+            self.first[idx, slot, 1] = new
+            self.bets[idx, slot] = 1
+        self.n_hands[idx] += 1
+        self.splits[idx] += 1
+        self.split_active[idx] = True
+        self.total_bet_units[idx] += 1.0
+        rewards[idx] = 0.0
+
+    def step(self, actions):
+        """
+        Apply one action per table. Returns (states, rewards, dones, info) where
+        info holds per-table arrays: "net_result", "total_bet", "hands_played",
+        "true_sum", "round_tc", "round_deck" (the pre-deal deck_features() a bet
+        would have seen) and "final_states" (meaningful where dones is True).
+        Tables that finish are reset, so `states` is already the next round's start.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        rewards = np.zeros(self.num_envs)
+        true_sum = np.zeros(self.num_envs)
+        playing = ~self.done
+
+        rows = np.arange(self.num_envs)
+        self._hit(rows[playing & (actions == 0)], rewards, true_sum)
+        self._stand(rows[playing & (actions == 1)], rewards, true_sum)
+        self._double(rows[playing & (actions == 2)], rewards, true_sum)
+        self._split(rows[playing & (actions == 3)], rewards)
+        self._finish(rows[playing & ((actions < 0) | (actions > 3))], rewards, -1.0)
+
+        dones = self.done.copy()
+        finished = rows[dones & playing]
+        not_split = finished[self.n_hands[finished] == 1]
+        true_sum[not_split] = rewards[not_split]
+        info = {
+            "net_result": self.net_units * self.base_bet,
+            "total_bet": self.total_bet_units * self.base_bet,
+            "hands_played": self.n_hands.copy(),
+            "true_sum": true_sum,
+            "round_tc": self.round_tc.copy(),
+            "round_deck": self.round_deck.copy(),
+        }
+        states = self.get_states()
+        info["final_states"] = states.copy()
+        if self.autoreset and finished.size:
+            self._reset_idx(finished)
+            states[finished] = self.get_states(finished)
+        return states, rewards, dones, info
@@ -0,0 +1,141 @@
+"""
+Bankroll simulator: many betting policies on one recorded hand stream.
+
+eval/runner.record_rounds() plays the rounds once, at a one-unit stake, with
+the playing policy. A bet only scales a round's outcome, so every betting
+policy is priced on exactly the same cards (common random numbers) and the
+paired difference between two policies carries no dealing noise.
+
+A betting policy maps the (n, 14) pre-deal deck features to bet units:
+  flat      1 unit
+  ramp      Hi-Lo ramp: 1 unit below TC +1, then 2, 4, 8, 16 units from +1, +2, +3, +4
+  shaped    the best bet of each count band under utils/shaping.SHAPED_REWARD
+  a .pth    a Betting_Agent checkpoint, greedy
+
+The stream is cut into sessions of `session` rounds that each start from
+`bankroll`; a session is ruined once its bankroll is at or below zero, as in
+eval/eval_betting.py, and bets nothing after that. Run from the repo root:
+  python -m eval.bankroll_sim --rounds 500000
+  python -m eval.bankroll_sim --bet-ckpt checkpoints/betting/bet_dqn.pth --session 20000
+"""
+import numpy as np
+from eval.runner import record_rounds
+from utils.running_stats import RunningStats, Z95
+from utils.shaping import SHAPED_REWARD, count_band
+from config import BET_SIZES, UNIT, INITIAL_BANKROLL, BET_PLAYER_CKPT, BETTING_MODEL_PATH
+
+TC_COL = 11   # true count in the deck features
+SESSION = 10_000
+
+
+def flat(deck):
+    return np.ones(len(deck))
+
+
+def ramp(deck):
+    band = np.clip(np.floor(deck[:, TC_COL]).astype(np.int64), 0, len(BET_SIZES) - 1)
+    return np.asarray(BET_SIZES, dtype=np.float64)[band]
+
+
+def shaped(deck):
+    best = np.asarray(BET_SIZES, dtype=np.float64)[SHAPED_REWARD.argmax(axis=1)]
+    return best[count_band(deck[:, TC_COL])]
+
+
+POLICIES = {"flat": flat, "ramp": ramp, "shaped": shaped}
+
+
+def dqn_policy(ckpt):
+    """Greedy bet units of a Betting_Agent checkpoint."""
+    import torch
+    from agent.betting_agent import Betting_Agent
+    agent = Betting_Agent(epsilon_start=0.0, epsilon_min=0.0)
+    agent.q_network.load_state_dict(torch.load(ckpt, map_location="cpu"))
+    agent.freeze()
+    sizes = np.asarray(BET_SIZES, dtype=np.float64)
+    return lambda deck: sizes[agent.select_bets(deck)]
+
+
+def simulate(rounds, units, bankroll=INITIAL_BANKROLL, session=SESSION, unit=UNIT):
+    """Stream and per-session results of betting `units` (one per round) on the recorded rounds."""
+    pnl = rounds["outcome"].astype(np.float64) * units * unit
+    per_round = RunningStats()
+    per_round.add_many(pnl)
+    wagered = float(units.sum()) * unit
+
+    session = min(session, len(pnl))
+    n_sessions = len(pnl) // session
+    paths = bankroll + np.cumsum(pnl[:n_sessions * session].reshape(n_sessions, session), axis=1)
+    broke = paths <= 0
+    ruined = broke.any(axis=1)
+    # a ruined session stops betting: hold its bankroll at the round it went broke
+    ruin_round = broke.argmax(axis=1)
+    ruin_value = paths[np.arange(n_sessions), ruin_round]
+    paths = np.where(np.maximum.accumulate(broke, axis=1), ruin_value[:, None], paths)
+    final = np.where(ruined, 0.0, paths[:, -1])
+    peaks = np.maximum.accumulate(np.maximum(paths, bankroll), axis=1)
+    drawdown = (peaks - paths).max(axis=1)
+    ruin_p = float(ruined.mean())
+    return {"ev_per_round": per_round.mean, "ci95": per_round.ci95(), "std_per_round": per_round.std(),
+            "avg_bet": wagered / len(pnl), "roi_pct": 100 * per_round.total / wagered,
+            "sessions": n_sessions, "ruin_prob": ruin_p,
+            "ruin_ci95": Z95 * np.sqrt(ruin_p * (1 - ruin_p) / n_sessions),
+            "rounds_to_ruin_median": float(np.median(ruin_round[ruined] + 1)) if ruined.any() else None,
+            "final_bankroll": {"mean": float(final.mean()), "p5": float(np.percentile(final, 5)),
+                               "p50": float(np.median(final)), "p95": float(np.percentile(final, 95))},
+            "max_drawdown_median": float(np.median(drawdown))}
+
+
+def compare_policies(rounds, policies, bankroll=INITIAL_BANKROLL, session=SESSION, unit=UNIT):
+    """simulate() every {name: policy}, plus the paired EV difference against the first one."""
+    results, base = {}, None
+    for name, policy in policies.items():
+        units = np.asarray(policy(rounds["deck"]), dtype=np.float64)
+        results[name] = simulate(rounds, units, bankroll, session, unit)
+        pnl = rounds["outcome"] * units * unit
+        if base is None:
+            base = pnl
+        diff = RunningStats()
+        diff.add_many(pnl - base)
+        results[name]["diff_vs_first"] = {"mean": diff.mean, "ci95": diff.ci95()}
+    return results
+
+
+def report(results, bankroll=INITIAL_BANKROLL, session=SESSION):
+    first = next(iter(results))
+    print(f"\nsessions of {session:,} rounds from ${bankroll:,}; difference vs {first} is paired (same hands)")
+    print(f"{'policy':<28} {'avg bet':>8} {'$/round':>16} {'vs ' + first:>16} {'ROI':>7} "
+          f"{'ruin':>14} {'median final':>13} {'median DD':>10}")
+    for name, r in results.items():
+        d = r["diff_vs_first"]
+        print(f"{name[-28:]:<28} {r['avg_bet']:>8.2f} {r['ev_per_round']:>+8.3f} ± {r['ci95']:<5.3f} "
+              f"{d['mean']:>+8.3f} ± {d['ci95']:<5.3f} {r['roi_pct']:>6.2f}% "
+              f"{100 * r['ruin_prob']:>6.2f}% ± {100 * r['ruin_ci95']:<4.1f} "
+              f"{r['final_bankroll']['p50']:>13,.0f} {r['max_drawdown_median']:>10,.0f}")
+
+
+def run(play_ckpt=BET_PLAYER_CKPT, n_rounds=500_000, seed=0, bet_ckpts=(), bankroll=INITIAL_BANKROLL,
+        session=SESSION, n_envs=1024):
+    """Record the stream with play_ckpt, then compare the built-in policies and bet_ckpts on it."""
+    from agent.table_policy import load_policy
+    rounds = record_rounds(load_policy(play_ckpt), n_rounds, seed, n_envs)
+    policies = dict(POLICIES)
+    for ckpt in bet_ckpts:
+        policies[ckpt] = dqn_policy(ckpt)
+    results = compare_policies(rounds, policies, bankroll, session)
+    report(results, bankroll, session)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Betting policies on one recorded hand stream.")
+    parser.add_argument("--play-ckpt", default=BET_PLAYER_CKPT)
+    parser.add_argument("--bet-ckpt", nargs="*", default=[BETTING_MODEL_PATH], help="Betting_Agent checkpoints")
+    parser.add_argument("--rounds", type=int, default=500_000)
+    parser.add_argument("--bankroll", type=float, default=INITIAL_BANKROLL)
+    parser.add_argument("--session", type=int, default=SESSION, help="rounds per bankroll session")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.play_ckpt, args.rounds, args.seed, args.bet_ckpt, args.bankroll, args.session)
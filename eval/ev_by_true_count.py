@@ -1,48 +1,29 @@
+import os
 import numpy as np
-from env.blackjackEnv import BlackjackEnv
-from agent.dqn_agent import DQN_Agent
-import torch
-
-UNIT = 10
-BINS = ["≤-5","-4","-3","-2","-1","0","1","2","3","4","≥5"]
-
-def tc_to_bin(tc):
-    if tc <= -5: return "≤-5"
-    if tc >=  5: return "≥5"
-    return str(int(tc))
-
-CKPT = "checkpoints/iteration3/blackjack_dqn_ep500000.pth"
-
-def run_once(n_hands=200_000, ckpt=CKPT):
-    env = BlackjackEnv()
-    agent = DQN_Agent(epsilon_start=0.0)
-    agent.q_network.load_state_dict(torch.load(ckpt, map_location="cpu"))
-    agent.q_network.eval()
-
-    stats = {}
-    for _ in range(n_hands):
-        pre_tc = env.get_deck_distribution(betting=True)[-3]
-        b = tc_to_bin(pre_tc)
-
-        state = env.reset()
-        env.set_bet(UNIT)
-
-        done = False
-        while not done:
-            legal = env.legal_actions()
-            action = agent.select_action(state, legal_actions=legal)
-            state, _, done, _ = env.step(action)
-
-        pnl = env.payout_tracker.get_info()["net_result"]
-        bucket = stats.setdefault(b, {'n':0,'pnl':0.0})
-        bucket['n'] += 1
-        bucket['pnl'] += pnl
-
-    # convert to ev dict
-    evs = {}
-    for b in BINS:
-        if b in stats:
-            evs[b] = stats[b]['pnl'] / stats[b]['n']
+from eval.runner import UNIT, BINS, evaluate, ev_by_bin, evaluate_vr, vr_by_bin, stratified_ev, Z95
+from config import EVAL_CKPT, EV_BY_TC_RUNS
+
+CKPT = EVAL_CKPT
+
+def run_once(n_hands=200_000, ckpt=CKPT, workers=1, seed=None, variance_reduced=False):
+    """
+    EV/hand by pre-deal true count for `ckpt` (fixed $UNIT bet, greedy play).
+    workers > 1 shards the hands over a process pool (see eval/runner.py).
+    variance_reduced=True splits the hands equally over the TC bins and uses
+    the solver as a control variate (runner.evaluate_vr): per-hand it is
+    slower, but the rare bins need a small fraction of the hands.
+    """
+    if variance_reduced:
+        stats = evaluate_vr(ckpt, n_hands, workers=workers, seed=seed, unit=UNIT)
+        per_bin = vr_by_bin(stats)
+        for b, (ev, se, n, _, _) in per_bin.items():
+            print(f"TC {b:>3}: EV/hand=${ev:+.3f} ± {Z95 * se:.3f}  ({n} hands)")
+        ev, se = stratified_ev(stats)
+        print(f"All: EV/hand=${ev:+.3f} ± {Z95 * se:.3f}")
+        return {b: ev for b, (ev, *_rest) in per_bin.items()}
+
+    stats = evaluate(ckpt, n_hands, workers=workers, seed=seed, unit=UNIT)
+    evs = {b: ev for b, (ev, _, _) in ev_by_bin(stats).items()}
 
     for b in BINS:
         if b in evs:
@@ -50,26 +31,41 @@ def run_once(n_hands=200_000, ckpt=CKPT):
 
     return evs
 
-def main():
-    runs = 5
+def main(variance_reduced=False, n_hands=None, ckpt=CKPT, runs=EV_BY_TC_RUNS, workers=None):
+    """run_once() for seeds 0..runs-1; returns {"runs": [per-run EVs], "mean", "std"} by TC bin."""
     all_evs = {b: [] for b in BINS}
+    workers = workers or os.cpu_count() or 1
+    if n_hands is None:
+        n_hands = 22_000 if variance_reduced else 200_000
 
     for r in range(runs):
-        ev_dict = run_once()
+        ev_dict = run_once(n_hands, ckpt, workers=workers, seed=r, variance_reduced=variance_reduced)
         print(f"\n=== Run {r+1} ===")
         for b in BINS:
             if b in ev_dict:
                 print(f"TC {b:>3}: EV/hand=${ev_dict[b]:+.3f}")
                 all_evs[b].append(ev_dict[b])
 
-    print("\n=== Aggregated over 5 runs ===")
+    print(f"\n=== Aggregated over {runs} runs ===")
+    means, stds = {}, {}
     for b in BINS:
         if all_evs[b]:
             arr = np.array(all_evs[b])
             mean = arr.mean()
-            std = arr.std(ddof=1)
+            std = arr.std(ddof=1) if len(arr) > 1 else float("nan")
+            means[b], stds[b] = float(mean), float(std)
             print(f"TC {b:>3}: mean={mean:+.3f}, std={std:.3f}, from {len(arr)} runs")
+    return {"runs": {b: v for b, v in all_evs.items() if v}, "mean": means, "std": stds}
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="EV per hand by pre-deal true count.")
+    parser.add_argument("--ckpt", default=CKPT)
+    parser.add_argument("--hands", type=int, default=None,
+                        help="per run; defaults to 200k, or 22k with --vr")
+    parser.add_argument("--vr", action="store_true", help="variance-reduced mode (stratified + control variate)")
+    parser.add_argument("--runs", type=int, default=EV_BY_TC_RUNS)
+    args = parser.parse_args()
+    main(args.vr, args.hands, args.ckpt, args.runs)
 
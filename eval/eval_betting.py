@@ -1,32 +1,38 @@
-import torch
-import numpy as np
-from agent.betting_agent import Betting_Agent
-from agent.dqn_agent import DQN_Agent
+from agent.table_policy import load_policy
 from env.blackjackEnv import BlackjackEnv
-from config import BET_SIZES, UNIT, INITIAL_BANKROLL, EVAL_HANDS, PLAYING_MODEL_PATH, BETTING_MODEL_PATH
+from utils.running_stats import RunningStats, WindowedMean
+from config import BET_SIZES, UNIT, INITIAL_BANKROLL, EVAL_HANDS, BETTING_MODEL_PATH, BET_PLAYER_CKPT
+
+PLAY_CKPT = BET_PLAYER_CKPT
+
+
+def evaluate_betting_agent(play_ckpt=PLAY_CKPT, bet_ckpt=BETTING_MODEL_PATH, n_hands=EVAL_HANDS):
+    import torch
+    from agent.betting_agent import Betting_Agent
 
-def evaluate_betting_agent():
     # --- Load Environment ---
     env = BlackjackEnv()
 
     # --- Load Playing Agent (Pretrained) ---
-    player_agent = DQN_Agent(epsilon_start=0.0)
-    player_agent.q_network.load_state_dict(torch.load("checkpoints/1_million/blackjack_dqn_pt2.pth"))
-    player_agent.q_network.eval()
+    player_agent = load_policy(play_ckpt)   # greedy, NumPy forward passes (model/frozen_mlp.py)
 
     # --- Load Betting Agent (Trained) ---
     betting_agent = Betting_Agent(epsilon_start=0.0)
-    betting_agent.q_network.load_state_dict(torch.load(BETTING_MODEL_PATH))
-    betting_agent.q_network.eval()
+    betting_agent.q_network.load_state_dict(torch.load(bet_ckpt, map_location="cpu"))
+    betting_agent.freeze()
 
     # --- Evaluation Variables ---
     bankroll = INITIAL_BANKROLL
     total_bet_amount = 0
-    total_rewards = []
+    total_rewards = RunningStats()
+    recent_rewards = WindowedMean(1000)
     bet_counts = {bet: 0 for bet in BET_SIZES}  # Track how often each bet is chosen
+    # a bet only scales the hand, so the same hands are priced at every flat bet size too
+    unit_results = RunningStats()                            # net $ of the hand at a one-unit bet
+    flat_profits = {bet: RunningStats() for bet in BET_SIZES}
 
     # --- Simulate Hands ---
-    for hand in range(1, EVAL_HANDS + 1):
+    for hand in range(1, n_hands + 1):
         # 1. Observe current deck state
         deck_state = env.get_deck_distribution(betting=True)
 
@@ -43,7 +49,7 @@ def evaluate_betting_agent():
         # 4. Play hand with playing agent
         done = False
         while not done:
-            action = player_agent.select_action(state)
+            action = player_agent.select_action(state, legal_actions=env.legal_actions())
             next_state, _, done, info = env.step(action)
             state = next_state
 
@@ -52,11 +58,16 @@ def evaluate_betting_agent():
         net_profit = info["net_result"] 
         bankroll += net_profit
         total_bet_amount += bet
-        total_rewards.append(net_profit)
+        total_rewards.add(net_profit)
+        recent_rewards.add(net_profit)
+        unit_result = net_profit / bet_units
+        unit_results.add(unit_result)
+        for size, stats in flat_profits.items():
+            stats.add(unit_result * size)
 
         # 6. Print bankroll progress every 1000 hands
         if hand % 1000 == 0:
-            avg_profit_per_hand = np.mean(total_rewards[-1000:])
+            avg_profit_per_hand = recent_rewards.mean
             print(f"After {hand} hands: Bankroll=${bankroll:.2f}, "
                   f"Last 1000 Avg Profit=${avg_profit_per_hand:.2f}")
 
@@ -68,18 +79,35 @@ def evaluate_betting_agent():
     # --- Final Stats ---
     total_profit = bankroll - INITIAL_BANKROLL
     roi = (total_profit / total_bet_amount) * 100 if total_bet_amount > 0 else 0
-    avg_bet = total_bet_amount / len(total_rewards)
+    avg_bet = total_bet_amount / total_rewards.n
 
     print("\n=== Final Evaluation Results ===")
-    print(f"Hands Played: {len(total_rewards)}")
+    print(f"Hands Played: {total_rewards.n}")
     print(f"Final Bankroll: ${bankroll:.2f}")
     print(f"Total Profit: ${total_profit:.2f}")
     print(f"Average Bet: ${avg_bet:.2f}")
     print(f"ROI (Return on Investment): {roi:.2f}%")
     print(f"Bet Selection Frequency: {bet_counts}")
 
-    avg_profit_overall = np.mean(total_rewards)
-    print(f"Average Profit per Hand: ${avg_profit_overall:.2f}")
+    print(f"Average Profit per Hand: ${total_rewards.mean:.2f} ± {total_rewards.ci95():.2f}")
+
+    # counterfactual: the same hands at a flat bet (bet sizing's contribution is the gap)
+    flat_at_avg = unit_results.mean / UNIT * avg_bet
+    print(f"\nSame hands at a flat ${avg_bet:.2f} (the average bet): ${flat_at_avg:.2f} per hand, "
+          f"bet sizing adds ${total_rewards.mean - flat_at_avg:+.2f}")
+    for size, stats in flat_profits.items():
+        print(f"  flat {size:>2} units (${size * UNIT}): ${stats.mean:+.2f} ± {stats.ci95():.2f} per hand")
+    return {"hands": total_rewards.n, "bankroll": bankroll, "roi_pct": roi, "avg_bet": avg_bet,
+            "profit_per_hand": total_rewards.to_dict(), "bet_counts": bet_counts,
+            "flat_at_avg_bet": flat_at_avg,
+            "flat_profit_per_hand": {size: stats.to_dict() for size, stats in flat_profits.items()}}
 
 if __name__ == "__main__":
-    evaluate_betting_agent()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Play the betting agent with a fixed playing agent.")
+    parser.add_argument("--play-ckpt", default=PLAY_CKPT)
+    parser.add_argument("--bet-ckpt", default=BETTING_MODEL_PATH)
+    parser.add_argument("--hands", type=int, default=EVAL_HANDS)
+    args = parser.parse_args()
+    evaluate_betting_agent(args.play_ckpt, args.bet_ckpt, args.hands)
@@ -1,93 +1,124 @@
-import torch
+"""
+Flat-bet evaluation of a playing policy, single process, with the reward
+spread at the end. From the repo root:
+  python -m eval.eval_model checkpoints/count_aware/blackjack_dqn_ep350000.pth --episodes 100000
+"""
 from env.blackjackEnv import BlackjackEnv
-from agent.dqn_agent import DQN_Agent
+from agent.table_policy import load_policy
+from utils.running_stats import RunningStats, Histogram
 import numpy as np
 
-env = BlackjackEnv()
-agent = DQN_Agent(epsilon_start=0.0)
-
 CKPT = "checkpoints/count_aware/blackjack_dqn_ep350000.pth"
-checkpoint_path = "checkpoints/1_million/blackjack_dqn_pt2.pth"
-checkpoint_path = CKPT
-print(f"evaluating {checkpoint_path}")
-agent.q_network.load_state_dict(torch.load(checkpoint_path))
-agent.q_network.eval()
-
-total_rewards = []
-
-num_episodes = 100_000
-wins = 0
-losses = 0
-draws = 0
-total_reward = 0
-max_steps_per_episode = 50
-steps = 0
-hands= 0 
-actions_count = {0: 0, 1:0 , 2:0, 3:0}
-
-for episode in range(num_episodes):
-    state = env.reset()
-    steps = 0
-    env.set_bet(10)
-    previous_hand_index = env.current_hand_index
-
-    while not env.done and steps < max_steps_per_episode:
-        action = agent.select_action(state)
-        legal = env.legal_actions()
-        a = agent.select_action(state, legal_actions=legal)
-        if a not in legal:
-            print("HEEEEEEEEEEEELOOOOOO \n\n\n\n")
-        assert a in legal, f"Picked illegal {a} with legal={legal}, state[:6]={state}"
-        actions_count[action] += 1  
-        next_state, reward, done, msg = env.step(action)
-        state = next_state
-        if env.current_hand_index != previous_hand_index:
-            previous_hand_index = env.current_hand_index
-            hands += 1
-    
-    total_reward += reward
-    info = env.payout_tracker.get_info()
-    raw_reward = info["net_result"]
-    total_rewards.append(raw_reward)
-    
-    if reward >0:
-        wins += 1
-    elif reward < 0:
-        losses+=1
-    else:
-        draws += 1
-
-# === Results ===
-print("\n=== Evaluation Results ===")
-print(f"Episodes Played:  {num_episodes}")
-print(f"Wins:             {wins}")
-print(f"Losses:           {losses}")
-print(f"Draws:            {draws}")
-print(f"Win Rate:         {wins / num_episodes:.2%}")
-print(f"Loss Rate:         {losses / num_episodes:.2%}")
-print(f"Draw Rate:         {draws / num_episodes:.2%}")
-print(f"Average Reward:   {total_reward / num_episodes:.2f}")
-print(f"Actions Count: {actions_count}")
-
-avg_loss_per_episode = np.mean(total_rewards)
-avg_hands_per_episode = hands / num_episodes
-avg_loss_per_hand = avg_loss_per_episode / avg_hands_per_episode
-print(f"Average Loss Per Hand: {avg_loss_per_hand}")
+BET = 10
 
-if __name__ == "__main__":
-    if len(total_rewards) > 0:
+
+def evaluate(checkpoint_path=CKPT, num_episodes=100_000, max_steps_per_episode=50, seed=None):
+    """Play num_episodes flat-bet rounds greedily; returns the counters report() prints."""
+    env = BlackjackEnv(seed=seed)
+    agent = load_policy(checkpoint_path)   # greedy; a .npz TablePolicy works too
+
+    total_rewards = RunningStats()
+    reward_signs = [0, 0, 0]   # negative, zero, positive net results
+    # net $ per episode in half-unit buckets centred on the outcomes (-2, -1, 0, +1.5, ...),
+    # out to a four-way split that doubles every hand
+    net_spread = Histogram(-8.25 * BET, 8.25 * BET, 33)
+    wins = 0
+    losses = 0
+    draws = 0
+    total_reward = 0
+    hands= 0
+    actions_count = {0: 0, 1:0 , 2:0, 3:0}
+
+    for episode in range(num_episodes):
+        state = env.reset()
+        steps = 0
+        env.set_bet(BET)
+        previous_hand_index = env.current_hand_index
+
+        while not env.done and steps < max_steps_per_episode:
+            legal = env.legal_actions()
+            action = agent.select_action(state, legal_actions=legal)
+            assert action in legal, f"Picked illegal {action} with legal={legal}, state[:6]={state}"
+            actions_count[action] += 1
+            next_state, reward, done, msg = env.step(action)
+            state = next_state
+            if env.current_hand_index != previous_hand_index:
+                previous_hand_index = env.current_hand_index
+                hands += 1
+
+        total_reward += reward
+        info = env.payout_tracker.get_info()
+        raw_reward = info["net_result"]
+        total_rewards.add(raw_reward)
+        reward_signs[int(np.sign(raw_reward)) + 1] += 1
+        net_spread.add(raw_reward)
+
+        if reward >0:
+            wins += 1
+        elif reward < 0:
+            losses+=1
+        else:
+            draws += 1
+
+    return {"episodes": num_episodes, "wins": wins, "losses": losses, "draws": draws,
+            "total_reward": total_reward, "total_rewards": total_rewards, "reward_signs": reward_signs,
+            "net_spread": net_spread,
+            "hands": hands,
+            "actions_count": actions_count}
+
+
+def report(stats):
+    num_episodes = stats["episodes"]
+    wins, losses, draws = stats["wins"], stats["losses"], stats["draws"]
+    total_rewards = stats["total_rewards"]
+
+    print("\n=== Evaluation Results ===")
+    print(f"Episodes Played:  {num_episodes}")
+    print(f"Wins:             {wins}")
+    print(f"Losses:           {losses}")
+    print(f"Draws:            {draws}")
+    print(f"Win Rate:         {wins / num_episodes:.2%}")
+    print(f"Loss Rate:         {losses / num_episodes:.2%}")
+    print(f"Draw Rate:         {draws / num_episodes:.2%}")
+    print(f"Average Reward:   {stats['total_reward'] / num_episodes:.2f}")
+    print(f"Actions Count: {stats['actions_count']}")
+
+    avg_loss_per_episode = total_rewards.mean
+    avg_hands_per_episode = stats["hands"] / num_episodes
+    if avg_hands_per_episode:
+        print(f"Average Loss Per Hand: {avg_loss_per_episode / avg_hands_per_episode}")
+
+    if total_rewards.n > 0:
         print(f"Final Training Rewards:")
-        print(f"  Mean: {np.mean(total_rewards):.4f}")
-        print(f"  Std Dev: {np.std(total_rewards):.4f}")
-        print(f"  Min: {np.min(total_rewards):.4f}")
-        print(f"  Max: {np.max(total_rewards):.4f}")
-        
+        print(f"  Mean: {total_rewards.mean:.4f}")
+        print(f"  Std Dev: {total_rewards.std(ddof=0):.4f}")
+        print(f"  Min: {total_rewards.min:.4f}")
+        print(f"  Max: {total_rewards.max:.4f}")
+
         # Count positive vs negative
-        positive = sum(1 for r in total_rewards if r > 0)
-        negative = sum(1 for r in total_rewards if r < 0)
-        zero = sum(1 for r in total_rewards if r == 0)
-        
-        print(f"  Positive rewards: {positive} ({positive/len(total_rewards)*100:.1f}%)")
-        print(f"  Negative rewards: {negative} ({negative/len(total_rewards)*100:.1f}%)")
-        print(f"  Zero rewards: {zero} ({zero/len(total_rewards)*100:.1f}%)")
+        negative, zero, positive = stats["reward_signs"]
+
+        print(f"  Positive rewards: {positive} ({positive/total_rewards.n*100:.1f}%)")
+        print(f"  Negative rewards: {negative} ({negative/total_rewards.n*100:.1f}%)")
+        print(f"  Zero rewards: {zero} ({zero/total_rewards.n*100:.1f}%)")
+
+        spread = stats["net_spread"]
+        q05, q50, q95 = (spread.quantile(q) for q in (0.05, 0.5, 0.95))
+        print(f"  Net result quantiles (±{BET / 4:g}): 5% {q05:.1f}  50% {q50:.1f}  95% {q95:.1f}")
+        centres = (spread.edges[:-1] + spread.edges[1:]) / 2
+        for centre, count in zip(centres, spread.counts[1:-1]):
+            if count:
+                print(f"    {centre:+6.1f}: {count / spread.n:7.2%}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Flat-bet evaluation of a playing checkpoint.")
+    parser.add_argument("ckpt", nargs="?", default=CKPT, help=".pth, .npz table or 'solver'")
+    parser.add_argument("--episodes", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
 
+    print(f"evaluating {args.ckpt}")
+    report(evaluate(args.ckpt, args.episodes, seed=args.seed))
@@ -0,0 +1,573 @@
+"""
+Parallel evaluation: hands are split into shards and played on a process pool.
+Every worker builds its own BlackjackEnv, pins torch to one thread, loads the
+checkpoint once and reseeds the shoe per shard; the shards return plain sums
+that are merged and turned into the usual metrics with 95% confidence intervals.
+With regret=True every decision is also scored against the composition-dependent
+solver (utils/strategy_solver.py): EV given up per decision, no extra hands played.
+Solver results go through the persistent EV cache (utils/ev_cache.py) unless
+ev_cache=None, so re-evaluating checkpoints on the same seeds is mostly lookups.
+
+compare() plays two checkpoints on identical shoes (common random numbers):
+every hand is dealt to both from the same cards, so the paired difference has
+a far smaller variance than two independent runs.
+
+evaluate_vr() is the variance-reduced mode for EV by TC bin:
+  - stratified: each TC bin gets an equal share of the hands, dealt from
+    pre-round shoes sampled at that count (utils/shoe_sim.sample_shoes), and
+    the overall EV weights the bins by their simulated frequency;
+  - control variate: the solver policy plays the same cards (common random
+    numbers) and prices the luck of every card it sees against the
+    composition it came from; that sum has mean exactly 0 (the solver's
+    approximations cannot bias it) and is regressed out of the checkpoint's
+    result per bin.
+
+Run from the repo root:
+  python -m eval.runner checkpoints/count_weighted/blackjack_dqn_ep100000.pth --hands 200000
+  python -m eval.runner checkpoints/count_weighted/blackjack_dqn_ep100000.pth --hands 20000 --regret
+  python -m eval.runner checkpoints/count_weighted/blackjack_dqn_ep100000.pth --compare solver
+"""
+import math
+import multiprocessing as mp
+import os
+import numpy as np
+from env.blackjackEnv import BlackjackEnv
+from env.shoe import Shoe
+
+UNIT = 10
+BINS = ["≤-5","-4","-3","-2","-1","0","1","2","3","4","≥5"]
+Z95 = 1.96
+
+def tc_to_bin(tc):
+    if tc <= -5: return "≤-5"
+    if tc >=  5: return "≥5"
+    return str(int(tc))
+
+_policy = None   # per-worker, loaded once by _init_worker (a pair for compare())
+
+
+def _init_worker(*ckpts):
+    global _policy
+    if any(c != "solver" and not str(c).endswith(".npz") for c in ckpts):
+        import torch
+        torch.set_num_threads(1)
+    from agent.table_policy import load_policy
+    policies = [load_policy(c) for c in ckpts]
+    _policy = policies[0] if len(policies) == 1 else policies
+
+
+def empty_stats():
+    return {
+        "episodes": 0, "hands": 0,
+        "wins": 0, "losses": 0, "draws": 0,
+        "pnl": 0.0, "pnl_sq": 0.0,
+        "actions": [0, 0, 0, 0],
+        "split_legal": 0, "split_not_legal": 0, "split_chosen": 0,
+        "bins": {},   # TC bin -> [n, pnl, pnl_sq]
+        "decisions": 0, "mistakes": 0,   # regret=True only, in units of the bet
+        "regret": 0.0, "regret_sq": 0.0,
+        "ev_cache_mem_hits": 0, "ev_cache_disk_hits": 0, "ev_cache_misses": 0,
+    }
+
+
+def empty_paired_stats():
+    return {"pairs": 0, "same": 0,
+            "a": 0.0, "a_sq": 0.0, "b": 0.0, "b_sq": 0.0, "diff": 0.0, "diff_sq": 0.0}
+
+
+def merge(stats_list, empty=empty_stats):
+    """Add up shard results (also works on results from other runs/machines)."""
+    total = empty()
+    for s in stats_list:
+        for k, v in s.items():
+            if k == "bins":
+                for b, (n, pnl, sq) in v.items():
+                    acc = total["bins"].setdefault(b, [0, 0.0, 0.0])
+                    acc[0] += n; acc[1] += pnl; acc[2] += sq
+            elif k == "actions":
+                total[k] = [a + b for a, b in zip(total[k], v)]
+            else:
+                total[k] += v
+    return total
+
+
+def play_hands(policy, n_hands, seed, disable_split=False, unit=UNIT, regret=False, ev_cache=None):
+    """
+    Plays n_hands greedily on a freshly seeded shoe, returns the shard's sums.
+    ev_cache: path of the persistent EV cache used by the solver, or None.
+    """
+    env = BlackjackEnv(seed=seed)
+    cache = None
+    if ev_cache and (regret or hasattr(policy, "bind")):
+        from utils.ev_cache import EVCache, rules_spec
+        cache = EVCache(ev_cache, rules_spec(env))
+    if hasattr(policy, "bind"):
+        policy.bind(env)
+        policy.cache = cache
+    if regret:
+        from utils.strategy_solver import decision_regret
+    stats = empty_stats()
+    for _ in range(n_hands):
+        state = env.reset()
+        env.set_bet(unit)
+        while not env.done:
+            legal = env.legal_actions()
+            if disable_split and 3 in legal:
+                legal = [a for a in legal if a != 3]
+            if 3 in legal: stats["split_legal"] += 1
+            else:          stats["split_not_legal"] += 1
+            action = policy.select_action(state, legal_actions=legal)
+            if regret:
+                loss, _ = decision_regret(env, action, legal, cache)
+                stats["decisions"] += 1
+                stats["mistakes"] += loss > 1e-9
+                stats["regret"] += loss
+                stats["regret_sq"] += loss * loss
+            stats["actions"][action] += 1
+            if action == 3:
+                stats["split_chosen"] += 1
+            state, _, _, _ = env.step(action)
+
+        info = env.payout_tracker.get_info()
+        pnl = info["net_result"]
+        stats["episodes"] += 1
+        stats["hands"] += info["hands_played"]
+        stats["pnl"] += pnl
+        stats["pnl_sq"] += pnl * pnl
+        if pnl > 0:   stats["wins"] += 1
+        elif pnl < 0: stats["losses"] += 1
+        else:         stats["draws"] += 1
+        acc = stats["bins"].setdefault(tc_to_bin(env.round_tc), [0, 0.0, 0.0])
+        acc[0] += 1; acc[1] += pnl; acc[2] += pnl * pnl
+    if cache is not None:
+        cache.close()
+        for k in ("mem_hits", "disk_hits", "misses"):
+            stats["ev_cache_" + k] = getattr(cache, k)
+    return stats
+
+
+def _play_shard(args):
+    return play_hands(_policy, *args)
+
+
+def play_round(env, policy, unit=UNIT, disable_split=False):
+    """One greedy round, returns its net result."""
+    state = env.reset()
+    env.set_bet(unit)
+    while not env.done:
+        legal = env.legal_actions()
+        if disable_split and 3 in legal:
+            legal = [a for a in legal if a != 3]
+        state, _, _, _ = env.step(policy.select_action(state, legal_actions=legal))
+    return env.payout_tracker.get_info()["net_result"]
+
+
+def play_paired(policy_a, policy_b, n_hands, seed, disable_split=False, unit=UNIT):
+    """
+    Both policies play every hand from the same cards: before each round env_b
+    takes over env_a's shoe and shuffle state; the shoe then moves on as A played it.
+    """
+    env_a, env_b = BlackjackEnv(seed=seed), BlackjackEnv()
+    for policy, env in ((policy_a, env_a), (policy_b, env_b)):
+        if hasattr(policy, "bind"):
+            policy.bind(env)
+    stats = empty_paired_stats()
+    for _ in range(n_hands):
+        env_b.copy_shoe_from(env_a)
+        a = play_round(env_a, policy_a, unit, disable_split)
+        b = play_round(env_b, policy_b, unit, disable_split)
+        d = a - b
+        stats["pairs"] += 1
+        stats["same"] += a == b
+        stats["a"] += a; stats["a_sq"] += a * a
+        stats["b"] += b; stats["b_sq"] += b * b
+        stats["diff"] += d; stats["diff_sq"] += d * d
+    return stats
+
+
+def _play_paired_shard(args):
+    return play_paired(*_policy, *args)
+
+
+def mean_ci(n, total, total_sq):
+    """(mean, 95% half-width) from a count, sum and sum of squares."""
+    if n == 0:
+        return 0.0, float("nan")
+    mean = total / n
+    if n < 2:
+        return mean, float("nan")
+    var = max(0.0, (total_sq - n * mean * mean) / (n - 1))
+    return mean, Z95 * math.sqrt(var / n)
+
+
+def _shards(n_hands, seed, shard_hands):
+    """[(hands, seed)] per shard; worker-safe seeds spawned from one SeedSequence."""
+    n_shards = max(1, -(-n_hands // shard_hands))
+    sizes = [n_hands // n_shards + (i < n_hands % n_shards) for i in range(n_shards)]
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(n_shards)]
+    return list(zip(sizes, seeds))
+
+
+def evaluate(ckpt, n_hands=200_000, workers=None, seed=None, disable_split=False,
+             unit=UNIT, shard_hands=5_000, regret=False, ev_cache=None):
+    """
+    Merged stats for n_hands played with `ckpt` (.pth, .npz or "solver") on
+    `workers` processes. seed=None draws fresh entropy; shard seeds are spawned from it.
+    Shards depend only on (n_hands, seed, shard_hands), so a seeded run gives
+    the same numbers for any worker count. ev_cache: see play_hands.
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = [(size, s, disable_split, unit, regret, ev_cache)
+            for size, s in _shards(n_hands, seed, shard_hands)]
+
+    if workers == 1:
+        # in-process: leave the caller's torch threads alone
+        from agent.table_policy import load_policy
+        policy = load_policy(ckpt)
+        return merge(play_hands(policy, *job) for job in jobs)
+
+    ctx = mp.get_context("spawn")   # fresh interpreters: no forked torch thread pools
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(ckpt,)) as pool:
+        return merge(pool.imap(_play_shard, jobs))
+
+
+def play_hands_vec(policy, n_hands, seed, disable_split=False, unit=UNIT, n_envs=1024):
+    """
+    play_hands() on VecBlackjackEnv: n_envs tables step together and the policy
+    picks a whole batch of actions per call, so it needs select_actions() (a
+    .pth or .npz policy, not the solver). Every table starts at a random depth
+    in its shoe (VecBlackjackEnv.warm_start), so the TC bins get the same mix
+    as play_hands() however few rounds a table plays, and plays a fixed quota of
+    complete rounds, so short rounds are not over-represented. No regret.
+    """
+    if not hasattr(policy, "select_actions"):
+        raise ValueError("the vectorized backend needs a batch policy (.pth or .npz checkpoint)")
+    from env.vecBlackjackEnv import VecBlackjackEnv
+    env = VecBlackjackEnv(max(1, min(n_envs, n_hands)), seed=seed)
+    n = env.num_envs
+    quota = n_hands // n + (np.arange(n) < n_hands % n)
+    played = np.zeros(n, dtype=np.int64)
+    env.set_bet(unit)
+    env.warm_start()   # tables start mid-shoe, at the depths a long run deals from
+    states = env.reset()
+    stats = empty_stats()
+    while (played < quota).any():
+        active = played < quota
+        mask = env.legal_actions_mask()
+        if disable_split:
+            mask[:, 3] = False
+        split_legal = int(mask[active, 3].sum())
+        stats["split_legal"] += split_legal
+        stats["split_not_legal"] += int(active.sum()) - split_legal
+        actions = policy.select_actions(states, mask)
+        counts = np.bincount(actions[active], minlength=4)
+        for a in range(4):
+            stats["actions"][a] += int(counts[a])
+        stats["split_chosen"] += int(counts[3])
+        states, _, dones, info = env.step(actions)
+
+        finished = np.flatnonzero(dones & active)
+        played[finished] += 1
+        for i in finished:
+            pnl = float(info["net_result"][i])
+            stats["episodes"] += 1
+            stats["hands"] += int(info["hands_played"][i])
+            stats["pnl"] += pnl
+            stats["pnl_sq"] += pnl * pnl
+            if pnl > 0:   stats["wins"] += 1
+            elif pnl < 0: stats["losses"] += 1
+            else:         stats["draws"] += 1
+            acc = stats["bins"].setdefault(tc_to_bin(info["round_tc"][i]), [0, 0.0, 0.0])
+            acc[0] += 1; acc[1] += pnl; acc[2] += pnl * pnl
+    return stats
+
+
+def record_rounds(policy, n_rounds, seed=None, n_envs=1024):
+    """
+    The recorded hand stream for betting: policy plays n_rounds complete rounds
+    on VecBlackjackEnv at a one-unit stake (warm-started tables and a fixed
+    quota per table, as in play_hands_vec). Returns {"deck" (n, 14) pre-deal
+    deck features, "tc", "outcome" (net units), "hands"}. A bet only scales the
+    outcome, so the stream prices every bet size on the same cards.
+    """
+    from env.vecBlackjackEnv import VecBlackjackEnv
+    env = VecBlackjackEnv(max(1, min(n_envs, n_rounds)), seed=seed)
+    n = env.num_envs
+    quota = n_rounds // n + (np.arange(n) < n_rounds % n)
+    played = np.zeros(n, dtype=np.int64)
+    env.set_bet(1)    # net_result comes back in units
+    env.warm_start()
+    states = env.reset()
+    chunks = []
+    while (played < quota).any():
+        active = played < quota
+        actions = policy.select_actions(states, env.legal_actions_mask())
+        states, _, dones, info = env.step(actions)
+        finished = np.flatnonzero(dones & active)
+        if finished.size:
+            played[finished] += 1
+            chunks.append((info["round_deck"][finished], info["round_tc"][finished],
+                           info["net_result"][finished], info["hands_played"][finished]))
+    deck, tc, outcome, hands = (np.concatenate(parts) for parts in zip(*chunks))
+    return {"deck": deck, "tc": tc, "outcome": outcome.astype(np.float32), "hands": hands}
+
+
+def evaluate_vec(ckpt, n_hands=200_000, seed=None, disable_split=False, unit=UNIT, n_envs=1024):
+    """evaluate() in one process on the vectorized env, see play_hands_vec()."""
+    from agent.table_policy import load_policy
+    return play_hands_vec(load_policy(ckpt), n_hands, seed, disable_split, unit, n_envs)
+
+
+def compare(ckpt_a, ckpt_b, n_hands=50_000, workers=None, seed=None, disable_split=False,
+            unit=UNIT, shard_hands=5_000):
+    """Paired sums for two checkpoints on common shoes, see play_paired()."""
+    workers = workers or os.cpu_count() or 1
+    jobs = [(size, s, disable_split, unit) for size, s in _shards(n_hands, seed, shard_hands)]
+
+    if workers == 1:
+        from agent.table_policy import load_policy
+        policies = (load_policy(ckpt_a), load_policy(ckpt_b))
+        return merge((play_paired(*policies, *job) for job in jobs), empty_paired_stats)
+
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(ckpt_a, ckpt_b)) as pool:
+        return merge(pool.imap(_play_paired_shard, jobs), empty_paired_stats)
+
+
+def _bin_labels(tcs):
+    return [tc_to_bin(tc) for tc in tcs]
+
+
+def play_controlled(env, policy, env_b, baseline, shoe, unit=UNIT, cache=None):
+    """
+    (result a, control c) of one round dealt from `shoe`: the checkpoint plays
+    it in env, the SolverPolicy `baseline` the same cards in env_b.
+    """
+    from utils.strategy_solver import play_with_control
+    env.set_deck(shoe)
+    env_b.copy_shoe_from(env)
+    a = play_round(env, policy, unit)
+    state = env_b.reset()
+    env_b.set_bet(unit)
+    return a, unit * play_with_control(env_b, baseline, state, cache)
+
+
+def add_controlled(sums, a, c):
+    """Accumulate one (a, c) pair into the sums [n, a, a_sq, c, c_sq, ac]."""
+    sums[0] += 1
+    sums[1] += a; sums[2] += a * a
+    sums[3] += c; sums[4] += c * c
+    sums[5] += a * c
+
+
+def play_stratified(policy, n_hands, tc_bin, seed, unit=UNIT, ev_cache=None, cards_left_p=None):
+    """
+    n_hands from fresh shoes whose pre-round TC falls in tc_bin. Returns the
+    stratum's sums [n, a, a_sq, c, c_sq, ac] for the checkpoint's result a and
+    the solver's control c on the same cards (strategy_solver.play_with_control).
+    """
+    from utils.shoe_sim import sample_shoes
+    from utils.strategy_solver import SolverPolicy
+
+    rng = np.random.default_rng(seed)
+    env, env_b = BlackjackEnv(seed=rng.spawn(1)[0]), BlackjackEnv()
+    cache = None
+    if ev_cache:
+        from utils.ev_cache import EVCache, rules_spec
+        cache = EVCache(ev_cache, rules_spec(env))
+    if hasattr(policy, "bind"):
+        policy.bind(env)
+    baseline = SolverPolicy(env_b, cache)
+
+    sums = [0, 0.0, 0.0, 0.0, 0.0, 0.0]
+    pool = []
+    while sums[0] < n_hands:
+        if not pool:
+            shoes, cursors, tcs = sample_shoes(rng, 1024, env.num_deck, cards_left_p)
+            pool = [(s, c) for s, c, b in zip(shoes, cursors, _bin_labels(tcs)) if b == tc_bin]
+            continue
+        cards, cursor = pool.pop()
+        shoe = Shoe(cards=cards.tolist())
+        shoe.cursor = int(cursor)
+        add_controlled(sums, *play_controlled(env, policy, env_b, baseline, shoe, unit, cache))
+    if cache is not None:
+        cache.close()
+    return {tc_bin: sums}
+
+
+def _play_stratified_shard(args):
+    return play_stratified(_policy, *args)
+
+
+def tc_bin_weights(num_deck=6, penetration=0.25):
+    """Share of rounds per TC bin, from the cached shoe simulation."""
+    from utils.shoe_sim import tc_frequency
+    sim = tc_frequency(num_deck, penetration, n_shoes=100_000)
+    weights = dict.fromkeys(BINS, 0.0)
+    for tc, n in zip(sim["tc_values"], sim["tc_hist"]):
+        weights[tc_to_bin(tc)] += n
+    total = sum(weights.values())
+    return {b: w / total for b, w in weights.items()}
+
+
+def evaluate_vr(ckpt, n_hands=50_000, workers=None, seed=None, unit=UNIT,
+                shard_hands=2_000, ev_cache=None, num_deck=6, penetration=0.25):
+    """
+    Variance-reduced EV by TC bin: n_hands split equally over BINS, see the
+    module docstring. Returns {"bins": {bin: sums}, "weights": {bin: share of rounds}}.
+    """
+    from utils.shoe_sim import cards_left_distribution
+    workers = workers or os.cpu_count() or 1
+    cards_left_p = cards_left_distribution(num_deck, penetration)
+    per_bin = max(1, n_hands // len(BINS))
+    bin_seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(len(BINS))]
+    jobs = [(size, b, s, unit, ev_cache, cards_left_p)
+            for b, bin_seed in zip(BINS, bin_seeds)
+            for size, s in _shards(per_bin, bin_seed, shard_hands)]
+
+    if workers == 1:
+        from agent.table_policy import load_policy
+        policy = load_policy(ckpt)
+        results = [play_stratified(policy, *job) for job in jobs]
+    else:
+        ctx = mp.get_context("spawn")
+        with ctx.Pool(workers, initializer=_init_worker, initargs=(ckpt,)) as pool:
+            results = list(pool.imap(_play_stratified_shard, jobs))
+
+    bins = {}
+    for r in results:
+        for b, sums in r.items():
+            acc = bins.setdefault(b, [0, 0.0, 0.0, 0.0, 0.0, 0.0])
+            for i, v in enumerate(sums):
+                acc[i] += v
+    return {"bins": bins, "weights": tc_bin_weights(num_deck, penetration)}
+
+
+def vr_by_bin(stats):
+    """
+    TC bin -> (control-variate EV, its standard error, hands, plain mean, plain SE).
+    beta is the per-bin regression of the result on the control.
+    """
+    out = {}
+    for b in BINS:
+        if b not in stats["bins"]:
+            continue
+        n, a, a_sq, c, c_sq, ac = stats["bins"][b]
+        if n < 3:
+            continue
+        mean_a, mean_c = a / n, c / n
+        var_a = max(0.0, (a_sq - n * mean_a ** 2) / (n - 1))
+        var_c = max(0.0, (c_sq - n * mean_c ** 2) / (n - 1))
+        cov = (ac - n * mean_a * mean_c) / (n - 1)
+        beta = cov / var_c if var_c > 0 else 0.0
+        var_cv = max(0.0, var_a - 2 * beta * cov + beta ** 2 * var_c)
+        out[b] = (mean_a - beta * mean_c, math.sqrt(var_cv / n), n, mean_a, math.sqrt(var_a / n))
+    return out
+
+
+def stratified_ev(stats):
+    """(overall EV/hand, standard error): per-bin CV estimates weighted by bin frequency."""
+    per_bin = vr_by_bin(stats)
+    ev = sum(stats["weights"][b] * est for b, (est, *_rest) in per_bin.items())
+    se = math.sqrt(sum((stats["weights"][b] * se) ** 2 for b, (_, se, *_rest) in per_bin.items()))
+    return ev, se
+
+
+def report_vr(stats):
+    print("\n=== Variance-reduced EV by TC (stratified + solver control variate) ===")
+    for b, (ev, se, n, plain, plain_se) in vr_by_bin(stats).items():
+        ratio = (se / plain_se) ** 2 if plain_se else float("nan")
+        print(f"TC {b:>3}: EV/hand=${ev:+.3f} ± {Z95 * se:.3f}  "
+              f"(plain ${plain:+.3f} ± {Z95 * plain_se:.3f}, variance x{ratio:.2f}, {n} hands)")
+    ev, se = stratified_ev(stats)
+    print(f"Overall (bin-weighted): ${ev:+.3f} ± {Z95 * se:.3f} per hand")
+
+
+def ev_by_bin(stats):
+    """TC bin -> (EV/hand, 95% half-width, hands)."""
+    out = {}
+    for b in BINS:
+        if b in stats["bins"]:
+            n, pnl, sq = stats["bins"][b]
+            mean, ci = mean_ci(n, pnl, sq)
+            out[b] = (mean, ci, n)
+    return out
+
+
+def report(stats):
+    n = stats["episodes"]
+    mean, ci = mean_ci(n, stats["pnl"], stats["pnl_sq"])
+    print("\n=== Evaluation Results ===")
+    print(f"Episodes Played:  {n}")
+    print(f"Wins:             {stats['wins']}")
+    print(f"Losses:           {stats['losses']}")
+    print(f"Draws:            {stats['draws']}")
+    print(f"Win Rate:         {stats['wins'] / n:.2%}")
+    print(f"Loss Rate:        {stats['losses'] / n:.2%}")
+    print(f"Draw Rate:        {stats['draws'] / n:.2%}")
+    print(f"Average $ per Episode: {mean:+.3f} ± {ci:.3f}")
+    print(f"Average $ per Hand:    {stats['pnl'] / max(1, stats['hands']):+.3f}")
+    print("Actions Count:", dict(zip(["HIT", "STAND", "DOUBLE", "SPLIT"], stats["actions"])))
+    for b, (ev, ci, count) in ev_by_bin(stats).items():
+        print(f"TC {b:>3}: EV/hand=${ev:+.3f} ± {ci:.3f}  ({count} hands)")
+    if stats["decisions"]:
+        d = stats["decisions"]
+        mean, ci = mean_ci(d, stats["regret"], stats["regret_sq"])
+        print(f"Regret vs solver: {mean:.4f} ± {ci:.4f} bets/decision, "
+              f"{stats['mistakes'] / d:.2%} of {d} decisions differ in EV")
+    lookups = stats["ev_cache_mem_hits"] + stats["ev_cache_disk_hits"] + stats["ev_cache_misses"]
+    if lookups:
+        print(f"EV cache: {stats['ev_cache_mem_hits']} memory hits, {stats['ev_cache_disk_hits']} disk hits, "
+              f"{stats['ev_cache_misses']} misses")
+
+
+def report_paired(stats, name_a="A", name_b="B"):
+    n = stats["pairs"]
+    ev_a, ci_a = mean_ci(n, stats["a"], stats["a_sq"])
+    ev_b, ci_b = mean_ci(n, stats["b"], stats["b_sq"])
+    diff, ci_paired = mean_ci(n, stats["diff"], stats["diff_sq"])
+    ci_indep = math.hypot(ci_a, ci_b)   # what two independent runs of n hands would give
+    print("\n=== Paired comparison (common shoes) ===")
+    print(f"Hands:        {n}  ({stats['same'] / n:.1%} with identical results)")
+    print(f"{name_a}: ${ev_a:+.3f} ± {ci_a:.3f} per episode")
+    print(f"{name_b}: ${ev_b:+.3f} ± {ci_b:.3f} per episode")
+    print(f"A - B:        ${diff:+.3f} ± {ci_paired:.3f}  (independent runs: ± {ci_indep:.3f})")
+    if ci_paired > 0:
+        print(f"Same confidence as independent runs with {(ci_paired / ci_indep) ** 2:.1%} of the hands")
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Parallel evaluation of a playing checkpoint.")
+    parser.add_argument("ckpt", help='.pth, .npz, or "solver"')
+    parser.add_argument("--hands", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=None, help="defaults to all cores")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--disable-split", action="store_true")
+    parser.add_argument("--regret", action="store_true", help="score every decision against the solver")
+    parser.add_argument("--ev-cache", default="checkpoints/cache/ev_cache.sqlite",
+                        help='persistent solver cache, "" to disable')
+    parser.add_argument("--compare", metavar="CKPT_B", default=None,
+                        help="play CKPT_B on the same shoes and report the paired difference")
+    parser.add_argument("--vr", action="store_true",
+                        help="variance-reduced EV by TC bin (stratified + solver control variate)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.vr:
+        stats = evaluate_vr(args.ckpt, args.hands, args.workers, args.seed,
+                            ev_cache=args.ev_cache or None)
+        elapsed = time.perf_counter() - start
+        report_vr(stats)
+    elif args.compare:
+        stats = compare(args.ckpt, args.compare, args.hands, args.workers, args.seed, args.disable_split)
+        elapsed = time.perf_counter() - start
+        report_paired(stats, args.ckpt, args.compare)
+    else:
+        stats = evaluate(args.ckpt, args.hands, args.workers, args.seed, args.disable_split,
+                         regret=args.regret, ev_cache=args.ev_cache or None)
+        elapsed = time.perf_counter() - start
+        report(stats)
+    print(f"\n{args.hands:,} hands in {elapsed:.1f}s ({args.hands / elapsed:,.0f} hands/sec)")
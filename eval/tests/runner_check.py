@@ -0,0 +1,110 @@
+# eval/tests/runner_check.py
+#   python -m eval.tests.runner_check
+
+import math
+import numpy as np
+from env.blackjackEnv import BlackjackEnv
+from env.vecBlackjackEnv import VecBlackjackEnv
+from env.shoe import Shoe
+from agent.table_policy import load_policy
+from eval.runner import (UNIT, Z95, BINS, play_controlled, add_controlled, vr_by_bin, tc_to_bin,
+                         evaluate_vec, tc_bin_weights)
+from utils.shoe_sim import sample_shoes
+from utils.strategy_solver import SolverPolicy
+from config import EVAL_CKPT
+
+
+def check_cv_mean_matches_plain(ckpt=EVAL_CKPT, n_rounds=3000, seed=7):
+    """
+    One fixed pre-round shoe, its unseen cards reshuffled every round: the
+    control-variate EV and the plain mean estimate the same number.
+    """
+    rng = np.random.default_rng(seed)
+    shoes, cursors, _ = sample_shoes(rng, 1)
+    cards, cursor = shoes[0], int(cursors[0])
+    env, env_b = BlackjackEnv(seed=seed), BlackjackEnv()
+    policy = load_policy(ckpt)
+    if hasattr(policy, "bind"):
+        policy.bind(env)
+    baseline = SolverPolicy(env_b)
+
+    sums = [0, 0.0, 0.0, 0.0, 0.0, 0.0]
+    for _ in range(n_rounds):
+        shuffled = cards.copy()
+        shuffled[cursor:] = rng.permutation(shuffled[cursor:])
+        shoe = Shoe(cards=shuffled.tolist())
+        shoe.cursor = cursor
+        add_controlled(sums, *play_controlled(env, policy, env_b, baseline, shoe, UNIT))
+    cv, se, _, plain, plain_se = vr_by_bin({"bins": {"0": sums}})["0"]
+    assert abs(cv - plain) < Z95 * math.hypot(se, plain_se), (cv, se, plain, plain_se)
+    assert se < plain_se, (se, plain_se)
+    return cv, se, plain, plain_se
+
+
+def check_round_tc_parity_across_reshuffle(seed=3, n_cards=95, n_rounds=8):
+    """
+    The TC play_hands() (env.round_tc) and play_hands_vec() (info["round_tc"])
+    bin a round by, on the same seeded shoe played stand-only: the shoe runs
+    below the cut card after a few rounds, and the first round after the
+    reshuffle must land in the fresh shoe's bin on both backends.
+    """
+    rng = np.random.default_rng(seed)
+    cards = rng.permutation(VecBlackjackEnv(1).base_shoe)[:n_cards].tolist()
+    deck = ["A" if c == 11 else c for c in cards]
+
+    env = BlackjackEnv(seed=seed)
+    env.set_deck(deck)
+    scalar, fresh = [], None
+    for k in range(n_rounds):
+        if fresh is None and k and len(env.deck) <= env.penetration * 52 * env.num_deck:
+            fresh = k   # this reset() reshuffles
+        env.reset()
+        env.set_bet(UNIT)
+        while not env.done:
+            env.step(1)
+        scalar.append((env.round_tc, env.payout_tracker.get_info()["net_result"]))
+
+    vec = VecBlackjackEnv(1, seed=seed)
+    vec.set_bet(UNIT)
+    vec.set_shoe(0, deck)
+    vec.reset()
+    vectorized = []
+    while len(vectorized) < n_rounds:
+        _, _, dones, info = vec.step(np.ones(1, dtype=np.int64))
+        if dones[0]:
+            vectorized.append((info["round_tc"][0], info["net_result"][0]))
+
+    # rounds dealt from the seeded shoe match card for card; after the reshuffle
+    # the shoes differ, but the first round is dealt from a fresh one (TC 0) on both
+    assert fresh is not None, "the seeded shoe never reached the cut card"
+    for k in range(fresh):
+        assert abs(scalar[k][0] - vectorized[k][0]) < 1e-9 and scalar[k][1] == vectorized[k][1], (k, scalar, vectorized)
+    assert scalar[fresh][0] == vectorized[fresh][0] == 0, (scalar[fresh], vectorized[fresh])
+    assert [tc_to_bin(tc) for tc, _ in scalar[:fresh + 1]] == [tc_to_bin(tc) for tc, _ in vectorized[:fresh + 1]]
+
+
+def check_vec_bin_distribution(ckpt=EVAL_CKPT, n_hands=20_000, seed=0, tolerance=0.03):
+    """
+    play_hands_vec() with its default 1024 tables plays ~20 rounds per table,
+    under half a shoe: its rounds must still spread over the TC bins like the
+    simulated shoe (tc_bin_weights, what play_hands converges to), not pile up
+    at the fresh-shoe TC 0.
+    """
+    stats = evaluate_vec(ckpt, n_hands, seed=seed)
+    weights = tc_bin_weights()
+    shares = {b: stats["bins"].get(b, [0])[0] / n_hands for b in BINS}
+    for b in BINS:
+        assert abs(shares[b] - weights[b]) < tolerance, (b, shares, weights)
+    return shares, weights
+
+
+if __name__ == "__main__":
+    check_round_tc_parity_across_reshuffle()
+    print("check_round_tc_parity_across_reshuffle: ok")
+    shares, weights = check_vec_bin_distribution()
+    print(f"check_vec_bin_distribution: ok  TC 0 {shares['0']:.1%} (shoe sim {weights['0']:.1%}), "
+          f"≤-5 {shares['≤-5']:.1%} ({weights['≤-5']:.1%}), ≥5 {shares['≥5']:.1%} ({weights['≥5']:.1%})")
+    for ckpt in (EVAL_CKPT, "solver"):
+        cv, se, plain, plain_se = check_cv_mean_matches_plain(ckpt)
+        print(f"check_cv_mean_matches_plain({ckpt}): ok  "
+              f"cv ${cv:+.3f} ± {Z95 * se:.3f}, plain ${plain:+.3f} ± {Z95 * plain_se:.3f}")
@@ -0,0 +1,123 @@
+import numpy as np
+from memory.replay_buffer import Replay_Buffer
+
+
+class SumTree:
+    """
+    Array-backed sum tree over `capacity` leaves. Updates and prefix-sum
+    lookups are vectorized over a whole batch, O(batch * log capacity).
+    """
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.leaves = 1
+        while self.leaves < capacity:
+            self.leaves *= 2
+        self.depth = self.leaves.bit_length() - 1
+        self.tree = np.zeros(2 * self.leaves, dtype=np.float64)   # node 1 is the root
+
+    @property
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def get(self, idx):
+        return self.tree[self.leaves + idx]
+
+    def update(self, idx, priorities):
+        """Set leaf priorities and refresh their ancestors (idx: int or array)."""
+        tree = self.tree
+        if np.isscalar(idx):
+            node = self.leaves + int(idx)
+            tree[node] = priorities
+            node //= 2
+            while node:
+                tree[node] = tree[2 * node] + tree[2 * node + 1]
+                node //= 2
+            return
+        nodes = self.leaves + np.asarray(idx)
+        tree[nodes] = priorities
+        # repeated parents just get the same sum written twice
+        for _ in range(self.depth):
+            nodes //= 2
+            tree[nodes] = tree[2 * nodes] + tree[2 * nodes + 1]
+
+    def find(self, values):
+        """Leaf index whose prefix-sum interval contains each value."""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(values.shape, dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = values > left_sum
+            values -= np.where(go_right, left_sum, 0.0)
+            nodes = np.where(go_right, left + 1, left)
+        return np.minimum(nodes - self.leaves, self.capacity - 1)
+
+
+class Prioritized_Replay_Buffer(Replay_Buffer):
+    """
+    Replay_Buffer with proportional prioritized sampling (Schaul et al. 2015).
+
+    P(i) ∝ (|td_i| + eps)^alpha * bucket_weight[bucket(i)], so the TC buckets
+    can still bias sampling on top of the TD-error priority. New transitions
+    get the largest priority seen so far. sample_prioritized() also returns the
+    slots and importance-sampling weights (annealed with beta -> 1); feed the
+    new TD errors back with update_priorities().
+    """
+    def __init__(self, capacity: int, tc_idx: int = -1, state_dim: int = None,
+                 tc_edges=(-2, 3), bucket_mix=(0.0, 0.0, 0.7),
+                 alpha: float = 0.6, beta: float = 0.4, beta_increment: float = 1e-6,
+                 eps: float = 1e-3, bucket_weight=None, seed=None, n_step: int = 1,
+                 gamma: float = 0.99):
+        super().__init__(capacity, tc_idx, state_dim, tc_edges, bucket_mix, seed, n_step, gamma)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.eps = eps
+        if bucket_weight is None:
+            bucket_weight = [1.0] * self.n_buckets
+        if len(bucket_weight) != self.n_buckets:
+            raise ValueError(f"bucket_weight needs {self.n_buckets} entries, got {len(bucket_weight)}")
+        self.bucket_weight = np.asarray(bucket_weight, dtype=np.float64)
+        self.tree = SumTree(capacity)
+        self.priorities = np.zeros(capacity, dtype=np.float64)   # |td| + eps, before alpha
+        self.max_priority = 1.0
+
+    def _set_priorities(self, idx, priorities):
+        self.priorities[idx] = priorities
+        weight = self.bucket_weight[self.bins[idx]]
+        self.tree.update(idx, priorities ** self.alpha * weight)
+
+    def _write(self, state, action, reward, next_state, done, discount):
+        i = self.pos
+        super()._write(state, action, reward, next_state, done, discount)
+        self.priorities[i] = self.max_priority
+        self.tree.update(i, self.max_priority ** self.alpha * self.bucket_weight[self.bins[i]])
+
+    def sample_prioritized(self, batch_size: int):
+        """
+        Stratified proportional sample: one draw per equal slice of the total.
+        Returns ((states, actions, rewards, next_states, dones), idx, weights).
+        """
+        idx, weights = self.sample_prioritized_idx(batch_size)
+        return self.gather(idx), idx, weights
+
+    def sample_prioritized_idx(self, batch_size: int):
+        """(slots, importance-sampling weights) for sample_prioritized()."""
+        if self.size < batch_size:
+            raise ValueError("Buffer smaller than batch_size")
+        total = self.tree.total
+        bounds = np.linspace(0.0, total, batch_size + 1)
+        values = self.rng.uniform(bounds[:-1], bounds[1:])
+        # slots fill from 0 up, so round-off landing on an empty leaf is clamped back
+        idx = np.minimum(self.tree.find(values), self.size - 1)
+
+        probs = np.maximum(self.tree.get(idx) / total, 1e-12)
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        weights = (self.size * probs) ** (-self.beta)
+        weights /= weights.max()
+        return idx, weights.astype(np.float32)
+
+    def update_priorities(self, idx, td_errors):
+        priorities = np.abs(np.asarray(td_errors, dtype=np.float64)) + self.eps
+        self._set_priorities(idx, priorities)
+        self.max_priority = max(self.max_priority, float(priorities.max()))
@@ -1,61 +1,148 @@
+from bisect import bisect_right
+from collections import deque
 import numpy as np
 
 
+def mix_counts(batch_size, mix):
+    """
+    Per-bucket counts for a batch, then the uniform rest: floors of
+    batch_size * share, the leftover slots to the largest remainders, so the
+    counts always add up to batch_size.
+    """
+    shares = np.append(np.asarray(mix, dtype=float), max(0.0, 1.0 - float(np.sum(mix))))
+    quotas = batch_size * shares / shares.sum()
+    counts = np.floor(quotas).astype(np.int64)
+    short = batch_size - int(counts.sum())
+    counts[np.argsort(counts - quotas, kind="stable")[:short]] += 1
+    return counts
+
+
 class Replay_Buffer:
     """
     Fixed-size ring buffer with TC buckets for O(batch) weighted sampling.
     Buckets by the decision-time true count taken from `state[tc_idx]`.
+
+    Transitions live in preallocated contiguous arrays (one per field), so a
+    batch is one fancy-index gather per field. The arrays are allocated on the
+    first add() unless `state_dim` is given.
+
+    tc_edges split the TC axis into len(tc_edges)+1 buckets: bucket 0 is
+    tc <= tc_edges[0], bucket k is tc_edges[k-1] <= tc < tc_edges[k] and the last
+    is tc >= tc_edges[-1]. The defaults give the lo / mid / hi buckets
+    (tc <= -2, in between, tc >= 3). bucket_mix is the share of each batch drawn
+    from each bucket in sample_weighted(); the rest is drawn uniformly.
+    Sampling draws from the buffer's own Generator (`seed`: int, SeedSequence,
+    Generator or None).
+
+    n_step > 1 stores n-step returns: a transition waits until n later rewards
+    (or the end of the episode) are known and is written as
+    (s_t, a_t, r_t + gamma r_t+1 + ..., s_t+n, done) with its bootstrap
+    discount gamma^k in `discounts` (gamma for 1-step transitions).
     """
-    def __init__(self, capacity: int, tc_idx: int = -1):
+    def __init__(self, capacity: int, tc_idx: int = -1, state_dim: int = None,
+                 tc_edges=(-2, 3), bucket_mix=(0.0, 0.0, 0.7), seed=None,
+                 n_step: int = 1, gamma: float = 0.99):
         self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.n_step = n_step
+        self.gamma = gamma
+        self.pending = deque()   # n_step > 1: transitions still collecting rewards
         self.tc_idx = tc_idx  # index of true_count in STATE (use -1 if last)
-        self.buffer = [None] * capacity            # (state, action, reward, next_state, done)
+        self.state_dim = None
+        if state_dim is not None:
+            self._allocate(state_dim)
         self.tc_vals = np.full(capacity, np.nan, dtype=float)
-        self.bins = np.full(capacity, -1, dtype=np.int8)   # -1 empty, 0 lo, 1 mid, 2 hi
+        self.bins = np.full(capacity, -1, dtype=np.int8)   # -1 empty, else bucket id
         self.pos = 0
         self.size = 0
 
-        # buckets as sets for fast add/remove
-        self.idx_lo, self.idx_mid, self.idx_hi = set(), set(), set()
+        self.tc_edges = list(tc_edges)
+        self.n_buckets = len(self.tc_edges) + 1
+        if len(bucket_mix) != self.n_buckets:
+            raise ValueError(f"bucket_mix needs {self.n_buckets} entries, got {len(bucket_mix)}")
+        if sum(bucket_mix) > 1 + 1e-9:   # float sums like 0.1 + 0.2 + 0.7 land a hair above 1
+            raise ValueError("bucket_mix shares must add up to at most 1")
+        self.bucket_mix = list(bucket_mix)
+
+        # buckets as dense index arrays; swap-remove keeps add/remove O(1)
+        idx_dtype = np.int32 if capacity < 2**31 else np.int64
+        self.bucket_idx = np.zeros((self.n_buckets, capacity), dtype=idx_dtype)
+        self.bucket_len = np.zeros(self.n_buckets, dtype=np.int64)
+        self.bucket_pos = np.zeros(capacity, dtype=idx_dtype)   # slot -> position in its bucket
 
         # optional action mix tracker
         self.actions_count = {0: 0, 1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
 
     # ---- helpers ----
-    @staticmethod
-    def _bin_for_tc(tc: float) -> int:
-        if tc >= 3:
-            return 2  # hi
-        if tc <= -2:
-            return 0  # lo
-        return 1      # mid
+    def _allocate(self, state_dim: int):
+        self.state_dim = state_dim
+        self.states = np.zeros((self.capacity, state_dim), dtype=np.float32)
+        self.actions = np.zeros(self.capacity, dtype=np.int64)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.next_states = np.zeros((self.capacity, state_dim), dtype=np.float32)
+        self.dones = np.zeros(self.capacity, dtype=np.bool_)
+        self.discounts = np.zeros(self.capacity, dtype=np.float32)
+
+    def gather(self, idx):
+        return (
+            self.states[idx],
+            self.actions[idx],
+            self.rewards[idx],
+            self.next_states[idx],
+            self.dones[idx],
+        )
+
+    def _bin_for_tc(self, tc: float) -> int:
+        if tc <= self.tc_edges[0]:
+            return 0
+        return bisect_right(self.tc_edges, tc)
 
     def _remove_from_bucket(self, i: int):
         b = self.bins[i]
-        if b == 0:
-            self.idx_lo.discard(i)
-        elif b == 1:
-            self.idx_mid.discard(i)
-        elif b == 2:
-            self.idx_hi.discard(i)
+        if b < 0:
+            return
+        # move the bucket's last slot into i's position
+        p = self.bucket_pos[i]
+        last = self.bucket_idx[b, self.bucket_len[b] - 1]
+        self.bucket_idx[b, p] = last
+        self.bucket_pos[last] = p
+        self.bucket_len[b] -= 1
         self.bins[i] = -1
 
     def _add_to_bucket(self, i: int, b: int):
         self.bins[i] = b
-        if b == 0:
-            self.idx_lo.add(i)
-        elif b == 1:
-            self.idx_mid.add(i)
-        elif b == 2:
-            self.idx_hi.add(i)
-
-    # ---- public API ----
-    def add(self, state, action, reward, next_state, done):
-        """Add new experience, overwriting old slot if buffer is full."""
-        if self.size == self.capacity and self.buffer[self.pos] is not None:
+        p = self.bucket_len[b]
+        self.bucket_idx[b, p] = i
+        self.bucket_pos[i] = p
+        self.bucket_len[b] += 1
+
+    def bucket(self, b: int):
+        """Slots currently in bucket b (a view, do not modify)."""
+        return self.bucket_idx[b, :self.bucket_len[b]]
+
+    def _write_oldest_pending(self):
+        state, action = self.pending[0][:2]
+        ret, discount = 0.0, 1.0
+        for _, _, reward, next_state, done in self.pending:
+            ret += discount * reward
+            discount *= self.gamma
+        self._write(state, action, ret, next_state, done, discount)
+        self.pending.popleft()
+
+    def _write(self, state, action, reward, next_state, done, discount):
+        """Store one (possibly n-step) transition at self.pos."""
+        if self.state_dim is None:
+            self._allocate(len(state))
+        if self.size == self.capacity:
             self._remove_from_bucket(self.pos)
 
-        self.buffer[self.pos] = (state, action, reward, next_state, done)
+        i = self.pos
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.discounts[i] = discount
         if action in self.actions_count:
             self.actions_count[action] += 1
 
@@ -67,54 +154,65 @@ class Replay_Buffer:
         self.pos = (self.pos + 1) % self.capacity
         self.size = min(self.size + 1, self.capacity)
 
+    # ---- public API ----
+    def add(self, state, action, reward, next_state, done):
+        """Add new experience, overwriting old slot if buffer is full."""
+        if self.n_step == 1:
+            self._write(state, action, reward, next_state, done, self.gamma)
+            return
+        self.pending.append((state, action, reward, next_state, done))
+        if done:
+            while self.pending:
+                self._write_oldest_pending()
+        elif len(self.pending) == self.n_step:
+            self._write_oldest_pending()
+
+    def flush(self):
+        """Write out pending n-step transitions of an episode cut short (bootstrapped, not done)."""
+        while self.pending:
+            self._write_oldest_pending()
+
     def sample(self, batch_size: int):
         """Uniform sample."""
         if self.size < batch_size:
             raise ValueError("Buffer smaller than batch_size")
-        idx = np.random.randint(0, self.size, size=batch_size)
-        batch = [self.buffer[i] for i in idx]
-        states, actions, rewards, next_states, dones = zip(*batch)
-        return (
-            np.asarray(states),
-            np.asarray(actions),
-            np.asarray(rewards, dtype=np.float32),
-            np.asarray(next_states),
-            np.asarray(dones, dtype=np.bool_),
-        )
+        idx = self.rng.integers(0, self.size, size=batch_size)
+        return self.gather(idx)
 
-    def sample_weighted(self, batch_size: int, mix: float = 0.7):
-        """
-        Weighted sample favoring decision-time high TC:
-          - take ≈ mix * batch_size from hi bucket (TC>=3), with fallback
-          - take the rest uniformly from all filled slots
-        O(batch) without scanning.
-        """
+    def sample_weighted_idx(self, batch_size: int, mix=None):
+        """Slot indices for sample_weighted(), see there."""
         if self.size < batch_size:
             raise ValueError("Buffer smaller than batch_size")
 
-        n_hi = int(round(batch_size * mix))
-        picks = []
-
-        # sample from high-TC bucket (fallback if small)
-        if self.idx_hi and n_hi > 0:
-            hi_pool = np.fromiter(self.idx_hi, dtype=int)
-            take = min(n_hi, hi_pool.size)
-            picks.extend(np.random.choice(hi_pool, size=take, replace=True).tolist())
+        if mix is None:
+            mix = self.bucket_mix
+        elif np.isscalar(mix):
+            mix = [0.0] * (self.n_buckets - 1) + [mix]   # old API: share of the top bucket only
 
-        need = batch_size - len(picks)
+        picks = []
+        for b, n_b in enumerate(mix_counts(batch_size, mix)[:-1]):
+            size = int(self.bucket_len[b])
+            if n_b <= 0 or size == 0:
+                continue
+            # fallback if the bucket is small: never take more than it holds
+            take = min(n_b, size)
+            picks.append(self.bucket_idx[b, self.rng.integers(0, size, size=take)])
+
+        need = batch_size - sum(p.size for p in picks)
         if need > 0:
-            all_idx = np.arange(self.size)
-            picks.extend(np.random.choice(all_idx, size=need, replace=True).tolist())
+            picks.append(self.rng.integers(0, self.size, size=need))
 
-        batch = [self.buffer[i] for i in picks]
-        states, actions, rewards, next_states, dones = zip(*batch)
-        return (
-            np.asarray(states),
-            np.asarray(actions),
-            np.asarray(rewards, dtype=np.float32),
-            np.asarray(next_states),
-            np.asarray(dones, dtype=np.bool_),
-        )
+        return np.concatenate(picks)
+
+    def sample_weighted(self, batch_size: int, mix=None):
+        """
+        Weighted sample by decision-time TC bucket:
+          - take mix[b] * batch_size from each bucket b (mix_counts()), with fallback
+          - take the rest uniformly from all filled slots
+        mix defaults to bucket_mix; a float is the old API (share of the top bucket).
+        O(batch) without scanning.
+        """
+        return self.gather(self.sample_weighted_idx(batch_size, mix))
 
     def __len__(self):
         return self.size
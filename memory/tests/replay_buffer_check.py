@@ -0,0 +1,47 @@
+# memory/tests/replay_buffer_check.py
+#   python -m memory.tests.replay_buffer_check
+
+import numpy as np
+from memory.replay_buffer import Replay_Buffer, mix_counts
+
+MIXES = [(0.1, 0.2, 0.7), (1 / 3, 1 / 3, 1 / 3), (0.25, 0.25, 0.5), (0.0, 0.0, 0.7), (0.15, 0.15, 0.15)]
+BATCH_SIZES = [1, 7, 32, 33, 64, 100, 1000]
+
+
+def filled_buffer(mix, capacity=5000, seed=0):
+    """Every bucket holds well over a batch: TCs spread evenly over -6..6."""
+    rng = np.random.default_rng(seed)
+    buffer = Replay_Buffer(capacity, state_dim=3, bucket_mix=mix, seed=seed)
+    for _ in range(capacity):
+        state = np.array([0.0, 0.0, rng.uniform(-6, 6)], dtype=np.float32)
+        buffer.add(state, 0, 0.0, state, True)
+    return buffer
+
+
+def check_mix_counts():
+    for mix in MIXES:
+        for batch_size in BATCH_SIZES:
+            counts = mix_counts(batch_size, mix)
+            assert counts.sum() == batch_size, (mix, batch_size, counts)
+            quotas = batch_size * np.append(mix, max(0.0, 1 - sum(mix)))
+            assert np.all(np.abs(counts - quotas) < 1), (mix, batch_size, counts)
+
+
+def check_sample_weighted_idx():
+    for mix in MIXES:
+        buffer = filled_buffer(mix)
+        for batch_size in BATCH_SIZES:
+            idx = buffer.sample_weighted_idx(batch_size)
+            assert idx.size == batch_size, (mix, batch_size, idx.size)
+            per_bucket = np.bincount(buffer.bins[idx], minlength=buffer.n_buckets)
+            counts = mix_counts(batch_size, mix)[:-1]
+            if abs(sum(mix) - 1) < 1e-9:
+                assert np.array_equal(per_bucket, counts), (mix, batch_size, per_bucket, counts)
+            else:   # the uniform rest lands in any bucket
+                assert np.all(per_bucket >= counts), (mix, batch_size, per_bucket, counts)
+
+
+if __name__ == "__main__":
+    for check in (check_mix_counts, check_sample_weighted_idx):
+        check()
+        print(f"{check.__name__}: ok")
@@ -0,0 +1,84 @@
+"""
+Frozen NumPy evaluator for the three-layer MLPs (DQN, Betting_DQN), used by
+the agents in eval mode (DQN_Agent.freeze() / Betting_Agent.freeze()).
+
+Weights are copied out of the module once, transposed to (in, out) so a
+forward pass is three matmuls into preallocated activation buffers, with the
+bias add and ReLU done in place. dtype picks the weight storage:
+  float32   exact copy of the checkpoint
+  float16   weights rounded to half precision
+  int8      symmetric per-output-unit int8 with a float32 scale per unit
+Quantized weights are dequantized to float32 once at freeze time (NumPy has
+no fast half/int8 matmul on CPU), so the quantized modes cost no speed and
+show what the rounding does to the greedy actions; `nbytes` is the size of
+the stored weights.
+"""
+import numpy as np
+
+DTYPES = ("float32", "float16", "int8")
+
+
+def _quantize(w, dtype):
+    """(stored weights, float32 scale per output column or None) for a (in, out) matrix."""
+    if dtype == "float32":
+        return w.astype(np.float32), None
+    if dtype == "float16":
+        return w.astype(np.float16), None
+    if dtype == "int8":
+        scale = np.abs(w).max(axis=0) / 127.0
+        scale[scale == 0] = 1.0
+        return np.clip(np.rint(w / scale), -127, 127).astype(np.int8), scale.astype(np.float32)
+    raise ValueError(f"unsupported dtype {dtype!r}, expected one of {DTYPES}")
+
+
+class FrozenMLP:
+    """relu(relu(x W1 + b1) W2 + b2) W3 + b3 in NumPy; call it on a (B, in) or (in,) array."""
+    def __init__(self, weights, biases, dtype="float32", batch=1):
+        self.dtype = dtype
+        self.stored = [_quantize(np.asarray(w, dtype=np.float32), dtype) for w in weights]
+        self.weights = [np.ascontiguousarray(q.astype(np.float32) * (s if s is not None else 1.0))
+                        for q, s in self.stored]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.in_dim = self.weights[0].shape[0]
+        self.out_dim = self.weights[-1].shape[1]
+        self._allocate(batch)
+
+    @classmethod
+    def from_module(cls, module, dtype="float32", batch=1):
+        """Freeze the nn.Linear layers of `module`, in definition order (ReLU between them)."""
+        import torch.nn as nn
+        layers = [m for m in module.children() if isinstance(m, nn.Linear)]
+        weights = [m.weight.detach().cpu().numpy().T for m in layers]
+        biases = [m.bias.detach().cpu().numpy() for m in layers]
+        return cls(weights, biases, dtype, batch)
+
+    def _allocate(self, batch):
+        self.batch = batch
+        self.buffers = [np.empty((batch, w.shape[1]), dtype=np.float32) for w in self.weights]
+
+    @property
+    def nbytes(self):
+        return sum(q.nbytes + (s.nbytes if s is not None else 0) for q, s in self.stored) + \
+            sum(b.nbytes for b in self.biases)
+
+    def __call__(self, x):
+        """
+        Q-values for x. The result is a view into an activation buffer that the
+        next call overwrites: argmax it (or copy it) before calling again.
+        """
+        x = np.asarray(x, dtype=np.float32)
+        single = x.ndim == 1
+        if single:
+            x = x[None, :]
+        n = x.shape[0]
+        if n > self.batch:
+            self._allocate(n)
+        last = len(self.weights) - 1
+        for k, (w, b, buf) in enumerate(zip(self.weights, self.biases, self.buffers)):
+            out = buf[:n]
+            np.matmul(x, w, out=out)
+            out += b
+            if k < last:
+                np.maximum(out, 0.0, out=out)
+            x = out
+        return x[0] if single else x
@@ -0,0 +1,263 @@
+"""
+Actor/learner training for the playing DQN.
+
+Actor processes play BlackjackEnv with their own copy of the Q-network and
+write transitions in blocks into a per-actor shared-memory ring; only
+(actor, slot, count) goes through a queue. The learner process runs
+agent.train() continuously and takes one block into its Replay_Buffer every
+updates_per_block updates (the replay ratio); actors wait when their ring is
+full, so they never run far ahead of the learner. The learner publishes
+its weights to a shared-memory vector every SYNC_EVERY gradient steps; actors
+pick up a new version between episodes. Transitions/sec and gradient
+steps/sec are printed every PRINT_SECONDS.
+
+Episodes and rewards follow train/train_dqn.py (greedy-epsilon play, -0.2 per
+step after the fourth). Run from the repo root:
+  python -m train.actor_learner --actors 3 --grad-steps 200000
+"""
+import multiprocessing as mp
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+STATE_DIM = 17
+SLOT_SIZE = 256          # transitions per block
+SLOTS_PER_ACTOR = 8
+SYNC_EVERY = 500         # learner grad steps between weight publishes
+UPDATES_PER_BLOCK = 16   # grad steps per ingested block: batch * 16 / 256 = 2 samples per transition
+WARMUP = 1500            # transitions in the buffer before the first update
+PRINT_SECONDS = 10.0
+
+
+class TransitionRing:
+    """SLOTS blocks of SLOT_SIZE transitions in one SharedMemory segment."""
+    FIELDS = (("states", np.float32, (STATE_DIM,)), ("actions", np.int64, ()),
+              ("rewards", np.float32, ()), ("next_states", np.float32, (STATE_DIM,)),
+              ("dones", np.bool_, ()))
+
+    def __init__(self, n_slots=SLOTS_PER_ACTOR, slot_size=SLOT_SIZE, name=None):
+        self.n_slots, self.slot_size = n_slots, slot_size
+        shapes = [(n_slots, slot_size) + extra for _, _, extra in self.FIELDS]
+        sizes = [int(np.prod(s)) * np.dtype(dt).itemsize for s, (_, dt, _) in zip(shapes, self.FIELDS)]
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=sum(sizes))
+        offset = 0
+        for (field, dtype, _), shape, size in zip(self.FIELDS, shapes, sizes):
+            setattr(self, field, np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset))
+            offset += size
+
+    def spec(self):
+        return self.shm.name, self.n_slots, self.slot_size
+
+    def close(self, unlink=False):
+        for field, _, _ in self.FIELDS:
+            setattr(self, field, None)   # drop the views before closing the segment
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class ParamBroadcast:
+    """Flat float32 copy of a network's parameters plus a version number."""
+    def __init__(self, n_params, name=None, version=None, lock=None):
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=4 * n_params)
+        self.flat = np.ndarray((n_params,), dtype=np.float32, buffer=self.shm.buf)
+        self.version = version if version is not None else mp.get_context("spawn").Value("i", 0)
+        self.lock = lock if lock is not None else mp.get_context("spawn").Lock()
+
+    def spec(self):
+        return self.shm.name, self.flat.size, self.version, self.lock
+
+    def publish(self, network):
+        import torch
+        with self.lock:
+            self.flat[:] = torch.nn.utils.parameters_to_vector(network.parameters()).detach().cpu().numpy()
+            self.version.value += 1
+
+    def pull(self, network, have_version):
+        """Load the published weights if newer than have_version; returns the version held."""
+        import torch
+        if self.version.value == have_version:
+            return have_version
+        with self.lock:
+            vec = torch.from_numpy(self.flat.copy())
+            version = self.version.value
+        torch.nn.utils.vector_to_parameters(vec, network.parameters())
+        return version
+
+    def close(self, unlink=False):
+        self.flat = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _actor(actor_id, ring_spec, param_spec, free_q, full_q, stop, seed, epsilon_start,
+           epsilon_min, epsilon_decay, max_steps_per_episode=100):
+    import torch
+    torch.set_num_threads(1)
+    from env.blackjackEnv import BlackjackEnv
+    from agent.dqn_agent import DQN_Agent
+
+    ring = TransitionRing(*ring_spec[1:], name=ring_spec[0])
+    params = ParamBroadcast(param_spec[1], name=param_spec[0], version=param_spec[2], lock=param_spec[3])
+    env_seed, agent_seed = np.random.default_rng(seed).spawn(2)
+    env = BlackjackEnv(seed=env_seed)
+    agent = DQN_Agent(buffer_capacity=1, epsilon_start=epsilon_start, epsilon_min=epsilon_min,
+                      epsilon_decay=epsilon_decay, seed=agent_seed)
+    version = params.pull(agent.q_network, -1)
+
+    slot, n = free_q.get(), 0
+    episodes, reward_sum = 0, 0.0
+    while not stop.is_set():
+        state = env.reset()
+        env.set_bet(10)
+        for step in range(max_steps_per_episode):
+            action = agent.select_action(state, legal_actions=env.legal_actions())
+            next_state, reward, done, _ = env.step(action)
+            if step > 3:
+                reward -= 0.2
+            ring.states[slot, n] = state
+            ring.actions[slot, n] = action
+            ring.rewards[slot, n] = reward
+            ring.next_states[slot, n] = next_state
+            ring.dones[slot, n] = done
+            n += 1
+            if n == ring.slot_size:
+                full_q.put((actor_id, slot, n, episodes, reward_sum))
+                episodes, reward_sum = 0, 0.0
+                while True:   # wait for a free block, unless we're told to stop
+                    try:
+                        slot, n = free_q.get(timeout=0.5), 0
+                        break
+                    except queue.Empty:
+                        if stop.is_set():
+                            break
+                if stop.is_set():
+                    break
+            state = next_state
+            if done:
+                break
+        episodes += 1
+        reward_sum += reward
+        agent.decay_eps_episode()
+        version = params.pull(agent.q_network, version)
+
+    ring.close()
+    params.close()
+
+
+def train(n_actors=3, grad_steps=200_000, init_ckpt=None, out=None, seed=None,
+          buffer_capacity=150_000, batch_size=32, gamma=0.95, lr=1e-4,
+          epsilon_start=0.20, epsilon_min=0.05, epsilon_decay=0.9999, prioritized=False,
+          updates_per_block=UPDATES_PER_BLOCK):
+    """Runs actors + learner until grad_steps updates; returns the learner's DQN_Agent."""
+    import torch
+    from agent.dqn_agent import DQN_Agent
+
+    learner_seed, *actor_seeds = np.random.SeedSequence(seed).spawn(n_actors + 1)
+    agent = DQN_Agent(buffer_capacity=buffer_capacity, batch_size=batch_size, gamma=gamma, lr=lr,
+                      prioritized=prioritized, seed=learner_seed)
+    if init_ckpt:
+        agent.q_network.load_state_dict(torch.load(init_ckpt, map_location="cpu"))
+        agent.target_network.load_state_dict(agent.q_network.state_dict())
+    # leave a core per actor
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) - n_actors))
+
+    ctx = mp.get_context("spawn")
+    n_params = sum(p.numel() for p in agent.q_network.parameters())
+    params = ParamBroadcast(n_params, version=ctx.Value("i", 0), lock=ctx.Lock())
+    params.publish(agent.q_network)
+    rings = [TransitionRing() for _ in range(n_actors)]
+    free_qs = [ctx.Queue() for _ in range(n_actors)]
+    for q in free_qs:
+        for slot in range(SLOTS_PER_ACTOR):
+            q.put(slot)
+    full_q, stop = ctx.Queue(), ctx.Event()
+    actors = [ctx.Process(target=_actor, daemon=True,
+                          args=(i, rings[i].spec(), params.spec(), free_qs[i], full_q, stop,
+                                actor_seeds[i], epsilon_start, epsilon_min, epsilon_decay))
+              for i in range(n_actors)]
+    for p in actors:
+        p.start()
+
+    buffer = agent.replay_buffer
+    transitions = episodes = 0
+    reward_sum = 0.0
+    ingested_at = -updates_per_block
+    last = {"time": time.perf_counter(), "transitions": 0, "steps": 0, "episodes": 0, "reward": 0.0}
+    start = last["time"]
+    try:
+        while agent.train_step < grad_steps:
+            # take a block when due, never blocking once training runs
+            while len(buffer) < WARMUP or agent.train_step - ingested_at >= updates_per_block:
+                try:
+                    block = full_q.get(timeout=0.1 if len(buffer) < WARMUP else 0)
+                except queue.Empty:
+                    if not any(p.is_alive() for p in actors):
+                        raise RuntimeError("all actor processes exited, see their tracebacks above")
+                    break
+                actor_id, slot, n, eps, rsum = block
+                ring = rings[actor_id]
+                for j in range(n):
+                    buffer.add(ring.states[slot, j], ring.actions[slot, j], ring.rewards[slot, j],
+                               ring.next_states[slot, j], ring.dones[slot, j])
+                free_qs[actor_id].put(slot)
+                transitions += n
+                episodes += eps
+                reward_sum += rsum
+                ingested_at = agent.train_step
+
+            if len(buffer) >= WARMUP:
+                agent.train()
+                if agent.train_step % SYNC_EVERY == 0:
+                    params.publish(agent.q_network)
+
+            now = time.perf_counter()
+            if now - last["time"] >= PRINT_SECONDS:
+                dt = now - last["time"]
+                d_eps = episodes - last["episodes"]
+                avg = (reward_sum - last["reward"]) / d_eps if d_eps else float("nan")
+                print(f"[{now - start:6.0f}s] {(transitions - last['transitions']) / dt:8,.0f} transitions/s  "
+                      f"{(agent.train_step - last['steps']) / dt:6,.0f} grad steps/s  "
+                      f"buffer {len(buffer):,}  steps {agent.train_step:,}  avg reward {avg:+.3f}",
+                      flush=True)
+                last = {"time": now, "transitions": transitions, "steps": agent.train_step,
+                        "episodes": episodes, "reward": reward_sum}
+    finally:
+        stop.set()
+        for p in actors:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        for ring in rings:
+            ring.close(unlink=True)
+        params.close(unlink=True)
+
+    elapsed = time.perf_counter() - start
+    print(f"done: {transitions:,} transitions ({transitions / elapsed:,.0f}/s), "
+          f"{agent.train_step:,} grad steps ({agent.train_step / elapsed:,.0f}/s) in {elapsed:.0f}s")
+    if out:
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        torch.save(agent.q_network.state_dict(), out)
+        print(f"saved {out}")
+    return agent
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Actor/learner DQN training.")
+    parser.add_argument("--actors", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--grad-steps", type=int, default=200_000)
+    parser.add_argument("--init", default=None, help="checkpoint to start from")
+    parser.add_argument("--out", default="checkpoints/actor_learner/blackjack_dqn.pth")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--prioritized", action="store_true")
+    parser.add_argument("--updates-per-block", type=int, default=UPDATES_PER_BLOCK,
+                        help=f"learner grad steps per {SLOT_SIZE}-transition block")
+    args = parser.parse_args()
+
+    train(args.actors, args.grad_steps, args.init, args.out, args.seed, prioritized=args.prioritized,
+          updates_per_block=args.updates_per_block)
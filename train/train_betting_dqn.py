@@ -1,21 +1,37 @@
+import os
 import torch
 import numpy as np
 from agent.betting_agent import Betting_Agent
 from agent.dqn_agent import DQN_Agent
 from env.blackjackEnv import BlackjackEnv
-from config import BET_SIZES, UNIT, INITIAL_BANKROLL
-from env.highTCWrapper import HighTCWrapper as TC
+from utils.running_stats import RunningStats, WindowedMean, BinnedStats
+from utils import profiler
+from utils.shaping import COUNT_RANGES, SHAPED_REWARD, count_band, shaped_reward
+from config import (BET_SIZES, UNIT, INITIAL_BANKROLL, NUM_EPISODES, TARGET_UPDATE_FREQ,
+                    BETTING_MODEL_PATH, BET_PLAYER_CKPT, BET_ALL_SIZES)
 
-NUM_EPISODES = 300_000   # Total rounds to simulate
-TARGET_UPDATE_FREQ = 1000  # How often to sync target network
 PRINT_FREQ = 10_000          # Print stats every X episodes
-
-def train_betting_agent():
-    env = BlackjackEnv()
-
-    player_agent = DQN_Agent()
-    player_agent.q_network.load_state_dict(torch.load("checkpoints/blackjack_dqn.pth"))
-    player_agent.q_network.eval()
+SEED = None                  # int for a reproducible run
+
+def train_betting_agent(num_episodes=NUM_EPISODES, play_ckpt=BET_PLAYER_CKPT, out=BETTING_MODEL_PATH,
+                        seed=SEED, all_bets=BET_ALL_SIZES):
+    """
+    Train the betting DQN on hands played by a fixed playing checkpoint; returns
+    a summary dict. all_bets stores the transition of every bet size per hand
+    (the reward of each is known from the one hand), not just the bet placed.
+
+    The schedule is counted in hands either way: the buffer holds the last
+    30,000 hands (30,000 * len(BET_SIZES) transitions with all_bets), and every
+    hand runs one update once a batch is stored, two once the buffer holds
+    1,500 hands, three from 10,000 and four from 20,000.
+    """
+    env_seed, player_seed, bet_seed = np.random.SeedSequence(seed).spawn(3)
+    env = BlackjackEnv(seed=env_seed)
+    per_hand = len(BET_SIZES) if all_bets else 1   # transitions stored per hand
+
+    player_agent = DQN_Agent(epsilon_start=0.0, seed=player_seed)
+    player_agent.q_network.load_state_dict(torch.load(play_ckpt, map_location="cpu"))
+    player_agent.freeze()
 
     # Initialize betting agent with VERY conservative settings
     bet_agent = Betting_Agent(
@@ -24,15 +40,20 @@ def train_betting_agent():
         lr=0.0005,           # Slower learning rate
         epsilon_start=1.0,   # Start with less exploration
         epsilon_min=0.01,     # Very low final exploration
-        buffer_capacity= 30_000 
+        buffer_capacity= 30_000 * per_hand,
+        seed=bet_seed
     )
-    total_rewards = []
-    raw_rewards = []
+    # streaming accumulators: memory stays flat however many episodes run
+    total_rewards = RunningStats()
+    recent_rewards = WindowedMean(PRINT_FREQ)
+    reward_signs = [0, 0, 0]   # negative, zero, positive training rewards
+    raw_rewards = RunningStats()
+    raw_by_count = BinnedStats()
 
     # Track betting by count
     count_bet_stats = {}
 
-    for episode in range(NUM_EPISODES):
+    for episode in range(num_episodes):
         deck_state = env.get_deck_distribution(betting=True)
         bet_action_index = bet_agent.select_bet(deck_state)
         
@@ -45,62 +66,24 @@ def train_betting_agent():
         # Play the hand
         done = False
         while not done:
-            action = player_agent.select_action(state)
+            action = player_agent.select_action(state, legal_actions=env.legal_actions())
             next_state, reward, done, msg = env.step(action)
             state = next_state
         
         # Get game results
         info = env.payout_tracker.get_info()
         raw_reward = info["net_result"]
-        raw_rewards.append(raw_reward)
+        raw_rewards.add(raw_reward)
         
         # Get true count for training reward
         true_count = deck_state[11]
 
-        # EXTREMELY CAUTIOUS reward structure for positive EV
-        training_reward = 0
-
-        if true_count >= 4:  # Only bet big on VERY high counts
-            if bet_action_index == 4:  # Only 16 units on extremely high counts
-                training_reward = +2.0  # Excellent decision
-            elif bet_action_index == 3:  # 8 units acceptable
-                training_reward = +1.0  # Good decision
-            elif bet_action_index <= 2:  # Still betting small on great count
-                training_reward = -1.0  # Major missed opportunity
-            else:
-                training_reward = +0.5  # Medium bet okay
-                
-        elif true_count >= 3:  # High count - medium to big bets
-            if bet_action_index >= 3:  # 8 or 16 units
-                training_reward = +1.5  # Good decision
-            elif bet_action_index == 2:  # 4 units acceptable
-                training_reward = +0.5  # Okay decision
-            else:
-                training_reward = -0.5  # Too small for this count
-                
-        elif true_count >= 1:  # Slightly favorable - small to medium bets
-            if bet_action_index <= 2:  # 1, 2, or 4 units
-                training_reward = +1.0  # Safe decision
-            else:
-                training_reward = -1.5  # Too aggressive
-                
-        elif true_count >= -1:  # Neutral - only small bets
-            if bet_action_index <= 1:  # 1 or 2 units only
-                training_reward = +1.0  # Safe decision
-            elif bet_action_index == 2:  # 4 units borderline
-                training_reward = +0.0  # Neutral
-            else:
-                training_reward = -2.0  # Way too aggressive
-                
-        else:  # true_count < -1 (Unfavorable) - minimum bets only
-            if bet_action_index == 0:  # 1 unit only
-                training_reward = +2.0  # Excellent caution
-            elif bet_action_index == 1:  # 2 units acceptable
-                training_reward = +0.5  # Okay
-            else:
-                training_reward = -3.0  # Terrible decision
-
-        total_rewards.append(training_reward)
+        # EXTREMELY CAUTIOUS reward structure for positive EV, see SHAPED_REWARD
+        training_reward = float(shaped_reward(true_count, bet_action_index))
+
+        total_rewards.add(training_reward)
+        recent_rewards.add(training_reward)
+        reward_signs[int(np.sign(training_reward)) + 1] += 1
 
         # Debug output every 10,000 episodes
         if episode % PRINT_FREQ == 0 and episode > 0:
@@ -113,15 +96,20 @@ def train_betting_agent():
         next_deck_state = env.get_deck_distribution(betting=True)
 
         # Store experience using training reward
-        bet_agent.store_experience(deck_state, bet_action_index, training_reward, next_deck_state, done)
+        if all_bets:
+            for a, r in enumerate(SHAPED_REWARD[count_band(true_count)]):
+                bet_agent.store_experience(deck_state, a, float(r), next_deck_state, done)
+        else:
+            bet_agent.store_experience(deck_state, bet_action_index, training_reward, next_deck_state, done)
 
-        if len(bet_agent.replay_buffer) >= 10_000 and len(bet_agent.replay_buffer) < 20_000:
+        hands_stored = len(bet_agent.replay_buffer) // per_hand
+        if hands_stored >= 10_000 and hands_stored < 20_000:
             for _ in range(2):
                 bet_agent.train()
-        elif len(bet_agent.replay_buffer) >= 20_000:
+        elif hands_stored >= 20_000:
             for _ in range(3):
                 bet_agent.train()
-        elif len(bet_agent.replay_buffer) > 1500:
+        elif hands_stored > 1500:
             bet_agent.train()  # Only 1 step until buffer fills
         bet_agent.train()
 
@@ -131,60 +119,58 @@ def train_betting_agent():
 
         # Print Progress
         if episode % PRINT_FREQ == 0 and episode > 0:
-            avg_reward = np.mean(total_rewards[-PRINT_FREQ:])
-            print(f"Episode {episode}/{NUM_EPISODES}, Avg Training Reward: {avg_reward:.3f}, Epsilon: {bet_agent.epsilon:.3f}")
+            avg_reward = recent_rewards.mean
+            print(f"Episode {episode}/{num_episodes}, Avg Training Reward: {avg_reward:.3f}, Epsilon: {bet_agent.epsilon:.3f}")
+            if profiler.enabled:
+                print(profiler.format_table(profiler.checkpoint(label=f"episode {episode}")))
 
         # Track betting behavior by MORE GRANULAR count ranges
-        if true_count >= 4:
-            count_range = "Very High (+4 or more)"
-        elif true_count >= 3:
-            count_range = "High (+3 to +4)"
-        elif true_count >= 1:
-            count_range = "Slightly Favorable (+1 to +3)"
-        elif true_count >= -1:
-            count_range = "Neutral (-1 to +1)"
-        else:
-            count_range = "Unfavorable (below -1)"
+        count_range = COUNT_RANGES[count_band(true_count)]
 
         if count_range not in count_bet_stats:
             count_bet_stats[count_range] = {1: 0, 2: 0, 4: 0, 8: 0, 16: 0}
 
         count_bet_stats[count_range][BET_SIZES[bet_action_index]] += 1
+        raw_by_count.add(count_range, raw_reward)
 
     # Save the trained betting agent
-    torch.save(bet_agent.q_network.state_dict(), "checkpoints/betting/bet_dqn.pth")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    torch.save(bet_agent.q_network.state_dict(), out)
     print("Training complete.")
 
     # Training Analysis
     print("\n=== Training Analysis ===")
-    if len(total_rewards) > 0:
+    if total_rewards.n > 0:
         print(f"Training Rewards:")
-        print(f"  Mean: {np.mean(total_rewards):.4f}")
-        print(f"  Std Dev: {np.std(total_rewards):.4f}")
-        print(f"  Min: {np.min(total_rewards):.4f}")
-        print(f"  Max: {np.max(total_rewards):.4f}")
+        print(f"  Mean: {total_rewards.mean:.4f}")
+        print(f"  Std Dev: {total_rewards.std(ddof=0):.4f}")
+        print(f"  Min: {total_rewards.min:.4f}")
+        print(f"  Max: {total_rewards.max:.4f}")
         
-        positive = sum(1 for r in total_rewards if r > 0)
-        negative = sum(1 for r in total_rewards if r < 0)
-        zero = sum(1 for r in total_rewards if r == 0)
+        negative, zero, positive = reward_signs
         
-        print(f"  Positive rewards: {positive} ({positive/len(total_rewards)*100:.1f}%)")
-        print(f"  Negative rewards: {negative} ({negative/len(total_rewards)*100:.1f}%)")
-        print(f"  Zero rewards: {zero} ({zero/len(total_rewards)*100:.1f}%)")
+        print(f"  Positive rewards: {positive} ({positive/total_rewards.n*100:.1f}%)")
+        print(f"  Negative rewards: {negative} ({negative/total_rewards.n*100:.1f}%)")
+        print(f"  Zero rewards: {zero} ({zero/total_rewards.n*100:.1f}%)")
 
-    if len(raw_rewards) > 0:
+    if raw_rewards.n > 0:
         print(f"\nGame Results (Raw Rewards):")
-        print(f"  Mean: ${np.mean(raw_rewards):.2f}")
-        print(f"  Std Dev: ${np.std(raw_rewards):.2f}")
+        print(f"  Mean: ${raw_rewards.mean:.2f}")
+        print(f"  Std Dev: ${raw_rewards.std(ddof=0):.2f}")
     
     # Betting Behavior Analysis
     print("\n=== Betting Behavior by Count ===")
     for count_range, bets in count_bet_stats.items():
         total = sum(bets.values())
-        print(f"{count_range}:")
+        raw = raw_by_count[count_range]
+        print(f"{count_range}: raw ${raw.mean:+.2f} ± {raw.ci95():.2f} per hand")
         for bet_size, count in bets.items():
             pct = (count/total)*100 if total > 0 else 0
             print(f"  {bet_size} units: {count} times ({pct:.1f}%)")
 
+    return {"out": out, "episodes": num_episodes,
+            "training_reward": total_rewards.to_dict(), "raw_reward": raw_rewards.to_dict(),
+            "raw_reward_by_count": raw_by_count.to_dict(), "bets_by_count": count_bet_stats}
+
 if __name__ == "__main__":
     train_betting_agent()
\ No newline at end of file
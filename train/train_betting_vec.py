@@ -0,0 +1,158 @@
+"""
+Betting-agent training decoupled from hand playback.
+
+1. generate_rounds(): the frozen playing policy plays n_rounds on
+   VecBlackjackEnv (eval/runner.record_rounds), one select_actions() call per
+   step for every table, at a one-unit stake. Each round records its pre-deal
+   deck features (the betting state), true count and outcome in units.
+2. bet_dataset(): a bet only scales the outcome (PayoutTracker multiplies
+   base_bet), so one unit-stake round prices all five BET_SIZES. The reward
+   of each is shaped_reward() (utils/shaping.py, as in train_betting_dqn.py)
+   or the realized outcome times the bet in units. targets="all" fits the
+   whole 5-vector per round; "sampled" keeps one uniformly drawn bet, a
+   fifth of the signal.
+3. fit(): epochs of shuffled large minibatches through
+   Betting_Agent.train_on_batch(). A bet ends its episode (the per-hand loop
+   stores done=True), so the target is the reward itself; no replay buffer
+   and no target-network syncs.
+
+Run from the repo root:
+  python -m train.train_betting_vec --rounds 300000 --seed 1
+"""
+import os
+import time
+import numpy as np
+from agent.betting_agent import Betting_Agent
+from agent.table_policy import load_policy
+from eval.runner import record_rounds
+from utils.shaping import COUNT_RANGES, SHAPED_REWARD, count_band, shaped_reward
+from utils.running_stats import RunningStats, BinnedStats
+from config import BET_SIZES, UNIT, NUM_EPISODES, BETTING_MODEL_PATH, BET_PLAYER_CKPT, BET_ALL_SIZES
+
+REWARDS = ("shaped", "outcome")
+TARGETS = ("all", "sampled")
+TARGET = "all" if BET_ALL_SIZES else "sampled"
+N_ENVS = 1024
+EPOCHS = 20
+BATCH_SIZE = 4096
+LR = 0.0005
+
+
+def generate_rounds(play_ckpt=BET_PLAYER_CKPT, n_rounds=NUM_EPISODES, seed=None, n_envs=N_ENVS):
+    """eval/runner.record_rounds() with the playing checkpoint, see there."""
+    return record_rounds(load_policy(play_ckpt), n_rounds, seed, n_envs)
+
+
+def bet_rewards(rounds, reward="shaped"):
+    """(n, 5) reward of every bet size for each round, from its one unit-stake outcome."""
+    if reward not in REWARDS:
+        raise ValueError(f"reward must be one of {REWARDS}")
+    if reward == "shaped":
+        return SHAPED_REWARD[count_band(rounds["tc"])].astype(np.float32)
+    return rounds["outcome"][:, None] * np.asarray(BET_SIZES, dtype=np.float32)
+
+
+def bet_dataset(rounds, rng, reward="shaped", targets=TARGET):
+    """
+    (states, bet indices, rewards). targets="all": indices None and the (n, 5)
+    reward vector of every bet; "sampled": one uniformly drawn bet per round.
+    """
+    if targets not in TARGETS:
+        raise ValueError(f"targets must be one of {TARGETS}")
+    rewards = bet_rewards(rounds, reward)
+    if targets == "all":
+        return rounds["deck"], None, rewards
+    actions = rng.integers(0, len(BET_SIZES), size=len(rewards))
+    return rounds["deck"], actions, rewards[np.arange(len(rewards)), actions]
+
+
+def fit(agent, states, actions, rewards, epochs=EPOCHS, batch_size=BATCH_SIZE, rng=None):
+    """Shuffled minibatch epochs over the dataset (actions=None: full-vector targets); mean loss per epoch."""
+    rng = np.random.default_rng(rng)
+    losses = []
+    for epoch in range(epochs):
+        order = rng.permutation(len(states))
+        total = RunningStats()
+        for start in range(0, len(order), batch_size):
+            b = order[start:start + batch_size]
+            total.add(agent.train_on_batch(states[b], None if actions is None else actions[b], rewards[b]))
+        losses.append(total.mean)
+        print(f"  epoch {epoch + 1}/{epochs}: loss {total.mean:.4f}")
+    return losses
+
+
+def train_betting_agent_vec(num_rounds=NUM_EPISODES, play_ckpt=BET_PLAYER_CKPT, out=BETTING_MODEL_PATH,
+                            seed=None, n_envs=N_ENVS, epochs=EPOCHS, batch_size=BATCH_SIZE, lr=LR,
+                            reward="shaped", targets=TARGET):
+    """Generate num_rounds rounds, fit the betting DQN on them and save it; returns a summary dict."""
+    import torch
+    env_seed, bet_seed, data_seed = np.random.SeedSequence(seed).spawn(3)
+
+    start = time.perf_counter()
+    rounds = generate_rounds(play_ckpt, num_rounds, env_seed, n_envs)
+    generate_s = time.perf_counter() - start
+    print(f"{num_rounds:,} rounds in {generate_s:.1f}s ({num_rounds / generate_s:,.0f} rounds/s)")
+
+    rng = np.random.default_rng(data_seed)
+    states, actions, rewards = bet_dataset(rounds, rng, reward, targets)
+    bet_agent = Betting_Agent(lr=lr, epsilon_start=0.0, epsilon_min=0.0, seed=bet_seed)
+    start = time.perf_counter()
+    losses = fit(bet_agent, states, actions, rewards, epochs, batch_size, rng)
+    fit_s = time.perf_counter() - start
+    print(f"{epochs} epochs, {bet_agent.train_step:,} updates of {batch_size} in {fit_s:.1f}s")
+
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    torch.save(bet_agent.q_network.state_dict(), out)
+    print(f"Training complete, saved to {out}")
+
+    # greedy bets of the trained network on the rounds it learned from
+    greedy = bet_agent.freeze().select_bets(states)
+    bands = count_band(rounds["tc"])
+    raw_by_count = BinnedStats()
+    bets_by_count = {}
+    print("\n=== Greedy Betting Behavior by Count ===")
+    for band, count_range in enumerate(COUNT_RANGES):
+        in_band = bands == band
+        if not in_band.any():
+            continue
+        raw_by_count.bins[count_range] = RunningStats()
+        raw_by_count[count_range].add_many(rounds["outcome"][in_band] * UNIT)
+        picks = np.bincount(greedy[in_band], minlength=len(BET_SIZES))
+        bets_by_count[count_range] = {size: int(k) for size, k in zip(BET_SIZES, picks)}
+        raw = raw_by_count[count_range]
+        print(f"{count_range}: raw ${raw.mean:+.2f} ± {raw.ci95():.2f} per ${UNIT} hand")
+        for size, k in bets_by_count[count_range].items():
+            print(f"  {size} units: {k} times ({k / in_band.sum() * 100:.1f}%)")
+
+    raw_rewards = RunningStats()
+    raw_rewards.add_many(rounds["outcome"] * UNIT)
+    greedy_reward = RunningStats()
+    greedy_reward.add_many(shaped_reward(rounds["tc"], greedy))
+    # shaped reward given up against the best bet of each round's count band
+    shaped_regret = float(SHAPED_REWARD[bands].max(axis=1).mean()) - greedy_reward.mean
+    print(f"\nGreedy shaped reward {greedy_reward.mean:.3f}, regret {shaped_regret:.3f} per round")
+    return {"out": out, "episodes": num_rounds, "generate_s": generate_s, "fit_s": fit_s,
+            "updates": bet_agent.train_step, "loss": losses, "reward": reward, "targets": targets,
+            "greedy_shaped_reward": greedy_reward.to_dict(), "greedy_shaped_regret": shaped_regret,
+            "raw_reward": raw_rewards.to_dict(), "raw_reward_by_count": raw_by_count.to_dict(),
+            "bets_by_count": bets_by_count}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Betting DQN from a bulk, vectorized round dataset.")
+    parser.add_argument("--rounds", type=int, default=NUM_EPISODES)
+    parser.add_argument("--play-ckpt", default=BET_PLAYER_CKPT)
+    parser.add_argument("--out", default=BETTING_MODEL_PATH)
+    parser.add_argument("--envs", type=int, default=N_ENVS)
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--lr", type=float, default=LR)
+    parser.add_argument("--reward", choices=REWARDS, default="shaped")
+    parser.add_argument("--targets", choices=TARGETS, default=TARGET,
+                        help="every bet size's reward per round, or one sampled bet")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    train_betting_agent_vec(args.rounds, args.play_ckpt, args.out, args.seed, args.envs, args.epochs,
+                            args.batch_size, args.lr, args.reward, args.targets)
@@ -5,84 +5,131 @@ import torch
 import os
 from utils.shaping import shaping_bonus
 from eval.ev_by_true_count import run_once as ev_by_TC
+from utils.running_stats import RunningStats, WindowedMean
+from utils import profiler
+from config import (PLAY_EPISODES, PLAY_EPSILON_START, PLAY_EPSILON_MIN, PLAY_EPSILON_DECAY,
+                    PLAY_GAMMA, PLAY_LR, PLAY_BUFFER_CAPACITY, PLAY_BATCH_SIZE, PRIORITIZED_REPLAY,
+                    REPLAY_RATIO, UPDATE_CHUNK, N_STEP, PLAY_INIT_CKPT, PLAY_CKPT_DIR)
 
-os.makedirs("checkpoints/count_weighted", exist_ok=True)
-
-num_episodes = 100_000    #this is where results are plateuing
-epsilon_start = 0.20
-epsilon_min = 0.05
-epsilon_decay = 0.9999      #
-gamma = 0.95
-learning_rate = 1e-4
-buffer_capacity = 150_000
-batch_size = 32
+num_episodes = PLAY_EPISODES    #this is where results are plateuing
+epsilon_start = PLAY_EPSILON_START
+epsilon_min = PLAY_EPSILON_MIN
+epsilon_decay = PLAY_EPSILON_DECAY      #
+gamma = PLAY_GAMMA
+learning_rate = PLAY_LR
+buffer_capacity = PLAY_BUFFER_CAPACITY
+batch_size = PLAY_BATCH_SIZE
+prioritized_replay = PRIORITIZED_REPLAY  # sum-tree PER on |TD error| instead of the TC-weighted sampler
+replay_ratio = REPLAY_RATIO  # gradient updates per env step (0.25 = one update every 4 steps)
+update_chunk = UPDATE_CHUNK  # updates run back to back per agent.train() call (sampled in one draw)
+n_step = N_STEP              # n-step returns stored by the replay buffer
 max_steps_per_episode = 100
 PRINT_FREQ = 10_000          # Print stats every X episodes
-
-env = BlackjackEnv()
 CKPT_FREQ = 50_000
+seed = None                  # int for a reproducible run (shoes, exploration, replay sampling)
 
-agent = DQN_Agent(epsilon_start=epsilon_start,
-    epsilon_min=epsilon_min,
-    epsilon_decay=epsilon_decay,
-    gamma=gamma,
-    lr=learning_rate,
-    buffer_capacity=buffer_capacity,
-    batch_size=batch_size)
-
-total_reward = []
-ckpt = "checkpoints/count_aware/blackjack_dqn_ep400000.pth"
-agent.q_network.load_state_dict(torch.load(ckpt, map_location="cpu"))
-
-for episode in range(num_episodes):
-    state = env.reset()
-    env.set_bet(10)
-
-    for step in range(max_steps_per_episode):
-        legal = env.legal_actions()
-        if step == 0 and env.dealer_hand == set(env.BLACKJACK):
-            next_state, reward, done, msg =  env.compare_hands()
-            agent.store_experience(state, action, reward, next_state, done)
-            agent.train()  
-            break
-        else:
-            action = agent.select_action(state, legal_actions=legal)
-            next_state, reward, done, msg = env.step(action)
-            if step > 3:
-                reward -= 0.2
-
-            agent.store_experience(state, action, reward, next_state, done)
-        
-            #if len(agent.replay_buffer) >= 10_000 and len(agent.replay_buffer) < 20_000:
-                #for _ in range(2):
-                    #agent.train()
-            #elif len(agent.replay_buffer) >= 20_000:
-                #for _ in range(3):
-                    #agent.train()
-            if len(agent.replay_buffer) > 1500:
-                agent.train()  # Only 1 step until buffer fills
-
-            state = next_state
-
-            if done:
+
+def train(num_episodes=num_episodes, init_ckpt=PLAY_INIT_CKPT, out_dir=PLAY_CKPT_DIR, seed=seed,
+          replay_ratio=replay_ratio, update_chunk=update_chunk, n_step=n_step, batch_size=batch_size,
+          prioritized=prioritized_replay, lr=learning_rate, gamma=gamma, epsilon_start=epsilon_start,
+          epsilon_min=epsilon_min, epsilon_decay=epsilon_decay, buffer_capacity=buffer_capacity,
+          ckpt_freq=CKPT_FREQ, eval_hands=200_000):
+    """
+    Train the playing DQN with single-process greedy-epsilon play. Saves a
+    checkpoint (and prints EV by TC on eval_hands) every ckpt_freq episodes.
+    Returns {"checkpoints", "avg_reward" (per PRINT_FREQ episodes), "reward"
+    (RunningStats summary of the final rewards), "train_steps"}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    env_seed, agent_seed = np.random.SeedSequence(seed).spawn(2)
+    env = BlackjackEnv(seed=env_seed)
+
+    agent = DQN_Agent(epsilon_start=epsilon_start,
+        epsilon_min=epsilon_min,
+        epsilon_decay=epsilon_decay,
+        gamma=gamma,
+        lr=lr,
+        buffer_capacity=buffer_capacity,
+        batch_size=batch_size,
+        prioritized=prioritized,
+        seed=agent_seed,
+        n_step=n_step)
+
+    total_reward = RunningStats()            # final reward per episode, whole run
+    recent_reward = WindowedMean(PRINT_FREQ)
+    avg_rewards, checkpoints = [], []
+    update_credit = 0.0          # replay_ratio accumulates here, spent update_chunk at a time
+    if init_ckpt:
+        agent.q_network.load_state_dict(torch.load(init_ckpt, map_location="cpu"))
+
+    for episode in range(num_episodes):
+        state = env.reset()
+        env.set_bet(10)
+
+        for step in range(max_steps_per_episode):
+            legal = env.legal_actions()
+            if step == 0 and env.dealer_hand == set(env.BLACKJACK):
+                next_state, reward, done, msg =  env.compare_hands()
+                agent.store_experience(state, action, reward, next_state, done)
+                update_credit += replay_ratio
+                if update_credit >= update_chunk:
+                    agent.train(n_updates=int(update_credit))
+                    update_credit -= int(update_credit)
                 break
-    
-    total_reward.append(reward)
-
-    agent.decay_eps_episode()
-    
-    if (episode+1) % PRINT_FREQ == 0 and episode > 0:
-        avg_recent_reward = np.mean(total_reward[-PRINT_FREQ:])
-        print(f"Episode {episode+1}:, Average Reward = {avg_recent_reward:.3f}, Epsilon = {agent.epsilon:.3f}")
-    
-    if (episode+1) % CKPT_FREQ == 0 and episode > 0:
-        path = f"checkpoints/count_weighted/blackjack_dqn_ep{episode+1:06d}.pth"
-        torch.save(agent.q_network.state_dict(), path)
-        print(f"\n=== EVAL after {episode+1} episodes ===")
-        ev_by_TC(n_hands=200_000, ckpt=path)  # fixed $10, pre-deal TC, ε=0
-        agent.replay_buffer.composition()
-
-
-#torch.save(agent.q_network.state_dict(), "checkpoints/1_million/blackjack_dqn_pt3.pth")
-#print("✅ Model saved to checkpoints/1/million/blackjack_dqn_pt3.pth")
-agent.replay_buffer.composition()
\ No newline at end of file
+            else:
+                action = agent.select_action(state, legal_actions=legal)
+                next_state, reward, done, msg = env.step(action)
+                if step > 3:
+                    reward -= 0.2
+
+                agent.store_experience(state, action, reward, next_state, done)
+
+                #if len(agent.replay_buffer) >= 10_000 and len(agent.replay_buffer) < 20_000:
+                    #for _ in range(2):
+                        #agent.train()
+                #elif len(agent.replay_buffer) >= 20_000:
+                    #for _ in range(3):
+                        #agent.train()
+                if len(agent.replay_buffer) > 1500:
+                    update_credit += replay_ratio
+                    if update_credit >= update_chunk:
+                        agent.train(n_updates=int(update_credit))
+                        update_credit -= int(update_credit)
+
+                state = next_state
+
+                if done:
+                    break
+        else:
+            agent.replay_buffer.flush()   # episode cut at max_steps: bootstrap its pending n-step returns
+
+        total_reward.add(reward)
+        recent_reward.add(reward)
+
+        agent.decay_eps_episode()
+
+        if (episode+1) % PRINT_FREQ == 0 and episode > 0:
+            avg_recent_reward = recent_reward.mean
+            avg_rewards.append(float(avg_recent_reward))
+            print(f"Episode {episode+1}:, Average Reward = {avg_recent_reward:.3f}, Epsilon = {agent.epsilon:.3f}")
+            if profiler.enabled:
+                print(profiler.format_table(profiler.checkpoint(label=f"episode {episode+1}")))
+
+        if (episode+1) % ckpt_freq == 0 and episode > 0:
+            path = os.path.join(out_dir, f"blackjack_dqn_ep{episode+1:06d}.pth")
+            torch.save(agent.q_network.state_dict(), path)
+            checkpoints.append(path)
+            if eval_hands:
+                print(f"\n=== EVAL after {episode+1} episodes ===")
+                ev_by_TC(n_hands=eval_hands, ckpt=path)  # fixed $10, pre-deal TC, ε=0
+            agent.replay_buffer.composition()
+
+    #torch.save(agent.q_network.state_dict(), "checkpoints/1_million/blackjack_dqn_pt3.pth")
+    #print("✅ Model saved to checkpoints/1/million/blackjack_dqn_pt3.pth")
+    agent.replay_buffer.composition()
+    return {"checkpoints": checkpoints, "avg_reward": avg_rewards, "reward": total_reward.to_dict(),
+            "train_steps": agent.train_step}
+
+
+if __name__ == "__main__":
+    train()
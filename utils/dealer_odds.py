@@ -0,0 +1,131 @@
+"""
+Exact distribution of the dealer's final hand for a given upcard and shoe
+composition, drawing without replacement under the env's rule (dealer stands
+on all 17s, no peek). Compositions are 10 counts for card values 2..11 (Ace = 11),
+the same order as BlackjackEnv.rank_counts / get_deck_distribution().
+
+The hole card is just another unseen card, so pass the cards the player has
+not seen: the remaining shoe plus the dealer's hole card (see unseen_counts).
+"""
+from functools import lru_cache
+
+DEALER_OUTCOMES = (17, 18, 19, 20, 21, "blackjack", "bust")
+BLACKJACK, BUST = 5, 6
+CACHE_SIZE = 50_000
+
+
+def _outcome(hard, soft_ace, n_cards):
+    """Index into DEALER_OUTCOMES if the dealer stands here, else None."""
+    value = hard + 10 if soft_ace and hard + 10 <= 21 else hard
+    if value > 21:
+        return BUST
+    if value >= 17:
+        if value == 21 and n_cards == 2:
+            return BLACKJACK
+        return value - 17
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _draw(hard, soft_ace, two_cards, counts):
+    """Outcome distribution for a dealer still to act, holding `hard` (Aces as 1)."""
+    total = sum(counts)
+    probs = [0.0] * 7
+    if total == 0:
+        return tuple(probs)
+    for i, c in enumerate(counts):
+        if not c:
+            continue
+        value = i + 2
+        p = c / total
+        new_hard = hard + (1 if value == 11 else value)
+        new_soft = soft_ace or value == 11
+        n_cards = 2 if two_cards else 3
+        end = _outcome(new_hard, new_soft, n_cards)
+        if end is not None:
+            probs[end] += p
+            continue
+        rest = counts[:i] + (c - 1,) + counts[i + 1:]
+        for k, q in enumerate(_draw(new_hard, new_soft, False, rest)):
+            probs[k] += p * q
+    return tuple(probs)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _dealer_outcome_probs(upcard, counts):
+    return _draw(1 if upcard == 11 else upcard, upcard == 11, True, counts)
+
+
+def dealer_outcome_probs(upcard, counts):
+    """
+    P(final dealer hand) as a 7-tuple ordered like DEALER_OUTCOMES:
+    17, 18, 19, 20, 21 (3+ cards), blackjack (2-card 21), bust.
+    upcard: 2..11 or "A"; counts: 10 unseen-card counts for values 2..11.
+    Memoized on (upcard, counts), see cache_info().
+    """
+    upcard = 11 if upcard == "A" else int(upcard)
+    return _dealer_outcome_probs(upcard, tuple(int(c) for c in counts))
+
+
+def cache_info():
+    return {"outer": _dealer_outcome_probs.cache_info(), "inner": _draw.cache_info()}
+
+
+def counts_from_distribution(distribution):
+    """
+    Card counts from get_deck_distribution(betting=True): the 10 shares times
+    the cards remaining (last entry).
+    """
+    total = distribution[-1]
+    return [int(round(p * total)) for p in distribution[:10]]
+
+
+def unseen_counts(env):
+    """Cards the player has not seen in `env`: the remaining shoe plus the hole card."""
+    counts = list(env.rank_counts)
+    hole = env.dealer_hand[1]
+    counts[(11 if hole == "A" else hole) - 2] += 1
+    return counts
+
+
+def dealer_probs_for_env(env):
+    """dealer_outcome_probs for the current BlackjackEnv round, from the player's view."""
+    return dealer_outcome_probs(env.dealer_hand[0], unseen_counts(env))
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from env.blackjackEnv import BlackjackEnv
+
+    # exact vs Monte Carlo through BlackjackEnv.dealer_hits() on one composition
+    env = BlackjackEnv()
+    for _ in range(3):
+        env.reset()
+    env.set_bet(10)
+    upcard = env.dealer_hand[0]
+    counts = unseen_counts(env)
+
+    start = time.perf_counter()
+    exact = dealer_probs_for_env(env)
+    elapsed = time.perf_counter() - start
+
+    n = 50_000
+    sim = [0] * 7
+    pool = [("A" if i == 9 else i + 2) for i, c in enumerate(counts) for _ in range(c)]
+    for _ in range(n):
+        random.shuffle(pool)
+        env.dealer_hand = env.dealer_hand.__class__([upcard, pool[0]])
+        env.deck = pool[1:]
+        env.dealer_hits()
+        value = env.calculate_hand_value(env.dealer_hand)
+        if value > 21:
+            sim[BUST] += 1
+        elif value == 21 and len(env.dealer_hand) == 2:
+            sim[BLACKJACK] += 1
+        else:
+            sim[value - 17] += 1
+
+    print(f"upcard {upcard}, {sum(counts)} unseen cards, exact in {elapsed * 1000:.1f} ms")
+    for name, p, s in zip(DEALER_OUTCOMES, exact, sim):
+        print(f"  {str(name):>9}: exact {p:.4f}  sampled {s / n:.4f}")
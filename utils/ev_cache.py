@@ -0,0 +1,164 @@
+"""
+Persistent cache for solver / dealer-odds results, so sweeps over many
+checkpoints (and reruns) don't recompute the same compositions.
+
+Entries live in one SQLite file under checkpoints/cache/, keyed by
+(rule-set version, kind, hash of the key tuple). The rule-set version is a
+hash of everything that changes an EV: ALLOWED_SPLITS, num_deck, penetration,
+the payouts and the solver version, so changing any of them simply starts a
+fresh namespace in the same file. A bounded in-memory LRU sits in front and
+writes are batched; hit/miss counts are kept per instance.
+
+  python -m utils.ev_cache            # entries per rule set
+  python -m utils.ev_cache --clear    # drop everything
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+
+DEFAULT_PATH = os.path.join("checkpoints", "cache", "ev_cache.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rulesets (rules TEXT PRIMARY KEY, spec TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS entries (
+    rules TEXT NOT NULL, kind TEXT NOT NULL, key BLOB NOT NULL, value TEXT NOT NULL,
+    PRIMARY KEY (rules, kind, key)
+) WITHOUT ROWID;
+"""
+
+
+def rules_spec(env=None):
+    """Everything that changes a cached EV, from `env` (or BlackjackEnv defaults)."""
+    from env.blackjackEnv import BlackjackEnv
+    from utils.strategy_solver import SOLVER_VERSION
+    num_deck = env.num_deck if env is not None else 6
+    penetration = env.penetration if env is not None else 0.25
+    return {
+        "allowed_splits": BlackjackEnv.ALLOWED_SPLITS,
+        "num_deck": num_deck,
+        "penetration": penetration,
+        "natural_pays": 1.5,
+        "split_21_pays": 1.0,
+        "dealer_hits_soft_17": False,
+        "dealer_peeks": False,
+        "solver_version": SOLVER_VERSION,
+    }
+
+
+def rules_version(spec):
+    return hashlib.blake2b(json.dumps(spec, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+def key_hash(key):
+    """Stable 16-byte hash of a key tuple of ints/bools (hand, upcard, composition)."""
+    return hashlib.blake2b(repr(tuple(int(k) for k in key)).encode(), digest_size=16).digest()
+
+
+class EVCache:
+    def __init__(self, path=DEFAULT_PATH, spec=None, lru_size=200_000, flush_every=2_000):
+        self.path = path
+        self.spec = spec or rules_spec()
+        self.rules = rules_version(self.spec)
+        self.lru_size = lru_size
+        self.flush_every = flush_every
+        self.mem = OrderedDict()
+        self.pending = []
+        self.mem_hits = self.disk_hits = self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # several eval workers may share the file: WAL + a generous busy timeout
+        self.db = sqlite3.connect(path, timeout=60)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.db.execute("INSERT OR IGNORE INTO rulesets VALUES (?, ?)",
+                        (self.rules, json.dumps(self.spec, sort_keys=True)))
+        self.db.commit()
+
+    def _remember(self, mem_key, value):
+        self.mem[mem_key] = value
+        self.mem.move_to_end(mem_key)
+        if len(self.mem) > self.lru_size:
+            self.mem.popitem(last=False)
+
+    def get(self, kind, key):
+        """Cached value (tuple of floats) or None."""
+        mem_key = (kind, tuple(key))
+        value = self.mem.get(mem_key)
+        if value is not None:
+            self.mem.move_to_end(mem_key)
+            self.mem_hits += 1
+            return value
+        row = self.db.execute("SELECT value FROM entries WHERE rules=? AND kind=? AND key=?",
+                              (self.rules, kind, key_hash(key))).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        value = tuple(json.loads(row[0]))
+        self._remember(mem_key, value)
+        self.disk_hits += 1
+        return value
+
+    def put(self, kind, key, value):
+        value = tuple(float(v) for v in value)
+        self._remember((kind, tuple(key)), value)
+        # json keeps -inf (illegal actions) as -Infinity
+        self.pending.append((self.rules, kind, key_hash(key), json.dumps(value)))
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def get_or_compute(self, kind, key, compute):
+        value = self.get(kind, key)
+        if value is None:
+            value = tuple(compute())
+            self.put(kind, key, value)
+        return value
+
+    def flush(self):
+        if self.pending:
+            self.db.executemany("INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?)", self.pending)
+            self.db.commit()
+            self.pending = []
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stats(self):
+        lookups = self.mem_hits + self.disk_hits + self.misses
+        return {
+            "mem_hits": self.mem_hits, "disk_hits": self.disk_hits, "misses": self.misses,
+            "hit_rate": (self.mem_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "in_memory": len(self.mem),
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or clear the persistent EV cache.")
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    parser.add_argument("--clear", action="store_true")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"no cache at {args.path}")
+    else:
+        db = sqlite3.connect(args.path)
+        if args.clear:
+            db.executescript("DELETE FROM entries; DELETE FROM rulesets;")
+            db.commit()
+            db.execute("VACUUM")
+            print(f"cleared {args.path}")
+        rows = db.execute("SELECT r.rules, r.spec, e.kind, COUNT(e.key) FROM rulesets r "
+                          "LEFT JOIN entries e ON e.rules = r.rules GROUP BY r.rules, e.kind").fetchall()
+        for rules, spec, kind, n in rows:
+            print(f"{rules} {kind or '-':>8}: {n:>9,} entries  {spec}")
+        print(f"{os.path.getsize(args.path) / 2**20:.1f} MiB")
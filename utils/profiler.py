@@ -0,0 +1,190 @@
+"""
+Opt-in timers and counters for the hot paths. Nothing is wrapped until
+enable(): it swaps the methods in HOOKS for timing wrappers on their classes
+(instances that already exist pick them up too) and disable() puts the
+originals back, so a run that never enables profiling pays nothing.
+
+Each hook keeps calls, inclusive time and self time (time not spent in
+another hooked call, so env.step excludes its env.get_state). Throughput
+comes from the same hooks: hands = env.reset calls, decisions = env.step
+calls, updates = growth of the agents' train_step.
+
+  profiler.enable()
+  ...
+  print(profiler.format_table(profiler.checkpoint()))   # since the last checkpoint
+  profiler.dump("runs/profile.json")                    # every checkpoint + totals
+
+or `with profiling(path): ...`, which is a no-op for path=None. The training
+loops print a checkpoint at PRINT_FREQ while profiling is on. Only this
+process is timed: pool workers and actor processes are not.
+"""
+import functools
+import importlib
+import json
+import os
+import time
+
+# (module, class, method, timer name, attribute whose growth counts as units)
+HOOKS = [
+    ("env.blackjackEnv", "BlackjackEnv", "reset", "env.reset", None),
+    ("env.blackjackEnv", "BlackjackEnv", "step", "env.step", None),
+    ("env.blackjackEnv", "BlackjackEnv", "get_state", "env.get_state", None),
+    ("memory.replay_buffer", "Replay_Buffer", "add", "replay.add", None),
+    ("memory.replay_buffer", "Replay_Buffer", "sample_weighted_idx", "replay.sample_weighted", None),
+    ("memory.replay_buffer", "Replay_Buffer", "gather", "replay.gather", None),
+    ("memory.prioritized_replay_buffer", "Prioritized_Replay_Buffer", "sample_prioritized_idx",
+     "replay.sample_prioritized", None),
+    ("agent.dqn_agent", "DQN_Agent", "select_action", "dqn.select_action", None),
+    ("agent.dqn_agent", "DQN_Agent", "select_actions", "dqn.select_actions", None),
+    ("agent.dqn_agent", "DQN_Agent", "train", "dqn.train", "train_step"),
+    ("agent.betting_agent", "Betting_Agent", "select_bet", "bet.select_bet", None),
+    ("agent.betting_agent", "Betting_Agent", "train", "bet.train", "train_step"),
+]
+HANDS, DECISIONS, UPDATES = "env.reset", "env.step", ("dqn.train", "bet.train")
+
+enabled = False
+_originals = {}       # (class, method) -> original function
+_stats = {}           # timer name -> [calls, total_s, self_s, units]
+_child = [0.0]        # time spent in nested hooked calls, one slot per open call
+_start = _mark_time = 0.0
+_mark = {}
+_history = []         # checkpoint() snapshots, oldest first
+
+
+def _timed(fn, stat, units_attr):
+    perf_counter = time.perf_counter
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        before = getattr(args[0], units_attr) if units_attr else 0
+        _child.append(0.0)
+        start = perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            nested = _child.pop()
+            _child[-1] += elapsed
+            stat[0] += 1
+            stat[1] += elapsed
+            stat[2] += elapsed - nested
+            if units_attr:
+                stat[3] += getattr(args[0], units_attr) - before
+    return wrapper
+
+
+def enable():
+    """Install the timing wrappers and start the clock (again, after a disable())."""
+    global enabled, _start, _mark_time
+    if enabled:
+        return
+    for module, cls_name, method, name, units_attr in HOOKS:
+        cls = getattr(importlib.import_module(module), cls_name)
+        fn = cls.__dict__.get(method)
+        if fn is None:     # inherited: the base class's hook already covers it
+            continue
+        _originals[cls, method] = fn
+        setattr(cls, method, _timed(fn, _stats.setdefault(name, [0, 0.0, 0.0, 0]), units_attr))
+    enabled = True
+    _start = _mark_time = time.perf_counter()
+
+
+def disable():
+    """Restore the original methods; the collected stats stay readable."""
+    global enabled
+    for (cls, method), fn in _originals.items():
+        setattr(cls, method, fn)
+    _originals.clear()
+    enabled = False
+
+
+def reset():
+    """Zero every timer and restart the clock."""
+    global _start, _mark_time
+    # the wrappers hold their stat lists, so zero in place rather than replace
+    for stat in _stats.values():
+        stat[:] = [0, 0.0, 0.0, 0]
+    _mark.clear()
+    _history.clear()
+    _start = _mark_time = time.perf_counter()
+
+
+def _snapshot(stats, wall):
+    phases = {}
+    for name, (calls, total, own, units) in stats.items():
+        if calls:
+            phases[name] = {"calls": calls, "total_s": total, "self_s": own,
+                            "self_share": own / wall if wall else 0.0, "us_per_call": 1e6 * total / calls}
+            if units:
+                phases[name]["units"] = units
+    timed = sum(p["self_s"] for p in phases.values())
+    rate = lambda n: n / wall if wall else 0.0
+    updates = sum(stats[name][3] for name in UPDATES if name in stats)
+    return {"wall_s": wall, "phases": phases, "untimed_s": max(0.0, wall - timed),
+            "throughput": {"hands_per_s": rate(stats.get(HANDS, (0,))[0]),
+                           "decisions_per_s": rate(stats.get(DECISIONS, (0,))[0]),
+                           "updates_per_s": rate(updates)}}
+
+
+def snapshot():
+    """Totals since enable() / reset()."""
+    return _snapshot(_stats, time.perf_counter() - _start)
+
+
+def checkpoint(label=None):
+    """Snapshot of the interval since the previous checkpoint; kept for dump()."""
+    global _mark_time
+    now = time.perf_counter()
+    interval = {name: [a - b for a, b in zip(stat, _mark.get(name, (0, 0.0, 0.0, 0)))]
+                for name, stat in _stats.items()}
+    snap = _snapshot(interval, now - _mark_time)
+    if label is not None:
+        snap["label"] = label
+    _mark.update((name, list(stat)) for name, stat in _stats.items())
+    _mark_time = now
+    _history.append(snap)
+    return snap
+
+
+def format_table(snap):
+    """Phase table, slowest self time first, plus throughput."""
+    wall = snap["wall_s"]
+    head = f"  profile{' ' + str(snap['label']) if 'label' in snap else ''} over {wall:.2f}s"
+    lines = [head, f"    {'phase':<28} {'calls':>9} {'us/call':>9} {'self s':>8} {'self %':>7}"]
+    for name, p in sorted(snap["phases"].items(), key=lambda kv: -kv[1]["self_s"]):
+        lines.append(f"    {name:<28} {p['calls']:>9,} {p['us_per_call']:>9.1f} {p['self_s']:>8.2f}"
+                     f" {100 * p['self_share']:>6.1f}%")
+    untimed = snap["untimed_s"]
+    lines.append(f"    {'(untimed)':<28} {'':>9} {'':>9} {untimed:>8.2f} {100 * untimed / wall if wall else 0:>6.1f}%")
+    t = snap["throughput"]
+    lines.append(f"    hands/s {t['hands_per_s']:,.0f}  decisions/s {t['decisions_per_s']:,.0f}"
+                 f"  updates/s {t['updates_per_s']:,.1f}")
+    return "\n".join(lines)
+
+
+def dump(path, total=None):
+    """Write {"total", "checkpoints"} as JSON (total defaults to snapshot())."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"total": total or snapshot(), "checkpoints": list(_history)}, f, indent=1)
+
+
+class profiling:
+    """enable() for the block, then print the totals and dump(path); path=None does nothing."""
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        if self.path:
+            reset()
+            enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.path:
+            total = snapshot()
+            disable()
+            print(format_table(total))
+            dump(self.path, total)
+            print(f"profile written to {self.path}")
+        return False
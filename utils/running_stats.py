@@ -0,0 +1,193 @@
+"""
+Constant-memory accumulators for long training / evaluation loops, so a run
+keeps O(1) state per metric instead of a list of every hand:
+
+  RunningStats   count, mean and variance (Welford), min, max
+  Histogram      fixed buckets plus under/overflow, approximate quantiles
+  WindowedMean   mean of the last `size` values over a ring buffer
+  BinnedStats    a RunningStats per key (e.g. true-count bin)
+
+All of them merge() with another instance of the same kind (results from
+worker processes or shards) and pickle as plain objects; to_dict() gives a
+JSON-able summary.
+"""
+import math
+import numpy as np
+
+Z95 = 1.96
+
+
+class RunningStats:
+    """Count, mean, variance, min and max of a stream (Welford, Chan et al. for merges)."""
+    __slots__ = ("n", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0    # sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x):
+        x = float(x)
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        if x < self.min: self.min = x
+        if x > self.max: self.max = x
+
+    def add_many(self, xs):
+        xs = np.asarray(xs, dtype=np.float64).ravel()
+        if xs.size:
+            batch = RunningStats()
+            batch.n = xs.size
+            batch.mean = float(xs.mean())
+            batch.m2 = float(((xs - batch.mean) ** 2).sum())
+            batch.min, batch.max = float(xs.min()), float(xs.max())
+            self.merge(batch)
+
+    def merge(self, other):
+        if other.n:
+            n = self.n + other.n
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta * delta * self.n * other.n / n
+            self.mean += delta * other.n / n
+            self.n = n
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def total(self):
+        return self.mean * self.n
+
+    def var(self, ddof=1):
+        return self.m2 / (self.n - ddof) if self.n > ddof else float("nan")
+
+    def std(self, ddof=1):
+        return math.sqrt(self.var(ddof))
+
+    def ci95(self):
+        """95% half-width of the mean."""
+        return Z95 * math.sqrt(self.var() / self.n) if self.n > 1 else float("nan")
+
+    def to_dict(self):
+        empty = self.n == 0
+        return {"n": self.n, "mean": self.mean, "std": self.std(), "ci95": self.ci95(),
+                "min": None if empty else self.min, "max": None if empty else self.max}
+
+    def __repr__(self):
+        return f"RunningStats(n={self.n}, mean={self.mean:.4g}, std={self.std():.4g})"
+
+
+class Histogram:
+    """Counts in n_buckets equal buckets over [lo, hi), plus underflow and overflow."""
+    def __init__(self, lo, hi, n_buckets):
+        self.edges = np.linspace(lo, hi, n_buckets + 1)
+        self.counts = np.zeros(n_buckets + 2, dtype=np.int64)   # [under, buckets..., over]
+
+    def _index(self, xs):
+        return np.searchsorted(self.edges, xs, side="right")
+
+    def add(self, x):
+        self.counts[self._index(x)] += 1
+
+    def add_many(self, xs):
+        xs = np.asarray(xs, dtype=np.float64).ravel()
+        self.counts += np.bincount(self._index(xs), minlength=self.counts.size)
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("cannot merge histograms with different buckets")
+        self.counts += other.counts
+        return self
+
+    @property
+    def n(self):
+        return int(self.counts.sum())
+
+    def quantile(self, q):
+        """Approximate q-quantile, linear within a bucket (clamped to [lo, hi])."""
+        n = self.n
+        if not n:
+            return float("nan")
+        target = q * n
+        cum = np.cumsum(self.counts)
+        k = int(np.searchsorted(cum, target, side="left"))
+        if k == 0:
+            return float(self.edges[0])
+        if k == self.counts.size - 1:
+            return float(self.edges[-1])
+        before = cum[k - 1]
+        frac = (target - before) / self.counts[k] if self.counts[k] else 0.0
+        return float(self.edges[k - 1] + frac * (self.edges[k] - self.edges[k - 1]))
+
+    def to_dict(self):
+        return {"edges": self.edges.tolist(), "counts": self.counts[1:-1].tolist(),
+                "under": int(self.counts[0]), "over": int(self.counts[-1])}
+
+
+class WindowedMean:
+    """Mean of the last `size` values (e.g. the last PRINT_FREQ episodes)."""
+    def __init__(self, size):
+        self.buf = np.zeros(size)
+        self.pos = 0
+        self.n = 0
+        self.sum = 0.0
+
+    def add(self, x):
+        x = float(x)
+        if self.n == self.buf.size:
+            self.sum -= self.buf[self.pos]
+        else:
+            self.n += 1
+        self.buf[self.pos] = x
+        self.sum += x
+        self.pos += 1
+        if self.pos == self.buf.size:
+            self.pos = 0
+            self.sum = float(self.buf.sum())   # drop accumulated rounding once per lap
+
+    @property
+    def mean(self):
+        return self.sum / self.n if self.n else float("nan")
+
+    def merge(self, other):
+        """Appends other's window (oldest first) after this one's values."""
+        if other.n == other.buf.size:
+            values = np.concatenate([other.buf[other.pos:], other.buf[:other.pos]])
+        else:
+            values = other.buf[:other.n]
+        for x in values:
+            self.add(x)
+        return self
+
+
+class BinnedStats:
+    """A RunningStats per key, created on first use."""
+    def __init__(self):
+        self.bins = {}
+
+    def add(self, key, x):
+        stats = self.bins.get(key)
+        if stats is None:
+            stats = self.bins[key] = RunningStats()
+        stats.add(x)
+
+    def merge(self, other):
+        for key, stats in other.bins.items():
+            self.bins.setdefault(key, RunningStats()).merge(stats)
+        return self
+
+    def __getitem__(self, key):
+        return self.bins[key]
+
+    def __contains__(self, key):
+        return key in self.bins
+
+    def items(self):
+        return self.bins.items()
+
+    def to_dict(self):
+        return {str(k): v.to_dict() for k, v in self.bins.items()}
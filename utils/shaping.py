@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def shaping_bonus(state, action, true_count):
     num_cards, score, is_soft, dealer, can_split, can_double = map(int, state[:6])
     bonus = 0.0
@@ -13,3 +16,26 @@ def shaping_bonus(state, action, true_count):
     # Low/neutral TC: discourage random doubles
     if true_count <= 0 and action == 2: bonus -= 0.05
     return max(-0.5, min(0.5, bonus))
+
+
+# training reward by pre-deal true count band (rows) and bet index (columns, 1..16 units)
+COUNT_EDGES = [-1, 1, 3, 4]
+COUNT_RANGES = ["Unfavorable (below -1)", "Neutral (-1 to +1)", "Slightly Favorable (+1 to +3)",
+                "High (+3 to +4)", "Very High (+4 or more)"]
+SHAPED_REWARD = np.array([
+    [+2.0, +0.5, -3.0, -3.0, -3.0],   # below -1: minimum bets only, 1 unit is excellent caution
+    [+1.0, +1.0, +0.0, -2.0, -2.0],   # neutral: 1 or 2 units, 4 borderline, more way too aggressive
+    [+1.0, +1.0, +1.0, -1.5, -1.5],   # slightly favorable: up to 4 units is safe
+    [-0.5, -0.5, +0.5, +1.5, +1.5],   # high: 8 or 16 units good, 4 okay, less too small
+    [-1.0, -1.0, -1.0, +1.0, +2.0],   # +4 or more: 16 units excellent, betting small a missed opportunity
+])
+
+
+def count_band(true_count):
+    """Row of SHAPED_REWARD / COUNT_RANGES for a true count (scalar or array)."""
+    return np.searchsorted(COUNT_EDGES, true_count, side="right")
+
+
+def shaped_reward(true_count, bet_index):
+    """Training reward of a bet at a true count; both scalars or arrays."""
+    return SHAPED_REWARD[count_band(true_count), bet_index]
@@ -0,0 +1,225 @@
+"""
+Shoe simulator for true-count frequency and penetration studies.
+
+Deals through many shoes at once as int8 rows (cards by value 2..11, Ace = 11)
+and records, before every round, the Hi-Lo true count, running count and cards
+remaining, with BlackjackEnv's shuffle rule (a round starts only while more
+than penetration * 52 * num_deck cards are left). Running counts come from one
+cumulative sum per shoe, so a round only has to advance the cursors.
+
+Rounds consume cards like a one-hand table: two cards each, the player hits
+below 12, or below 17 against a 7..A upcard, and the dealer (stands on all
+17s) draws unless the player busted. Doubles and splits are left out; they
+shift card use per round by a few percent and barely move the TC shape.
+
+Results are cached as .npz per (num_deck, penetration, shoes, seed) under
+checkpoints/cache/shoe_sim/. sample_shoes() draws single pre-round shoe states
+from the same depth distribution, e.g. to stratify evaluation by true count.
+From the repo root:
+  python -m utils.shoe_sim --shoes 1000000 --num-deck 6 --penetration 0.25
+"""
+import os
+import numpy as np
+from env.blackjackEnv import BlackjackEnv
+
+SIM_VERSION = 1
+CACHE_DIR = os.path.join("checkpoints", "cache", "shoe_sim")
+TC_CLIP = 20     # TCs are truncated toward zero like int(tc), then clipped to ±TC_CLIP
+HI_LO = np.array(BlackjackEnv.HI_LO, dtype=np.int16)
+
+
+def _base_shoe(num_deck):
+    one_deck = [11, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10] * 4
+    return np.array(one_deck * num_deck, dtype=np.int8)
+
+
+def _value(hard, aces):
+    return np.where((aces > 0) & (hard + 10 <= 21), hard + 10, hard)
+
+
+class _Deal:
+    """Cursor reads over a batch of shoes."""
+    def __init__(self, shoes):
+        self.shoes = shoes
+        self.cursor = np.zeros(shoes.shape[0], dtype=np.int64)
+        self.last = shoes.shape[1] - 1
+
+    def draw(self, idx):
+        # a cut card this close to the end is the caller's problem; never read past the shoe
+        cards = self.shoes[idx, np.minimum(self.cursor[idx], self.last)].astype(np.int64)
+        self.cursor[idx] += 1
+        return cards
+
+
+def _play_rounds(deal, idx):
+    """One round on every shoe in idx, moving their cursors past the cards used."""
+    p_hard = np.zeros(idx.size, dtype=np.int64)
+    p_aces = np.zeros(idx.size, dtype=np.int64)
+    d_hard = np.zeros(idx.size, dtype=np.int64)
+    d_aces = np.zeros(idx.size, dtype=np.int64)
+    up = None
+    for who in (0, 0, 1, 1):   # env order: player, player, dealer, dealer
+        cards = deal.draw(idx)
+        if who == 0:
+            p_hard += np.where(cards == 11, 1, cards); p_aces += cards == 11
+        else:
+            if up is None:
+                up = cards
+            d_hard += np.where(cards == 11, 1, cards); d_aces += cards == 11
+
+    stand_on = np.where(up >= 7, 17, 12)
+    live = np.flatnonzero(_value(p_hard, p_aces) < stand_on)
+    while live.size:
+        cards = deal.draw(idx[live])
+        p_hard[live] += np.where(cards == 11, 1, cards)
+        p_aces[live] += cards == 11
+        live = live[_value(p_hard[live], p_aces[live]) < stand_on[live]]
+
+    live = np.flatnonzero((_value(p_hard, p_aces) <= 21) & (_value(d_hard, d_aces) < 17))
+    while live.size:
+        cards = deal.draw(idx[live])
+        d_hard[live] += np.where(cards == 11, 1, cards)
+        d_aces[live] += cards == 11
+        live = live[_value(d_hard[live], d_aces[live]) < 17]
+
+
+def simulate(n_shoes, num_deck=6, penetration=0.25, seed=None, batch=20_000):
+    """
+    Histograms over every pre-round state of n_shoes shoes:
+      tc_values / tc_hist          true count truncated toward zero, clipped to ±TC_CLIP
+      cards_left_hist              index = cards remaining
+      rc_values / rc_hist          running count
+    plus "rounds", "shoes" and "cards_per_round".
+    """
+    rng = np.random.default_rng(seed)
+    size = 52 * num_deck
+    cut = penetration * size
+    base = _base_shoe(num_deck)
+    rc_max = 20 * num_deck   # every low card out
+
+    tc_hist = np.zeros(2 * TC_CLIP + 1, dtype=np.int64)
+    cards_hist = np.zeros(size + 1, dtype=np.int64)
+    rc_hist = np.zeros(2 * rc_max + 1, dtype=np.int64)
+    rounds = cards_used = 0
+
+    for start in range(0, n_shoes, batch):
+        b = min(batch, n_shoes - start)
+        shoes = rng.permuted(np.broadcast_to(base, (b, size)), axis=1)
+        # running count after k cards: rc[:, k]
+        rc = np.zeros((b, size + 1), dtype=np.int16)
+        np.cumsum(HI_LO[shoes - 2], axis=1, out=rc[:, 1:])
+
+        deal = _Deal(shoes)
+        while True:
+            left = size - deal.cursor
+            idx = np.flatnonzero(left > cut)
+            if not idx.size:
+                break
+            left = left[idx]
+            count = rc[idx, deal.cursor[idx]].astype(np.int64)
+            tc = np.trunc(count / (left / 52))
+            tc_hist += np.bincount(np.clip(tc, -TC_CLIP, TC_CLIP).astype(np.int64) + TC_CLIP,
+                                   minlength=tc_hist.size)
+            cards_hist += np.bincount(left, minlength=cards_hist.size)
+            rc_hist += np.bincount(count + rc_max, minlength=rc_hist.size)
+            rounds += idx.size
+
+            before = deal.cursor[idx].copy()
+            _play_rounds(deal, idx)
+            cards_used += int((deal.cursor[idx] - before).sum())
+
+    return {
+        "tc_values": np.arange(-TC_CLIP, TC_CLIP + 1),
+        "tc_hist": tc_hist,
+        "cards_left_hist": cards_hist,
+        "rc_values": np.arange(-rc_max, rc_max + 1),
+        "rc_hist": rc_hist,
+        "rounds": rounds,
+        "shoes": n_shoes,
+        "cards_per_round": cards_used / max(1, rounds),
+    }
+
+
+def cache_path(num_deck, penetration, n_shoes, seed, cache_dir=CACHE_DIR):
+    name = f"v{SIM_VERSION}_{num_deck}d_pen{penetration:g}_{n_shoes}shoes_seed{seed}.npz"
+    return os.path.join(cache_dir, name)
+
+
+def tc_frequency(num_deck=6, penetration=0.25, n_shoes=1_000_000, seed=0, cache_dir=CACHE_DIR):
+    """simulate(), loaded from / saved to the per-configuration cache file (cache_dir=None skips it)."""
+    path = cache_path(num_deck, penetration, n_shoes, seed, cache_dir) if cache_dir else None
+    if path and os.path.exists(path):
+        with np.load(path) as data:
+            return {k: (data[k] if data[k].ndim else data[k].item()) for k in data.files}
+    result = simulate(n_shoes, num_deck, penetration, seed)
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez_compressed(path, **result)
+    return result
+
+
+def cards_left_distribution(num_deck=6, penetration=0.25, n_shoes=100_000, seed=0):
+    """P(cards left == k) before a round, from the cached simulation."""
+    hist = tc_frequency(num_deck, penetration, n_shoes, seed)["cards_left_hist"]
+    return hist / hist.sum()
+
+
+def sample_shoes(rng, n, num_deck=6, cards_left_p=None):
+    """
+    n independent pre-round shoe states: shuffled shoes cut at a depth drawn
+    from cards_left_p (cards_left_distribution() if None). The cards already
+    dealt are a uniform random subset whatever was played, so only the depth
+    depends on the simulated rounds. Returns (shoes (n, 52 * num_deck) int8,
+    cursors (n,), Hi-Lo true counts (n,)).
+    """
+    size = 52 * num_deck
+    if cards_left_p is None:
+        cards_left_p = cards_left_distribution(num_deck)
+    shoes = rng.permuted(np.broadcast_to(_base_shoe(num_deck), (n, size)), axis=1)
+    left = rng.choice(size + 1, size=n, p=cards_left_p)
+    cursor = size - left
+    dealt = np.cumsum(HI_LO[shoes - 2], axis=1)
+    count = np.where(cursor > 0, dealt[np.arange(n), np.maximum(cursor - 1, 0)], 0)
+    return shoes, cursor, count / (left / 52)
+
+
+def tc_table(result, lo=-8, hi=8):
+    """[(tc, share of rounds)] with the tails folded into lo / hi."""
+    values, hist = result["tc_values"], result["tc_hist"]
+    total = hist.sum()
+    rows = []
+    for tc in range(lo, hi + 1):
+        if tc == lo:
+            n = hist[values <= lo].sum()
+        elif tc == hi:
+            n = hist[values >= hi].sum()
+        else:
+            n = hist[values == tc].sum()
+        rows.append((tc, n / total))
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Pre-round true count frequencies by shoe simulation.")
+    parser.add_argument("--shoes", type=int, default=1_000_000)
+    parser.add_argument("--num-deck", type=int, default=6)
+    parser.add_argument("--penetration", type=float, default=0.25, help="share of the shoe behind the cut card")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = tc_frequency(args.num_deck, args.penetration, args.shoes, args.seed,
+                          cache_dir=None if args.no_cache else CACHE_DIR)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.num_deck} decks, penetration {args.penetration:g}: {result['shoes']:,} shoes, "
+          f"{result['rounds']:,} rounds, {result['cards_per_round']:.2f} cards/round")
+    rows = tc_table(result)
+    for i, (tc, share) in enumerate(rows):
+        label = f"≤{tc}" if i == 0 else f"≥{tc}" if i == len(rows) - 1 else f"{tc:+d}"
+        print(f"  TC {label:>3}: {share:6.2%}")
+    print(f"done in {elapsed:.1f}s ({result['shoes'] / elapsed:,.0f} shoes/sec)")
@@ -0,0 +1,343 @@
+"""
+Composition-dependent EV solver for the env's rules, used as a reference
+policy and to score other policies' decisions (regret) without simulation.
+
+Rules follow BlackjackEnv: dealer stands on all 17s and does not peek, natural
+pays 1.5 (push against a dealer natural), any non-natural 21 pushes a dealer
+natural, a two-card 21 on a split hand pays 1:1 and pushes only a dealer
+natural, double on any two cards (also after a split), resplit up to
+ALLOWED_SPLITS.
+
+The dealer's outcome distribution is exact for the composition at decision
+time (utils/dealer_odds.py); the player's own draws use that same composition,
+the usual composition-dependent approximation that keeps one decision to a
+handful of milliseconds.
+
+Pass an EVCache (utils/ev_cache.py) to reuse results across runs.
+
+Precompute basic strategy + true-count indices from the repo root:
+  python -m utils.strategy_solver --out checkpoints/strategy/basic_strategy_6deck.json
+"""
+import math
+from env.blackjackEnv import BlackjackEnv
+from utils.dealer_odds import dealer_outcome_probs, unseen_counts, BLACKJACK, BUST
+
+HIT, STAND, DOUBLE, SPLIT = 0, 1, 2, 3
+ACTION_LETTERS = "HSDP"
+SOLVER_VERSION = 2   # bump when the EVs change, it versions the persistent cache
+
+
+def _hand_value(hard, soft_ace):
+    return hard + 10 if soft_ace and hard + 10 <= 21 else hard
+
+
+def _add(hard, soft_ace, value):
+    return hard + (1 if value == 11 else value), soft_ace or value == 11
+
+
+class Solver:
+    """Action EVs (per unit bet) for one dealer upcard and one unseen-card composition."""
+    def __init__(self, upcard, counts, allowed_splits=BlackjackEnv.ALLOWED_SPLITS, dealer_probs=None):
+        upcard = 11 if upcard == "A" else int(upcard)
+        total = sum(counts)
+        self.q = [c / total for c in counts]   # P(next card has value i + 2)
+        self.allowed_splits = allowed_splits
+
+        dealer = dealer_probs or dealer_outcome_probs(upcard, counts)
+        self.p_dealer_natural = dealer[BLACKJACK]
+        # a dealer natural only beats a player natural's 1.5; otherwise it is a 21
+        finals = list(dealer[:5])
+        finals[4] += dealer[BLACKJACK]
+        p_bust = dealer[BUST]
+        self._stand = {}
+        for t in range(4, 22):
+            win = p_bust + sum(p for d, p in zip(range(17, 22), finals) if t > d)
+            lose = sum(p for d, p in zip(range(17, 22), finals) if t < d)
+            self._stand[t] = win - lose
+        self._hit = {}
+        self._post_split = {}
+
+    def stand(self, value):
+        return -1.0 if value > 21 else self._stand[max(4, value)]
+
+    def hit(self, hard, soft_ace):
+        """Take a card, then keep playing hit/stand optimally."""
+        key = (hard, soft_ace)
+        if key not in self._hit:
+            ev = 0.0
+            for i, p in enumerate(self.q):
+                if p:
+                    h, s = _add(hard, soft_ace, i + 2)
+                    v = _hand_value(h, s)
+                    ev += p * (-1.0 if v > 21 else max(self.stand(v), self.hit(h, s)))
+            self._hit[key] = ev
+        return self._hit[key]
+
+    def double(self, hard, soft_ace):
+        ev = 0.0
+        for i, p in enumerate(self.q):
+            if p:
+                ev += p * self.stand(_hand_value(*_add(hard, soft_ace, i + 2)))
+        return 2.0 * ev
+
+    def post_split_hand(self, card, splits_done):
+        """EV of one hand that starts as [card] after a split and draws its second card."""
+        key = (card, splits_done)
+        if key not in self._post_split:
+            ev = 0.0
+            hard, soft = _add(0, False, card)
+            for i, p in enumerate(self.q):
+                if p:
+                    h, s = _add(hard, soft, i + 2)
+                    pair = card if i + 2 == card else None
+                    ev += p * max(self.action_evs(h, s, 2, pair, splits_done, True))
+            self._post_split[key] = ev
+        return self._post_split[key]
+
+    def settle(self, value, n_cards, split_hand=False):
+        """EV of standing on a hand of `value` with n_cards cards."""
+        if n_cards == 2 and value == 21:
+            # a natural pays 1.5, a two-card 21 after a split 1:1; either pushes only a dealer natural
+            return (1.0 if split_hand else 1.5) * (1.0 - self.p_dealer_natural)
+        return self.stand(value)
+
+    def draw_values(self, action, hard, soft_ace, splits_done=0):
+        """
+        Value of the hand after `action` draws each card value 2..11: HIT keeps
+        playing hit/stand, DOUBLE stands on 2x, SPLIT plays a new split hand
+        from the one card (hard, soft_ace) on.
+        """
+        pair_card = 11 if soft_ace else hard
+        values = []
+        for i in range(10):
+            h, s = _add(hard, soft_ace, i + 2)
+            v = _hand_value(h, s)
+            if action == DOUBLE:
+                values.append(2.0 * self.stand(v))
+            elif action == SPLIT:
+                pair = pair_card if i + 2 == pair_card else None
+                values.append(max(self.action_evs(h, s, 2, pair, splits_done, True)))
+            else:
+                values.append(-1.0 if v > 21 else max(self.stand(v), self.hit(h, s)))
+        return values
+
+    def draw_luck(self, action, hard, soft_ace, card, splits_done=0):
+        """draw_values() of the card drawn minus their average over this composition: mean 0."""
+        values = self.draw_values(action, hard, soft_ace, splits_done)
+        return values[_card_value(card) - 2] - sum(p * v for p, v in zip(self.q, values))
+
+    def action_evs(self, hard, soft_ace, n_cards, pair_card=None, splits_done=0, split_hand=False):
+        """[hit, stand, double, split] EVs; illegal actions are -inf."""
+        value = _hand_value(hard, soft_ace)
+        stand = self.settle(value, n_cards, split_hand)
+        evs = [self.hit(hard, soft_ace) if value <= 21 else -1.0, stand, -math.inf, -math.inf]
+        if n_cards == 2:
+            evs[DOUBLE] = self.double(hard, soft_ace)
+            if pair_card is not None and splits_done < self.allowed_splits:
+                evs[SPLIT] = 2.0 * self.post_split_hand(pair_card, splits_done + 1)
+        return evs
+
+
+def _card_value(card):
+    return 11 if card == "A" else card
+
+
+def _hand_key(hand):
+    return sum(1 if c == "A" else c for c in hand), "A" in hand
+
+
+def solver_for(upcard, counts, cache=None):
+    """Solver(upcard, counts), its dealer odds through `cache` (an EVCache) if given."""
+    upcard = _card_value(upcard)
+    if cache is None:
+        return Solver(upcard, counts)
+    counts = tuple(int(c) for c in counts)
+    dealer = cache.get_or_compute("dealer", (upcard,) + counts,
+                                  lambda: dealer_outcome_probs(upcard, counts))
+    return Solver(upcard, counts, dealer_probs=dealer)
+
+
+def action_evs(upcard, counts, hard, soft_ace, n_cards, pair_card=None,
+               splits_done=0, split_hand=False, cache=None):
+    """Solver(upcard, counts).action_evs(...), through `cache` (an EVCache) if given."""
+    if cache is None:
+        solver = solver_for(upcard, counts)
+        return solver.action_evs(hard, soft_ace, n_cards, pair_card, splits_done, split_hand)
+
+    counts = tuple(int(c) for c in counts)
+    key = (_card_value(upcard), hard, soft_ace, min(n_cards, 3), pair_card or 0, splits_done, split_hand) + counts
+
+    def compute():
+        solver = solver_for(upcard, counts, cache)
+        return solver.action_evs(hard, soft_ace, n_cards, pair_card, splits_done, split_hand)
+    return list(cache.get_or_compute("actions", key, compute))
+
+
+def env_solver(env, cache=None):
+    """Solver for the round being played in a BlackjackEnv, from the player's view."""
+    return solver_for(env.dealer_hand[0], unseen_counts(env), cache)
+
+
+def env_action_evs(env, cache=None):
+    """[hit, stand, double, split] EVs for the hand being played in a BlackjackEnv."""
+    hand = env.player_hand
+    hard, soft_ace = _hand_key(hand)
+    pair = _card_value(hand[0]) if len(hand) == 2 and hand[0] == hand[1] else None
+    return action_evs(env.dealer_hand[0], unseen_counts(env), hard, soft_ace, len(hand), pair,
+                      env.splits_number, env.split_active, cache)
+
+
+def settled_ev(env, cache=None):
+    """
+    Expected net result (in base bets) of a finished BlackjackEnv round over the
+    dealer's hole card and draws, given the player's final hands. Every card the
+    dealer turned over goes back into the unseen composition, so this is exact:
+    for a policy that never looks at the hole card, net - settled_ev has mean 0.
+    """
+    counts = list(env.rank_counts)
+    for card in env.dealer_hand[1:]:
+        counts[_card_value(card) - 2] += 1
+    solver = solver_for(env.dealer_hand[0], counts, cache)
+    tracker = env.payout_tracker
+    split = len(env.player_hands) > 1
+    return sum(bet / tracker.base_bet * solver.settle(env.calculate_hand_value(hand), len(hand), split)
+               for hand, bet in zip(env.player_hands, tracker.bets))
+
+
+def play_with_control(env, policy, state, cache=None):
+    """
+    Plays the round dealt in `env` to the end with a policy that never looks at
+    the hole card (e.g. SolverPolicy) and returns a control variate, in base
+    bets, with mean exactly 0: every card the player draws adds
+    Solver.draw_luck() at the composition it came from, and the dealer's cards
+    add the net result minus settled_ev(). The solver's approximations only
+    cost correlation with the round's luck, never bias.
+    """
+    control = 0.0
+    while not env.done:
+        action = policy.select_action(state, env.legal_actions())
+        if action == STAND:
+            state, _, _, _ = env.step(action)
+            continue
+        i, hand, splits = env.current_hand_index, env.player_hand, env.splits_number
+        solver = env_solver(env, cache)
+        if action == SPLIT:
+            hard, soft_ace = _hand_key(hand[:1])
+        else:
+            hard, soft_ace = _hand_key(hand)
+        state, _, _, _ = env.step(action)
+        if action != SPLIT:
+            control += solver.draw_luck(action, hard, soft_ace, env.player_hands[i][-1])
+            continue
+        first, second = env.player_hands[i][1], env.player_hands[i + 1][1]
+        control += solver.draw_luck(SPLIT, hard, soft_ace, first, splits + 1)
+        # the second hand draws from the composition without the first hand's card
+        counts = unseen_counts(env)
+        counts[_card_value(second) - 2] += 1
+        second_solver = solver_for(env.dealer_hand[0], counts, cache)
+        control += second_solver.draw_luck(SPLIT, hard, soft_ace, second, splits + 1)
+    return control + env.payout_tracker.get_info()["net_result"] / env.base_bet - settled_ev(env, cache)
+
+
+def decision_regret(env, action, legal_actions=None, cache=None):
+    """EV lost by `action` vs the best legal action, in units of the bet."""
+    evs = env_action_evs(env, cache)
+    legal = legal_actions if legal_actions is not None else env.legal_actions()
+    best = max(evs[a] for a in legal)
+    return best - evs[action], evs
+
+
+class SolverPolicy:
+    """Plays the solver's best legal action; bind() it to the env it plays in."""
+    def __init__(self, env=None, cache=None):
+        self.env = env
+        self.cache = cache
+        self.action_dim = 4
+        self.epsilon = 0.0
+
+    def bind(self, env):
+        self.env = env
+
+    def select_action(self, state, legal_actions=None):
+        evs = env_action_evs(self.env, self.cache)
+        legal = legal_actions or self.env.legal_actions()
+        return max(legal, key=lambda a: evs[a])
+
+
+# ---- precomputed basic strategy + TC index table ----
+def shoe_at_tc(tc, decks_left=4):
+    """Unseen composition with about `tc` Hi-Lo true count, removing low (or high) cards evenly."""
+    counts = [4 * decks_left] * 8 + [16 * decks_left, 4 * decks_left]
+    rc = int(round(tc * decks_left))
+    order = [0, 1, 2, 3, 4] if rc > 0 else [8, 8, 8, 8, 9]   # 2-6, or four 10s per Ace
+    for k in range(abs(rc)):
+        counts[order[k % 5]] -= 1
+    return counts
+
+
+def basic_strategy_cells():
+    """(label, player cards) for every 2-card starting hand type."""
+    cells = [(f"hard {t}", [2, t - 2] if t <= 11 else [10, t - 10]) for t in range(5, 20)]
+    cells += [(f"soft {11 + x}", ["A", x]) for x in range(2, 10)]
+    cells += [(f"pair {c}", [c, c]) for c in [2, 3, 4, 5, 6, 7, 8, 9, 10, "A"]]
+    return cells
+
+
+def strategy_table(tcs=range(-8, 9), decks_left=4, cache=None):
+    """
+    {"tcs": [...], "cells": {label: {upcard: {"basic", "by_tc", "index"}}}}
+    "basic" is the play at TC 0, "by_tc" one action letter per entry of "tcs",
+    "index" the [tc, letter] points where the best play changes going up the count.
+    """
+    tcs = list(tcs)
+    table = {}
+    for label, cards in basic_strategy_cells():
+        hard = sum(1 if c == "A" else c for c in cards)
+        soft = "A" in cards
+        pair = _card_value(cards[0]) if cards[0] == cards[1] else None
+        row = {}
+        for up in range(2, 12):
+            by_tc = {}
+            for tc in tcs:
+                counts = shoe_at_tc(tc, decks_left)
+                for c in cards + [up]:
+                    counts[_card_value(c) - 2] -= 1
+                evs = action_evs(up, counts, hard, soft, 2, pair, cache=cache)
+                by_tc[tc] = ACTION_LETTERS[max(range(4), key=lambda a: evs[a])]
+            index, prev = [], None
+            for tc in tcs:
+                if by_tc[tc] != prev:
+                    index.append([tc, by_tc[tc]])
+                    prev = by_tc[tc]
+            row["A" if up == 11 else str(up)] = {
+                "basic": by_tc.get(0), "by_tc": "".join(by_tc[tc] for tc in tcs), "index": index}
+        table[label] = row
+    return {"tcs": tcs, "decks_left": decks_left, "cells": table}
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import os
+
+    parser = argparse.ArgumentParser(description="Precompute basic strategy and true-count indices.")
+    parser.add_argument("--out", default="checkpoints/strategy/basic_strategy_6deck.json")
+    parser.add_argument("--no-cache", action="store_true", help="skip the persistent EV cache")
+    args = parser.parse_args()
+
+    if args.no_cache:
+        table = strategy_table()
+    else:
+        from utils.ev_cache import EVCache
+        with EVCache() as cache:
+            table = strategy_table(cache=cache)
+            print("EV cache:", cache.stats())
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(table, f)
+
+    ups = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "A"]
+    print(f"{'':>9} " + " ".join(f"{u:>2}" for u in ups))
+    for label, row in table["cells"].items():
+        print(f"{label:>9} " + " ".join(f"{row[u]['basic']:>2}" for u in ups))
+    print(f"\nwritten to {args.out}")
@@ -0,0 +1,133 @@
+# utils/tests/running_stats_check.py
+#   python -m utils.tests.running_stats_check
+
+import pickle
+import numpy as np
+
+from utils.running_stats import RunningStats, Histogram, WindowedMean, BinnedStats
+
+
+def _close(a, b, tol=1e-9):
+    return abs(a - b) <= tol * max(1.0, abs(b))
+
+
+def _assert_matches(stats, xs):
+    xs = np.asarray(xs, dtype=np.float64)
+    assert stats.n == xs.size, (stats.n, xs.size)
+    assert _close(stats.mean, xs.mean()), (stats.mean, xs.mean())
+    assert _close(stats.var(), xs.var(ddof=1)), (stats.var(), xs.var(ddof=1))
+    assert _close(stats.var(ddof=0), xs.var()), (stats.var(ddof=0), xs.var())
+    assert stats.min == xs.min() and stats.max == xs.max(), (stats.min, stats.max)
+    assert _close(stats.total, xs.sum()), (stats.total, xs.sum())
+
+
+def check_running_stats_vs_numpy(seed=0):
+    # large offset, small spread: the case a naive sum-of-squares gets wrong
+    xs = 1e6 + np.random.default_rng(seed).normal(0, 3, 10_001)
+
+    one_by_one = RunningStats()
+    for x in xs:
+        one_by_one.add(x)
+    _assert_matches(one_by_one, xs)
+
+    batched = RunningStats()
+    for chunk in np.array_split(xs, 7):
+        batched.add_many(chunk)
+    batched.add_many([])
+    _assert_matches(batched, xs)
+
+    # uneven shards (1, 1999, 0 and 8001 values) merged into an empty-merged-empty start
+    shards = [RunningStats() for _ in range(4)]
+    for shard, chunk in zip(shards, np.split(xs, [1, 2_000, 2_000])):
+        shard.add_many(chunk)
+    merged = RunningStats().merge(RunningStats())
+    for shard in shards:
+        merged.merge(shard)
+    _assert_matches(merged, xs)
+
+    empty = RunningStats()
+    assert empty.to_dict()["min"] is None and np.isnan(empty.ci95())
+
+
+def check_binned_stats_merge(seed=0):
+    rng = np.random.default_rng(seed)
+    keys = rng.integers(-3, 4, 5_000)
+    xs = rng.normal(keys, 1.0)
+    half = xs.size // 2
+    a, b = BinnedStats(), BinnedStats()
+    for key, x in zip(keys[:half], xs[:half]):
+        a.add(int(key), x)
+    for key, x in zip(keys[half:], xs[half:]):
+        b.add(int(key), x)
+    a.merge(b)
+    assert sorted(a.bins) == sorted(set(keys.tolist())), sorted(a.bins)
+    for key in a.bins:
+        _assert_matches(a[key], xs[keys == key])
+
+
+def check_windowed_mean_merge():
+    xs = np.arange(1.0, 26.0)
+    for size in (4, 10, 40):       # windows that wrap, fill exactly, never fill
+        for split in (3, 10, 17):
+            a, b = WindowedMean(size), WindowedMean(size)
+            for x in xs[:split]:
+                a.add(x)
+            for x in xs[split:]:
+                b.add(x)
+            a.merge(b)
+            # same as one window fed the whole stream
+            assert _close(a.mean, xs[-size:].mean()), (size, split, a.mean, xs[-size:].mean())
+    assert np.isnan(WindowedMean(3).mean)
+
+
+def check_histogram(seed=0):
+    xs = np.random.default_rng(seed).normal(0, 1, 50_000)
+    h = Histogram(-3, 3, 60)
+    h.add_many(xs[:20_000])
+    other = Histogram(-3, 3, 60)
+    for x in xs[20_000:21_000]:
+        other.add(x)
+    other.add_many(xs[21_000:])
+    h.merge(other)
+
+    counts, _ = np.histogram(xs, bins=h.edges)
+    d = h.to_dict()
+    assert d["under"] == (xs < -3).sum() and d["over"] == (xs >= 3).sum(), d
+    # np.histogram closes its last bucket at hi; x == hi never occurs here
+    assert d["counts"] == counts.tolist()
+    assert h.n == xs.size
+    for q in (0.05, 0.5, 0.95):
+        assert abs(h.quantile(q) - np.quantile(xs, q)) < 0.1, (q, h.quantile(q))
+
+    try:
+        h.merge(Histogram(-3, 3, 30))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("merged histograms with different buckets")
+
+
+def check_pickle_round_trip():
+    xs = np.linspace(-1, 1, 101)
+    stats, window, hist, binned = RunningStats(), WindowedMean(8), Histogram(-1, 1, 10), BinnedStats()
+    stats.add_many(xs)
+    hist.add_many(xs)
+    for i, x in enumerate(xs):
+        window.add(x)
+        binned.add(i % 3, x)
+
+    stats2, window2, hist2, binned2 = pickle.loads(pickle.dumps((stats, window, hist, binned)))
+    assert stats2.to_dict() == stats.to_dict()
+    assert window2.mean == window.mean and window2.pos == window.pos
+    assert hist2.to_dict() == hist.to_dict()
+    assert binned2.to_dict() == binned.to_dict()
+    # and keep accumulating afterwards
+    stats2.add(5.0)
+    _assert_matches(stats2, np.append(xs, 5.0))
+
+
+if __name__ == "__main__":
+    for check in (check_running_stats_vs_numpy, check_binned_stats_merge, check_windowed_mean_merge,
+                  check_histogram, check_pickle_round_trip):
+        check()
+        print(f"{check.__name__}: ok")
@@ -0,0 +1,44 @@
+# utils/tests/strategy_solver_check.py
+#   python -m utils.tests.strategy_solver_check
+
+from env.blackjackEnv import BlackjackEnv
+from utils.strategy_solver import env_action_evs, STAND
+
+
+def split_21_scenario(dealer_hand, spare):
+    """
+    Player [A, A] splits and both hands draw a 10 (two-card 21s); the rest of
+    the shoe is all `spare`, so the dealer's final hand is certain.
+    Returns (solver stand EV of the first split hand, env net result per hand).
+    """
+    env = BlackjackEnv()
+    dealt_order = ["A", "A"] + dealer_hand + [10, 10] + [spare] * 12
+    # set_deck() deals from the END of the list (like list.pop()), so reverse:
+    env.set_deck(dealt_order[::-1])
+    env.set_bet(1)
+    env.reset()
+    env.step(3)                                   # split
+    ev = env_action_evs(env)[STAND]
+    while not env.done:
+        env.step(1)                               # stand both hands
+    return ev, env.payout_tracker.get_info()["net_result"] / len(env.player_hands)
+
+
+def check_split_21_vs_three_card_21():
+    # dealer 7, 7 draws a 7: a three-card 21, which a split-hand 21 still beats
+    ev, net = split_21_scenario([7, 7], 7)
+    assert net == 1.0, net
+    assert abs(ev - net) < 1e-12, (ev, net)
+
+
+def check_split_21_vs_dealer_natural():
+    # dealer 10, A: a natural pushes the split-hand 21
+    ev, net = split_21_scenario([10, "A"], "A")
+    assert net == 0.0, net
+    assert abs(ev - net) < 1e-12, (ev, net)
+
+
+if __name__ == "__main__":
+    for check in (check_split_21_vs_three_card_21, check_split_21_vs_dealer_natural):
+        check()
+        print(f"{check.__name__}: ok")